@@ -0,0 +1,4 @@
+ALTER TABLE `trades` ADD `runUp` int;--> statement-breakpoint
+ALTER TABLE `trades` ADD `runUpPercent` int;--> statement-breakpoint
+ALTER TABLE `trades` ADD `drawdown` int;--> statement-breakpoint
+ALTER TABLE `trades` ADD `drawdownPercent` int;
\ No newline at end of file
@@ -86,6 +86,10 @@ export const trades = mysqlTable(
     quantity: int("quantity").notNull().default(1), // Number of contracts/shares
     pnl: int("pnl").notNull(), // Profit/Loss in cents
     pnlPercent: int("pnlPercent").notNull(), // P&L as percentage (multiply by 10000, e.g., 1.5% = 15000)
+    runUp: int("runUp"), // Max favorable excursion (MFE) in cents, null if the source had none
+    runUpPercent: int("runUpPercent"), // MFE percentage (multiply by 10000)
+    drawdown: int("drawdown"), // Max adverse excursion (MAE) in cents, negative
+    drawdownPercent: int("drawdownPercent"), // MAE percentage (multiply by 10000)
     commission: int("commission").default(0).notNull(), // Commission in cents
     isTest: boolean("isTest").default(false).notNull(), // Test data flag - excluded from analytics
     source: mysqlEnum("source", ["csv_import", "webhook", "manual"])
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped columnar time-series store for daily bars
+
+Each series (one benchmark symbol) is a directory of flat, fixed-width
+little-endian column files sharing one sorted date index:
+
+    data/bars/SPY/date.i32     days since 1970-01-01, strictly increasing
+    data/bars/SPY/open.i32     cents
+    data/bars/SPY/high.i32
+    data/bars/SPY/low.i32
+    data/bars/SPY/close.i32
+    data/bars/SPY/volume.i64
+
+Reads mmap the files and binary-search the date column, so a chart window
+only touches the pages it needs. Writes are append-only: value columns are
+appended first and the date column last, which makes the date column the
+commit marker - a crashed append is truncated away on the next open.
+
+Usage:
+  python scripts/bar_store.py import-json scripts/benchmark-data.json
+  python scripts/bar_store.py import-csv data/seed/spy_benchmark.csv --symbol SPY
+  python scripts/bar_store.py import-db
+  python scripts/bar_store.py range SPY 2024-01-01 2024-03-31
+  python scripts/bar_store.py info
+"""
+
+import argparse
+import csv
+import json
+import mmap
+import os
+import re
+import shutil
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmark_sources import price_to_cents, to_date
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STORE_DIR = REPO_ROOT / "data" / "bars"
+
+EPOCH = date(1970, 1, 1)
+DATE_COLUMN = "date"
+DATE_TYPECODE = "i"
+
+# Column name -> array typecode
+BAR_COLUMNS = {
+    "open": "i",
+    "high": "i",
+    "low": "i",
+    "close": "i",
+    "volume": "q",
+}
+
+FILE_SUFFIX = {"i": "i32", "q": "i64", "d": "f64"}
+
+if sys.byteorder != "little":
+    raise ImportError("bar_store files are little-endian; big-endian hosts are not supported")
+
+
+def date_to_day(value):
+    """Date -> days since 1970-01-01"""
+    return (to_date(value) - EPOCH).days
+
+
+def day_to_date(day):
+    """Days since 1970-01-01 -> date"""
+    return EPOCH + timedelta(days=int(day))
+
+
+def series_dirname(key):
+    """Filesystem-safe directory name for a series key (e.g. ^GSPC -> _GSPC)"""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(key))
+
+
+class SeriesSlice:
+    """
+    A date range of one series. Columns are zero-copy memoryviews into the
+    mmapped files and stay valid until the owning store is closed.
+    """
+
+    def __init__(self, key, days, columns):
+        self.key = key
+        self.days = days
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getitem__(self, column):
+        if column == DATE_COLUMN:
+            return self.days
+        return self.columns[column]
+
+    def dates(self):
+        return [day_to_date(day) for day in self.days]
+
+    def rows(self):
+        """Yield one dict per row with a `date` plus every column"""
+        names = list(self.columns)
+        for i, day in enumerate(self.days):
+            row = {DATE_COLUMN: day_to_date(day)}
+            for name in names:
+                row[name] = self.columns[name][i]
+            yield row
+
+    def to_numpy(self):
+        """{column: ndarray} without copying (requires numpy)"""
+        import numpy as np
+
+        arrays = {DATE_COLUMN: np.frombuffer(self.days, dtype=np.int32)}
+        for name, view in self.columns.items():
+            arrays[name] = np.frombuffer(view, dtype=view.format)
+        return arrays
+
+
+class _MappedColumn:
+    """Read-only mmap of one column file, remapped when the file grows"""
+
+    def __init__(self, path, typecode):
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = array(typecode).itemsize
+        self._mmap = None
+        self._view = None
+        self._size = -1
+
+    def view(self):
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if size != self._size:
+            self.close()
+            self._size = size
+            if size:
+                with open(self.path, "rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # Ignore a torn trailing item until the next write repairs it
+                whole = size - size % self.itemsize
+                self._view = memoryview(self._mmap)[:whole].cast(self.typecode)
+            else:
+                self._view = memoryview(array(self.typecode))
+        return self._view
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a slice; the map is released with it
+                pass
+            self._mmap = None
+        self._size = -1
+
+
+class ColumnStore:
+    """
+    A directory of date-indexed series sharing one column layout.
+
+    `columns` maps column name -> array typecode ('i' int32, 'q' int64,
+    'd' float64). The date index is always int32 days since the epoch.
+    """
+
+    def __init__(self, root, columns):
+        self.root = Path(root)
+        self.column_types = dict(columns)
+        self._mapped = {}
+
+    # ------------------------------------------------------------------ paths
+
+    def series_dir(self, key):
+        return self.root / series_dirname(key)
+
+    def column_path(self, key, column):
+        typecode = DATE_TYPECODE if column == DATE_COLUMN else self.column_types[column]
+        return self.series_dir(key) / f"{column}.{FILE_SUFFIX[typecode]}"
+
+    def keys(self):
+        if not self.root.exists():
+            return []
+        index_file = f"{DATE_COLUMN}.{FILE_SUFFIX[DATE_TYPECODE]}"
+        return sorted(
+            p.name for p in self.root.iterdir()
+            if not p.name.startswith(".") and (p / index_file).exists()
+        )
+
+    # ------------------------------------------------------------------ reads
+
+    def _column(self, key, column):
+        cache_key = (series_dirname(key), column)
+        mapped = self._mapped.get(cache_key)
+        if mapped is None:
+            typecode = DATE_TYPECODE if column == DATE_COLUMN else self.column_types[column]
+            mapped = _MappedColumn(self.column_path(key, column), typecode)
+            self._mapped[cache_key] = mapped
+        return mapped.view()
+
+    def count(self, key):
+        return len(self._column(key, DATE_COLUMN))
+
+    def last_date(self, key):
+        days = self._column(key, DATE_COLUMN)
+        return day_to_date(days[-1]) if len(days) else None
+
+    def first_date(self, key):
+        days = self._column(key, DATE_COLUMN)
+        return day_to_date(days[0]) if len(days) else None
+
+    def range(self, key, start=None, end=None, columns=None):
+        """
+        Rows with start <= date <= end (either bound may be None), located by
+        binary search over the mmapped date index: O(log n) plus the slice.
+        """
+        days = self._column(key, DATE_COLUMN)
+        lo = 0 if start is None else bisect_left(days, date_to_day(start))
+        hi = len(days) if end is None else bisect_right(days, date_to_day(end))
+        hi = max(lo, hi)
+        names = list(self.column_types) if columns is None else list(columns)
+        return SeriesSlice(
+            key,
+            days[lo:hi],
+            {name: self._column(key, name)[lo:hi] for name in names},
+        )
+
+    def read(self, key, columns=None):
+        return self.range(key, None, None, columns)
+
+    def _unmap(self, key):
+        name = series_dirname(key)
+        for cache_key in [k for k in self._mapped if k[0] == name]:
+            self._mapped.pop(cache_key).close()
+
+    def close(self):
+        for mapped in self._mapped.values():
+            mapped.close()
+        self._mapped.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----------------------------------------------------------------- writes
+
+    def _repair(self, key):
+        """
+        Undo interrupted writes: restore a series whose merge swap was cut
+        short, drop a partial trailing date, and truncate value columns left
+        longer than the date index by a crashed append.
+        """
+        series_dir = self.series_dir(key)
+        backup = series_dir.with_name(f".{series_dir.name}.old")
+        if backup.exists():
+            if series_dir.exists():
+                shutil.rmtree(backup)
+            else:
+                backup.rename(series_dir)
+
+        date_path = self.column_path(key, DATE_COLUMN)
+        size = date_path.stat().st_size if date_path.exists() else 0
+        rows = size // 4
+        if size != rows * 4:
+            # A torn date write leaves a partial int32 that no reader can cast
+            with open(date_path, "r+b") as f:
+                f.truncate(rows * 4)
+        for name, typecode in self.column_types.items():
+            path = self.column_path(key, name)
+            expected = rows * array(typecode).itemsize
+            if not path.exists():
+                if rows:
+                    raise RuntimeError(f"{path} is missing but {key} has {rows} rows")
+                continue
+            if path.stat().st_size > expected:
+                with open(path, "r+b") as f:
+                    f.truncate(expected)
+            elif path.stat().st_size < expected:
+                raise RuntimeError(f"{path} is shorter than the date index")
+        return rows
+
+    def append(self, key, rows):
+        """
+        Append rows (dicts with `date` plus every column) newer than the last
+        stored date. Older or duplicate dates are skipped, so re-running a
+        fetch is harmless. Returns the number of rows appended.
+        """
+        self.series_dir(key).mkdir(parents=True, exist_ok=True)
+        self._repair(key)
+
+        last = self.last_date(key)
+        last_day = date_to_day(last) if last else None
+
+        days = array(DATE_TYPECODE)
+        values = {name: array(typecode) for name, typecode in self.column_types.items()}
+        for row in sorted(rows, key=lambda r: to_date(r[DATE_COLUMN])):
+            day = date_to_day(row[DATE_COLUMN])
+            if last_day is not None and day <= last_day:
+                continue
+            days.append(day)
+            for name in self.column_types:
+                values[name].append(row.get(name) or 0)
+            last_day = day
+
+        if not days:
+            return 0
+
+        self._write_columns(self.series_dir(key), days, values, "ab")
+        return len(days)
+
+    def merge(self, key, rows):
+        """
+        Insert rows for dates missing anywhere in the series (gap backfill).
+        Existing dates are left untouched. The series is rewritten into a
+        temporary directory and swapped in, so readers never see a partially
+        merged series. Returns the number of rows inserted.
+        """
+        series_dir = self.series_dir(key)
+        series_dir.mkdir(parents=True, exist_ok=True)
+        self._repair(key)
+
+        current = self.read(key)
+        existing = set(current.days)
+        merged = {day: [current.columns[name][i] for name in self.column_types]
+                  for i, day in enumerate(current.days)}
+        inserted = 0
+        for row in rows:
+            day = date_to_day(row[DATE_COLUMN])
+            if day in existing:
+                continue
+            merged[day] = [row.get(name) or 0 for name in self.column_types]
+            existing.add(day)
+            inserted += 1
+        if not inserted:
+            return 0
+
+        days = array(DATE_TYPECODE, sorted(merged))
+        values = {name: array(typecode) for name, typecode in self.column_types.items()}
+        for day in days:
+            for name, value in zip(self.column_types, merged[day]):
+                values[name].append(value)
+
+        # Release our own maps of the old files before swapping directories
+        del current
+        self._unmap(key)
+
+        staging = series_dir.with_name(f".{series_dir.name}.tmp")
+        backup = series_dir.with_name(f".{series_dir.name}.old")
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir()
+        self._write_columns(staging, days, values, "wb")
+        series_dir.rename(backup)
+        staging.rename(series_dir)
+        shutil.rmtree(backup)
+        return inserted
+
+    def drop(self, key):
+        """Delete a series (used to rebuild derived series from scratch)"""
+        self._unmap(key)
+        series_dir = self.series_dir(key)
+        if series_dir.exists():
+            shutil.rmtree(series_dir)
+
+    def _write_columns(self, directory, days, values, mode):
+        """Write value columns first and the date index last: the index is the commit point"""
+        for name, column in values.items():
+            typecode = self.column_types[name]
+            with open(directory / f"{name}.{FILE_SUFFIX[typecode]}", mode) as f:
+                column.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        with open(directory / f"{DATE_COLUMN}.{FILE_SUFFIX[DATE_TYPECODE]}", mode) as f:
+            days.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class BarStore(ColumnStore):
+    """Daily OHLCV bars per benchmark symbol (prices in cents)"""
+
+    def __init__(self, root=None):
+        root = root or os.getenv("BAR_STORE_DIR") or DEFAULT_STORE_DIR
+        super().__init__(root, BAR_COLUMNS)
+
+    def append_bars(self, bars_by_symbol):
+        """Append {symbol: [bar, ...]}; returns {symbol: rows_appended}"""
+        return {symbol: self.append(symbol, bars) for symbol, bars in bars_by_symbol.items()}
+
+
+# ---------------------------------------------------------------------- CLI
+
+
+def load_json_bars(path):
+    with open(path) as f:
+        raw = json.load(f)
+    return {symbol: rows for symbol, rows in raw.items()}
+
+
+def load_csv_bars(path, symbol=None):
+    """Read spy_benchmark.csv style rows (dollar prices) into cents"""
+    bars = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            key = symbol or row.get("symbol") or "SPY"
+            bars.setdefault(key, []).append({
+                "date": row["date"],
+                "open": price_to_cents(row["open"]),
+                "high": price_to_cents(row["high"]),
+                "low": price_to_cents(row["low"]),
+                "close": price_to_cents(row["close"]),
+                "volume": int(float(row["volume"])) if row.get("volume") else 0,
+            })
+    return bars
+
+
+def load_db_bars():
+    """Export the benchmarks table, ordered by symbol and date"""
+    from benchmark_db import connect
+
+    conn = connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT symbol, date, open, high, low, close, volume FROM benchmarks ORDER BY symbol, date"
+        )
+        bars = {}
+        for symbol, day, o, h, l, c, v in cursor:
+            bars.setdefault(symbol, []).append(
+                {"date": day, "open": o, "high": h, "low": l, "close": c, "volume": v or 0}
+            )
+        cursor.close()
+        return bars
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped benchmark bar store")
+    parser.add_argument("--store", default=None, help="Store directory (default $BAR_STORE_DIR or data/bars)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import-json", help="Append bars from a benchmark-data.json file")
+    p.add_argument("path")
+    p = sub.add_parser("import-csv", help="Append bars from a spy_benchmark.csv style file")
+    p.add_argument("path")
+    p.add_argument("--symbol", default=None, help="Store under this symbol instead of the CSV's column")
+    sub.add_parser("import-db", help="Append bars from the benchmarks table")
+    p = sub.add_parser("range", help="Print bars in a date range")
+    p.add_argument("symbol")
+    p.add_argument("start", nargs="?")
+    p.add_argument("end", nargs="?")
+    sub.add_parser("info", help="List stored series")
+
+    args = parser.parse_args()
+
+    with BarStore(args.store) as store:
+        if args.command in ("import-json", "import-csv", "import-db"):
+            if args.command == "import-json":
+                bars = load_json_bars(args.path)
+            elif args.command == "import-csv":
+                bars = load_csv_bars(args.path, args.symbol)
+            else:
+                bars = load_db_bars()
+            for symbol, count in store.append_bars(bars).items():
+                print(f"  {symbol}: appended {count} rows ({store.count(symbol)} total)")
+        elif args.command == "range":
+            for row in store.range(args.symbol, args.start, args.end).rows():
+                print(",".join(str(row[c]) for c in ["date", *BAR_COLUMNS]))
+        else:
+            for key in store.keys():
+                print(f"  {key}: {store.count(key)} rows ({store.first_date(key)} to {store.last_date(key)})")
+
+
+if __name__ == "__main__":
+    main()
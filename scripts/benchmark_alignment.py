@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Precompute benchmark-aligned returns and rolling beta/alpha/correlation
+
+Runs after each benchmark update. For every configured benchmark it stores
+daily simple and log returns plus the cumulative index level (growth of 1,
+the same shape calculateBenchmarkEquityCurve() builds per request). For
+every strategy x benchmark pair it stores the strategy equity forward-filled
+onto benchmark trading days (what forwardFillEquityCurve() does per request),
+both daily return series, and rolling 63- and 252-day beta, annualized alpha
+and correlation.
+
+Output (ColumnStore series, float64 columns):
+  data/derived/benchmark_returns/<SYMBOL>/            ret, log_ret, level
+  data/derived/aligned/<STRATEGY>__<SYMBOL>/          equity, strategy_ret, benchmark_ret,
+                                                      beta_63, alpha_63, corr_63,
+                                                      beta_252, alpha_252, corr_252
+
+Updates are incremental: only days after each series' last stored date are
+computed, reusing the stored tail as rolling-window context. A series is
+rebuilt from scratch when its history no longer matches its inputs (a
+backfilled benchmark hole or re-seeded trades), or with --full.
+
+Usage:
+  python scripts/benchmark_alignment.py              # trades from the database
+  python scripts/benchmark_alignment.py --from-csv   # trades from data/seed/trades.csv
+  python scripts/benchmark_alignment.py --full
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from bar_store import REPO_ROOT, BarStore, ColumnStore, date_to_day, day_to_date
+from benchmark_db import connect, parse_benchmarks
+from trade_data import STARTING_CAPITAL, TRADES_CSV, daily_pnl_from_csv, daily_pnl_from_db
+from trading_calendar import TRADING_DAYS_PER_YEAR
+
+DERIVED_DIR = REPO_ROOT / "data" / "derived"
+
+ROLLING_WINDOWS = (63, 252)
+
+RETURN_COLUMNS = {"ret": "d", "log_ret": "d", "level": "d"}
+
+ALIGNED_COLUMNS = {"equity": "d", "strategy_ret": "d", "benchmark_ret": "d"}
+for _window in ROLLING_WINDOWS:
+    ALIGNED_COLUMNS.update({f"beta_{_window}": "d", f"alpha_{_window}": "d", f"corr_{_window}": "d"})
+
+
+def derived_root():
+    return os.getenv("DERIVED_DIR") or DERIVED_DIR
+
+
+def aligned_key(strategy, benchmark):
+    return f"{strategy}__{benchmark}"
+
+
+def rolling_stats(strategy_ret, benchmark_ret, window):
+    """
+    Rolling beta, annualized alpha and correlation of strategy vs benchmark.
+    Rows before the first full window (or with a NaN inside the window) are NaN.
+    """
+    n = len(strategy_ret)
+    beta = np.full(n, np.nan)
+    alpha = np.full(n, np.nan)
+    corr = np.full(n, np.nan)
+    if n < window:
+        return beta, alpha, corr
+
+    x = np.lib.stride_tricks.sliding_window_view(strategy_ret, window)
+    y = np.lib.stride_tricks.sliding_window_view(benchmark_ret, window)
+    mean_x = x.mean(axis=1)
+    mean_y = y.mean(axis=1)
+    dx = x - mean_x[:, None]
+    dy = y - mean_y[:, None]
+    cov = (dx * dy).sum(axis=1) / (window - 1)
+    var_x = (dx * dx).sum(axis=1) / (window - 1)
+    var_y = (dy * dy).sum(axis=1) / (window - 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = np.where(var_y > 0, cov / var_y, np.nan)
+        c = np.where((var_x > 0) & (var_y > 0), cov / np.sqrt(var_x * var_y), np.nan)
+    beta[window - 1:] = b
+    alpha[window - 1:] = (mean_x - b * mean_y) * TRADING_DAYS_PER_YEAR
+    corr[window - 1:] = c
+    return beta, alpha, corr
+
+
+def _rows(days, columns):
+    """Column arrays -> ColumnStore.append rows"""
+    names = list(columns)
+    return [
+        dict(date=day_to_date(day), **{name: float(columns[name][i]) for name in names})
+        for i, day in enumerate(days)
+    ]
+
+
+def update_benchmark_returns(bars, returns_store, symbol, full=False):
+    """Append returns for bars newer than the last stored row. Returns rows added."""
+    source = bars.read(symbol, columns=["close"]).to_numpy()
+    days, close = source["date"], source["close"].astype(np.float64)
+    if not len(days):
+        return 0
+
+    stored = returns_store.count(symbol)
+    last = returns_store.last_date(symbol)
+    start = 0
+    if last is not None and not full:
+        start = int(np.searchsorted(days, date_to_day(last), side="right"))
+        if stored != start:
+            # The bar history changed underneath us (e.g. a backfilled hole)
+            full = True
+    if full:
+        returns_store.drop(symbol)
+        start = 0
+    if start >= len(days):
+        return 0
+
+    new_close = close[start:]
+    previous = np.concatenate(([close[start - 1]] if start else [np.nan], new_close[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = new_close / previous - 1
+        log_ret = np.log(new_close / previous)
+    level = new_close / close[0]
+
+    rows = _rows(days[start:], {"ret": ret, "log_ret": log_ret, "level": level})
+    return returns_store.append(symbol, rows)
+
+
+def strategy_equity_on(days, pnl_by_day, capital=STARTING_CAPITAL):
+    """
+    Equity (dollars) at the close of each benchmark day: capital plus every
+    P&L with an exit on or before that day - a forward fill onto the
+    benchmark calendar, matching calculateEquityCurve()/forwardFillEquityCurve().
+    """
+    pnl_days = np.array(sorted(pnl_by_day), dtype=np.int64)
+    cumulative = np.cumsum([pnl_by_day[day] for day in pnl_days]) / 100.0
+    index = np.searchsorted(pnl_days, days, side="right")
+    return capital + np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0.0)
+
+
+def update_aligned(pnl_by_day, bench_days, bench_ret, aligned_store, key, full=False):
+    """
+    Append aligned rows for benchmark days after the last stored row.
+    The series starts on the last benchmark day before the first exit, at
+    STARTING_CAPITAL. Returns rows added.
+    """
+    if not pnl_by_day or not len(bench_days):
+        return 0
+    first_exit = min(pnl_by_day)
+    origin = max(int(np.searchsorted(bench_days, first_exit, side="left")) - 1, 0)
+
+    last = aligned_store.last_date(key)
+    start = origin
+    if last is not None and not full:
+        start = int(np.searchsorted(bench_days, date_to_day(last), side="right"))
+        tail = aligned_store.range(key, last, last, columns=["equity"]).to_numpy()["equity"]
+        expected_equity = strategy_equity_on(bench_days[start - 1:start], pnl_by_day)
+        if aligned_store.count(key) != start - origin or not np.allclose(tail, expected_equity):
+            full = True
+    if full:
+        aligned_store.drop(key)
+        start = origin
+    if start >= len(bench_days):
+        return 0
+
+    # Recompute the previous max_window rows as rolling-window context; only new rows are stored
+    max_window = max(ROLLING_WINDOWS)
+    context_start = max(start - max_window, origin)
+    days = bench_days[context_start:]
+    equity = strategy_equity_on(days, pnl_by_day)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strategy_ret = np.concatenate(([np.nan], equity[1:] / equity[:-1] - 1))
+    benchmark_ret = bench_ret[context_start:]
+
+    columns = {"equity": equity, "strategy_ret": strategy_ret, "benchmark_ret": benchmark_ret}
+    for window in ROLLING_WINDOWS:
+        beta, alpha, corr = rolling_stats(strategy_ret, benchmark_ret, window)
+        columns[f"beta_{window}"] = beta
+        columns[f"alpha_{window}"] = alpha
+        columns[f"corr_{window}"] = corr
+
+    keep = start - context_start
+    rows = _rows(days[keep:], {name: values[keep:] for name, values in columns.items()})
+    return aligned_store.append(key, rows)
+
+
+def run_alignment(pnl_by_strategy, benchmarks, bars, root=None, full=False, log=print):
+    """Refresh every benchmark return series and strategy x benchmark pair"""
+    root = root or derived_root()
+    with ColumnStore(os.path.join(root, "benchmark_returns"), RETURN_COLUMNS) as returns_store, \
+            ColumnStore(os.path.join(root, "aligned"), ALIGNED_COLUMNS) as aligned_store:
+        for symbol in benchmarks:
+            added = update_benchmark_returns(bars, returns_store, symbol, full)
+            series = returns_store.read(symbol, columns=["ret"]).to_numpy()
+            bench_days = series["date"].astype(np.int64)
+            bench_ret = series["ret"].copy()
+            log(f"  {symbol}: +{added} return rows ({len(bench_days)} total)")
+
+            for strategy, pnl_by_day in sorted(pnl_by_strategy.items()):
+                key = aligned_key(strategy, symbol)
+                added = update_aligned(pnl_by_day, bench_days, bench_ret, aligned_store, key, full)
+                if added:
+                    log(f"    {key}: +{added} aligned rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute benchmark-aligned returns and rolling betas")
+    parser.add_argument("--from-csv", nargs="?", const=str(TRADES_CSV), default=None,
+                        help="Read trades from a normalized trades.csv instead of the database")
+    parser.add_argument("--full", action="store_true", help="Rebuild every series from scratch")
+    args = parser.parse_args()
+
+    benchmarks = parse_benchmarks()
+    try:
+        if args.from_csv:
+            pnl = daily_pnl_from_csv(args.from_csv)
+        else:
+            conn = connect()
+            try:
+                pnl = daily_pnl_from_db(conn)
+            finally:
+                conn.close()
+        with BarStore() as bars:
+            run_alignment(pnl, benchmarks, bars, full=args.full)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
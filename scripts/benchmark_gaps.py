@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark gap detection and targeted backfill
+
+The update job only looks at each symbol's latest stored date, so holes
+inside the history (missed cron runs, partial API responses) are never
+repaired. This script compares the stored dates of every configured
+benchmark against the exchange trading calendar (trading_calendar.py),
+coalesces the missing days into the fewest contiguous ranges, and with
+--repair fetches only those ranges - batching symbols that share a window
+into a single request.
+
+Usage:
+  python scripts/benchmark_gaps.py                 # report gaps from the bar store
+  python scripts/benchmark_gaps.py --from-db       # read stored dates from MySQL
+  python scripts/benchmark_gaps.py --repair        # backfill into MySQL and the bar store
+
+Configuration comes from the same environment variables as update-benchmark.py
+(DATABASE_URL, BENCHMARK_SYMBOLS, BENCHMARK_SOURCE, BAR_STORE_DIR).
+"""
+
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+from bar_store import BarStore, date_to_day, day_to_date
+from benchmark_db import connect, parse_benchmarks, upsert_bars
+from benchmark_sources import get_source, to_date
+from trading_calendar import get_trading_calendar
+
+
+def stored_days_from_store(store, symbols):
+    """{symbol: sorted day numbers} straight from the mmapped date index"""
+    return {symbol: store.read(symbol, columns=[]).days for symbol in symbols}
+
+
+def stored_days_from_db(conn, symbols):
+    """{symbol: sorted day numbers} from one query over the benchmarks table"""
+    symbols = list(symbols)
+    days = {symbol: [] for symbol in symbols}
+    placeholders = ", ".join(["%s"] * len(symbols))
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"SELECT symbol, date FROM benchmarks WHERE symbol IN ({placeholders}) ORDER BY symbol, date",
+            symbols,
+        )
+        for symbol, day in cursor:
+            days[symbol].append(date_to_day(day))
+    finally:
+        cursor.close()
+    return days
+
+
+def find_gaps(stored_days, calendar, start=None, end=None):
+    """
+    Missing trading days for one symbol, as inclusive (first, last) date ranges.
+
+    Runs of missing days that are adjacent in the trading calendar form one
+    range, so a missed week that spans a weekend or holiday is one gap.
+    Defaults to scanning from the first to the last stored date.
+    """
+    if not len(stored_days) and (start is None or end is None):
+        return []
+    start = to_date(start) if start is not None else day_to_date(stored_days[0])
+    end = to_date(end) if end is not None else day_to_date(stored_days[-1])
+
+    expected = calendar.trading_day_numbers(start, end)
+    present = set(stored_days)
+
+    gaps = []
+    run_start = run_end = None
+    previous_index = None
+    for index, day in enumerate(expected):
+        if day in present:
+            continue
+        if run_start is not None and index == previous_index + 1:
+            run_end = day
+        else:
+            if run_start is not None:
+                gaps.append((day_to_date(run_start), day_to_date(run_end)))
+            run_start = run_end = day
+        previous_index = index
+    if run_start is not None:
+        gaps.append((day_to_date(run_start), day_to_date(run_end)))
+    return gaps
+
+
+def plan_backfill(gaps_by_symbol, slack_days=0):
+    """
+    Group per-symbol gaps into batched requests.
+
+    Windows that overlap or sit within `slack_days` calendar days of each
+    other are fetched together with the union of their tickers. With the
+    default slack of 0 only overlapping/touching windows are merged, so no
+    extra days are downloaded for a single symbol.
+
+    Returns [(symbols, first_date, last_date), ...] with inclusive dates.
+    """
+    intervals = sorted(
+        (first, last, symbol)
+        for symbol, gaps in gaps_by_symbol.items()
+        for first, last in gaps
+    )
+    requests = []
+    for first, last, symbol in intervals:
+        if requests and first <= requests[-1][2] + timedelta(days=slack_days + 1):
+            symbols, req_first, req_last = requests[-1]
+            if symbol not in symbols:
+                symbols.append(symbol)
+            requests[-1] = (symbols, req_first, max(req_last, last))
+        else:
+            requests.append(([symbol], first, last))
+    return requests
+
+
+def backfill(requests, gaps_by_symbol, benchmarks, source, calendar, log=print):
+    """
+    Run the planned requests and keep only bars for days that were missing.
+    Returns {symbol: [bar, ...]}.
+    """
+    missing = {
+        symbol: {day for first, last in gaps for day in calendar.trading_day_numbers(first, last)}
+        for symbol, gaps in gaps_by_symbol.items()
+    }
+    bars_by_symbol = {symbol: [] for symbol in gaps_by_symbol}
+    for symbols, first, last in requests:
+        tickers = [benchmarks[symbol] for symbol in symbols]
+        log(f"  Fetching {', '.join(symbols)} for {first} to {last}")
+        fetched = source.download(tickers, first, last + timedelta(days=1))
+        for symbol in symbols:
+            for bar in fetched.get(benchmarks[symbol], []):
+                if date_to_day(bar['date']) in missing[symbol]:
+                    bars_by_symbol[symbol].append(bar)
+    return bars_by_symbol
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and backfill gaps in benchmark history")
+    parser.add_argument("--from-db", action="store_true", help="Scan the benchmarks table instead of the bar store")
+    parser.add_argument("--repair", action="store_true", help="Fetch the missing ranges and write them back")
+    parser.add_argument("--start", default=None, help="Scan from this date (default: first stored date)")
+    parser.add_argument("--end", default=None, help="Scan to this date (default: last stored date)")
+    parser.add_argument("--slack-days", type=int, default=0,
+                        help="Merge request windows this many calendar days apart (fewer requests, more data)")
+    args = parser.parse_args()
+
+    benchmarks = parse_benchmarks()
+    calendar = get_trading_calendar('NYSE')
+    store = BarStore()
+    conn = None
+
+    try:
+        started = time.perf_counter()
+        if args.from_db:
+            conn = connect()
+            stored = stored_days_from_db(conn, benchmarks)
+        else:
+            stored = stored_days_from_store(store, benchmarks)
+
+        gaps_by_symbol = {}
+        for symbol, days in stored.items():
+            gaps = find_gaps(days, calendar, args.start, args.end)
+            missing = sum(calendar.get_trading_days_between(first, last) for first, last in gaps)
+            print(f"  {symbol}: {len(days)} stored days, {missing} missing in {len(gaps)} range(s)")
+            for first, last in gaps:
+                print(f"    {first} -> {last}")
+            if gaps:
+                gaps_by_symbol[symbol] = gaps
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"Integrity check finished in {elapsed_ms:.1f} ms")
+
+        if not gaps_by_symbol:
+            print("No gaps found")
+            return
+        if not args.repair:
+            sys.exit(2)
+
+        requests = plan_backfill(gaps_by_symbol, args.slack_days)
+        print(f"Backfilling {len(gaps_by_symbol)} symbol(s) with {len(requests)} request(s)...")
+        bars_by_symbol = backfill(requests, gaps_by_symbol, benchmarks, get_source(), calendar)
+
+        if conn is None:
+            conn = connect()
+        written = upsert_bars(conn, bars_by_symbol)
+        print(f"Wrote {written} benchmark rows in one transaction")
+        for symbol, bars in bars_by_symbol.items():
+            inserted = store.merge(symbol, bars)
+            print(f"  {symbol}: merged {inserted} rows into the bar store")
+
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Resident benchmark update scheduler
+
+Alternative to launching update-benchmark.py from cron. The process stays up
+with pandas/yfinance already imported and a warm MySQL connection pool, and
+runs the benchmark update (plus the alignment stage) shortly after every
+exchange close, so steady-state latency after the close is just the fetch
+and write.
+
+- Triggers at the close of each trading day (trading_calendar.py) plus a
+  fixed delay and random jitter, in America/New_York time
+- Overlapping triggers are coalesced: while a run is in progress at most one
+  follow-up run is queued
+- Last-run timing and status are written to a JSON health file and, with
+  --health-port, served over HTTP at /health
+
+Usage:
+  python scripts/benchmark_scheduler.py
+  python scripts/benchmark_scheduler.py --run-now --health-port 8790
+
+Configuration comes from the same environment variables as update-benchmark.py.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+from datetime import datetime, time as dt_time, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from bar_store import REPO_ROOT, BarStore
+from benchmark_alignment import run_alignment
+from benchmark_db import parse_benchmarks, parse_database_url, update_benchmarks
+from benchmark_sources import get_source
+from trade_data import daily_pnl_from_db
+from trading_calendar import get_trading_calendar
+
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+MARKET_CLOSE = dt_time(16, 0)
+
+DEFAULT_DELAY_MINUTES = 20  # give the data vendor time to publish the final bar
+DEFAULT_JITTER_SECONDS = 300
+DEFAULT_HEALTH_FILE = REPO_ROOT / "logs" / "benchmark-scheduler.json"
+POOL_SIZE = 2
+
+
+def next_trigger(now, calendar, delay=timedelta(minutes=DEFAULT_DELAY_MINUTES)):
+    """Next trading-day close + delay strictly after `now` (aware datetime)"""
+    local = now.astimezone(EXCHANGE_TZ)
+    day = local.date()
+    while True:
+        if calendar.is_market_open(day):
+            trigger = datetime.combine(day, MARKET_CLOSE, tzinfo=EXCHANGE_TZ) + delay
+            if trigger > local:
+                return trigger
+        day += timedelta(days=1)
+
+
+def last_closed_session(now, calendar, delay=timedelta(minutes=DEFAULT_DELAY_MINUTES)):
+    """Latest trading day whose close + delay is at or before `now` (aware datetime)"""
+    local = now.astimezone(EXCHANGE_TZ)
+    day = local.date()
+    if datetime.combine(day, MARKET_CLOSE, tzinfo=EXCHANGE_TZ) + delay > local:
+        day -= timedelta(days=1)
+    while not calendar.is_market_open(day):
+        day -= timedelta(days=1)
+    return day
+
+
+class HealthState:
+    """Last-run bookkeeping, persisted to a JSON file on every change"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.state = {
+            "pid": os.getpid(),
+            "startedAt": datetime.now().isoformat(),
+            "status": "idle",
+            "running": False,
+            "runs": 0,
+            "failures": 0,
+            "coalesced": 0,
+            "lastRun": None,
+            "nextRunAt": None,
+        }
+
+    def update(self, **fields):
+        self.state.update(fields)
+        self.write()
+
+    def write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2, default=str)
+        os.replace(tmp, self.path)
+
+
+class BenchmarkScheduler:
+    """Keeps libraries, the data source and a connection pool warm between runs"""
+
+    def __init__(self, health, delay_minutes=DEFAULT_DELAY_MINUTES, jitter_seconds=DEFAULT_JITTER_SECONDS):
+        import mysql.connector.pooling
+
+        self.benchmarks = parse_benchmarks()
+        self.source = get_source()
+        self.store = None if os.getenv("BAR_STORE_DIR") == "off" else BarStore()
+        self.pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name="benchmark_scheduler",
+            pool_size=POOL_SIZE,
+            **parse_database_url(os.environ["DATABASE_URL"]),
+        )
+        self.calendar = get_trading_calendar("NYSE")
+        self.delay = timedelta(minutes=delay_minutes)
+        self.jitter_seconds = jitter_seconds
+        self.health = health
+        self._lock = asyncio.Lock()
+        self._pending = False
+        # The event loop only keeps weak references to tasks; hold them until done
+        self._tasks = set()
+
+    def spawn(self, reason):
+        """Start trigger() in the background without letting the task be collected"""
+        task = asyncio.create_task(self.trigger(reason))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _run_job(self):
+        """Blocking update + alignment, executed in a worker thread"""
+        conn = self.pool.get_connection()
+        try:
+            conn.ping(reconnect=True, attempts=3, delay=1)
+            # Fetch through the session that just closed, not only up to yesterday
+            as_of = last_closed_session(datetime.now(EXCHANGE_TZ), self.calendar, self.delay)
+            written = update_benchmarks(conn, self.source, self.benchmarks, as_of=as_of, store=self.store)
+            if self.store is not None:
+                run_alignment(daily_pnl_from_db(conn), self.benchmarks, self.store)
+            return written
+        finally:
+            conn.close()  # returns the connection to the pool
+
+    async def trigger(self, reason):
+        """Run now, or queue a single follow-up if a run is already in progress"""
+        if self._lock.locked():
+            self._pending = True
+            self.health.update(coalesced=self.health.state["coalesced"] + 1)
+            print(f"[{datetime.now().isoformat()}] Run in progress; coalescing trigger ({reason})")
+            return
+
+        async with self._lock:
+            while True:
+                self._pending = False
+                await self._run_once(reason)
+                if not self._pending:
+                    break
+                reason = "coalesced"
+
+    async def _run_once(self, reason):
+        started_at = datetime.now()
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        self.health.update(status="running", running=True)
+        print(f"[{started_at.isoformat()}] Benchmark update started ({reason})")
+
+        run = {"reason": reason, "startedAt": started_at.isoformat()}
+        try:
+            written = await asyncio.to_thread(self._run_job)
+            run.update(status="ok", rowsWritten=written)
+        except Exception as e:
+            run.update(status="error", error=str(e))
+            self.health.state["failures"] += 1
+            print(f"ERROR: {e}")
+
+        run.update(
+            finishedAt=datetime.now().isoformat(),
+            durationSeconds=round(time.perf_counter() - started, 3),
+            cpuSeconds=round(time.process_time() - cpu_started, 3),
+        )
+        self.health.update(
+            status=run["status"],
+            running=False,
+            runs=self.health.state["runs"] + 1,
+            lastRun=run,
+        )
+        print(f"[{datetime.now().isoformat()}] Benchmark update {run['status']} in {run['durationSeconds']}s")
+
+    async def run_forever(self, run_now=False):
+        if run_now:
+            await self.trigger("startup")
+        while True:
+            trigger_at = next_trigger(datetime.now(EXCHANGE_TZ), self.calendar, self.delay)
+            trigger_at += timedelta(seconds=random.uniform(0, self.jitter_seconds))
+            self.health.update(nextRunAt=trigger_at.isoformat())
+            print(f"Next benchmark update at {trigger_at.isoformat()}")
+
+            wait = (trigger_at - datetime.now(EXCHANGE_TZ)).total_seconds()
+            await asyncio.sleep(max(wait, 0))
+            # Don't block the schedule on a slow run; trigger() coalesces overlaps
+            self.spawn("market close")
+            await asyncio.sleep(1)
+
+    async def close(self):
+        """Wait for in-flight triggers, then release the bar store"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.store is not None:
+            self.store.close()
+
+
+async def serve_health(health, port):
+    """Minimal HTTP endpoint: GET /health returns the health JSON"""
+
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.split(b" ")[1] if request_line.count(b" ") >= 2 else b"/"
+            if path.rstrip(b"/") in (b"", b"/health"):
+                body = json.dumps(health.state, default=str).encode()
+                ok = health.state.get("lastRun") is None or health.state["lastRun"]["status"] == "ok"
+                status = b"200 OK" if ok else b"503 Service Unavailable"
+            else:
+                body, status = b'{"error":"not found"}', b"404 Not Found"
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\nContent-Type: application/json\r\n"
+                + b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", port)
+
+
+async def amain(args):
+    health = HealthState(args.health_file)
+    scheduler = BenchmarkScheduler(health, args.delay_minutes, args.jitter_seconds)
+    server = await serve_health(health, args.health_port) if args.health_port else None
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    # SIGHUP forces an immediate (coalesced) run
+    loop.add_signal_handler(signal.SIGHUP, lambda: scheduler.spawn("SIGHUP"))
+
+    runner = asyncio.create_task(scheduler.run_forever(args.run_now))
+    await stop.wait()
+    runner.cancel()
+    if server is not None:
+        server.close()
+    await scheduler.close()
+    health.update(status="stopped", running=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident benchmark update scheduler")
+    parser.add_argument("--run-now", action="store_true", help="Run one update immediately on startup")
+    parser.add_argument("--delay-minutes", type=int, default=DEFAULT_DELAY_MINUTES,
+                        help="Minutes after the close before updating")
+    parser.add_argument("--jitter-seconds", type=int, default=DEFAULT_JITTER_SECONDS,
+                        help="Random extra delay so several instances don't hit the source at once")
+    parser.add_argument("--health-file", default=os.getenv("BENCHMARK_HEALTH_FILE", DEFAULT_HEALTH_FILE))
+    parser.add_argument("--health-port", type=int, default=None, help="Serve GET /health on 127.0.0.1:PORT")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        print("ERROR: DATABASE_URL environment variable not set")
+        sys.exit(1)
+
+    asyncio.run(amain(args))
+
+
+if __name__ == "__main__":
+    main()
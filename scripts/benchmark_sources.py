@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark data sources
+
+A source turns (tickers, start, end) into daily bars for every ticker in a
+single call. Bars are dicts keyed like the rows in benchmark-data.json, with
+prices already converted to cents:
+
+    {'date': date, 'open': int, 'high': int, 'low': int, 'close': int, 'volume': int}
+
+YFinanceSource is the production source. LocalFileSource replays a
+benchmark-data.json style file and stands in for the network in tests and
+dry runs.
+"""
+
+import json
+import math
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+from fixed_point import to_cents
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_STUB_FILE = SCRIPTS_DIR / "benchmark-data.json"
+
+
+def to_date(value):
+    """Coerce a date, datetime, pandas Timestamp or YYYY-MM-DD string to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if hasattr(value, 'date'):
+        return value.date()
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def price_to_cents(value):
+    """Convert a price in dollars (text or float) to integer cents without float rounding"""
+    return to_cents(value)
+
+
+class YFinanceSource:
+    """Fetch daily bars for many tickers with one yfinance download call"""
+
+    name = "yfinance"
+
+    def __init__(self, threads=True):
+        # Imported lazily so the stub source works without yfinance installed
+        import yfinance as yf
+        self.yf = yf
+        self.threads = threads
+
+    def download(self, tickers, start, end):
+        """
+        Download [start, end) for every ticker in one batched request.
+        Returns {ticker: [bar, ...]} sorted by date; tickers with no data map to [].
+        """
+        tickers = list(dict.fromkeys(tickers))
+        result = {ticker: [] for ticker in tickers}
+        if not tickers or start >= end:
+            return result
+
+        frame = self.yf.download(
+            tickers=tickers,
+            start=start,
+            end=end,
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            actions=False,
+            progress=False,
+            threads=self.threads,
+        )
+        if frame is None or frame.empty:
+            return result
+
+        multi = getattr(frame.columns, 'nlevels', 1) > 1
+        for ticker in tickers:
+            if multi:
+                if ticker not in frame.columns.get_level_values(0):
+                    continue
+                data = frame[ticker]
+            else:
+                data = frame
+            data = data.dropna(subset=['Open', 'High', 'Low', 'Close'])
+            bars = []
+            for index, row in data.iterrows():
+                volume = row.get('Volume')
+                if volume is None or math.isnan(volume):
+                    volume = 0
+                bars.append({
+                    'date': to_date(index),
+                    'open': price_to_cents(row['Open']),
+                    'high': price_to_cents(row['High']),
+                    'low': price_to_cents(row['Low']),
+                    'close': price_to_cents(row['Close']),
+                    'volume': int(volume),
+                })
+            result[ticker] = bars
+        return result
+
+
+class LocalFileSource:
+    """
+    Serve bars from a benchmark-data.json style file ({symbol: [bar, ...]})
+    Prices in the file are already in cents. Every download() is recorded in
+    `calls` so tests can assert how many requests a job made.
+    """
+
+    name = "file"
+
+    def __init__(self, path=DEFAULT_STUB_FILE):
+        self.path = Path(path)
+        with open(self.path) as f:
+            raw = json.load(f)
+        self.series = {}
+        for symbol, rows in raw.items():
+            bars = [{
+                'date': to_date(row['date']),
+                'open': int(row['open']),
+                'high': int(row['high']),
+                'low': int(row['low']),
+                'close': int(row['close']),
+                'volume': int(row.get('volume') or 0),
+            } for row in rows]
+            bars.sort(key=lambda bar: bar['date'])
+            self.series[symbol] = bars
+        self.calls = []
+
+    def download(self, tickers, start, end):
+        tickers = list(dict.fromkeys(tickers))
+        self.calls.append((tuple(tickers), to_date(start), to_date(end)))
+        start, end = to_date(start), to_date(end)
+        return {
+            ticker: [bar for bar in self.series.get(ticker, []) if start <= bar['date'] < end]
+            for ticker in tickers
+        }
+
+
+def get_source(spec=None):
+    """
+    Build a source from a spec string (defaults to $BENCHMARK_SOURCE):
+      "yfinance"            -> YFinanceSource
+      "file" / "file:PATH"  -> LocalFileSource (defaults to scripts/benchmark-data.json)
+    """
+    spec = spec or os.getenv('BENCHMARK_SOURCE', 'yfinance')
+    kind, _, arg = spec.partition(':')
+    if kind == 'yfinance':
+        return YFinanceSource()
+    if kind == 'file':
+        return LocalFileSource(arg or DEFAULT_STUB_FILE)
+    raise ValueError(f"Unknown benchmark source: {spec}")
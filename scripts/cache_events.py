@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Cache invalidation change sets
+
+The server caches analytics per strategy and time range (server/cache.ts).
+Rather than flushing everything or waiting out a TTL after new data lands,
+jobs that write to the database publish a change set - which strategies and
+benchmarks changed, and over which dates - and the server
+(server/cacheEvents.ts) evicts only the cache keys those dates can reach.
+
+The queue is a spool directory: one JSON file per change set, written to a
+dot-prefixed temp name and renamed into place so the server never reads a
+partial file. The server deletes each file once applied.
+
+  {"source": "update-benchmark", "createdAt": "2026-01-05T21:30:02Z",
+   "strategies": {"ESTrend": {"start": "2025-12-30", "end": "2026-01-02"}},
+   "benchmarks": {"SPY": {"start": "2026-01-02", "end": "2026-01-05"}}}
+
+A start of null means "from the first stored day".
+
+Configuration (environment):
+  CACHE_EVENTS_DIR   Spool directory (default $DERIVED_DIR/cache_events);
+                     set CACHE_EVENTS_DIR=off to stop publishing
+"""
+
+import json
+import os
+import uuid
+from datetime import date, datetime, timezone
+
+from bar_store import REPO_ROOT
+
+EVENTS_DIR = "cache_events"
+
+
+def events_dir():
+    # Same default root as benchmark_alignment.derived_root(), which imports benchmark_db
+    derived = os.getenv("DERIVED_DIR") or REPO_ROOT / "data" / "derived"
+    return os.getenv("CACHE_EVENTS_DIR") or os.path.join(derived, EVENTS_DIR)
+
+
+def _iso(value):
+    if value is None:
+        return None
+    return value.date().isoformat() if isinstance(value, datetime) else date.fromisoformat(str(value)[:10]).isoformat()
+
+
+def date_span(dates):
+    """(first, last) of an iterable of dates/datetimes/ISO strings, or None if empty"""
+    days = sorted(_iso(d) for d in dates)
+    return (days[0], days[-1]) if days else None
+
+
+def publish_change_set(source, strategies=None, benchmarks=None, directory=None):
+    """
+    Spool a change set for the server. `strategies` and `benchmarks` map a
+    symbol to its changed (start, end) dates; start may be None.
+    Returns the written path, or None when nothing changed or publishing is off.
+    """
+    spans = {
+        kind: {symbol: {"start": _iso(start), "end": _iso(end)} for symbol, (start, end) in sorted(changes.items())}
+        for kind, changes in (("strategies", strategies or {}), ("benchmarks", benchmarks or {}))
+    }
+    directory = directory or events_dir()
+    if directory == "off" or not (spans["strategies"] or spans["benchmarks"]):
+        return None
+
+    created = datetime.now(timezone.utc)
+    event = {"source": source, "createdAt": created.strftime("%Y-%m-%dT%H:%M:%SZ"), **spans}
+
+    os.makedirs(directory, exist_ok=True)
+    # Time-ordered names so the server applies change sets in publish order
+    name = f"{created.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}.json"
+    path = os.path.join(directory, name)
+    tmp = os.path.join(directory, f".{name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(event, f)
+    os.replace(tmp, path)
+    return path
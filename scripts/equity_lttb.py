@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Downsampled equity and underwater curves for chart payloads
+
+calculateEquityCurve()/forwardFillEquityCurve() send one point per day, so
+chart payloads and render times grow with history. This writes each
+strategy's (and the combined portfolio's) daily equity and underwater curves
+downsampled with Largest-Triangle-Three-Buckets at fixed resolutions, so a
+chart can ask for the resolution that fits its width.
+
+LTTB keeps the visually significant points, but not necessarily the
+extremes: the equity high and low and the peak and trough of the maximum
+drawdown are always kept (displacing a neighbouring pick when two land in
+the same bucket), so the downsampled curves report the same max drawdown
+as the full series.
+
+  equity      capital + cumulative P&L on every trading day
+  underwater  drawdown from the running P&L peak as % of base capital,
+              calculateUnderwaterCurve()'s default (unleveraged) mode
+
+Output: data/derived/equity_lttb/<strategy>.json (or $DERIVED_DIR)
+  {"points": {"500": {"equity": {"dates": [...], "values": [...]},
+                      "underwater": {...}}, ...}, "fullLength": N}
+
+Usage:
+  python scripts/equity_lttb.py
+  python scripts/equity_lttb.py --from-csv --resolutions 300,1000
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from bar_store import day_to_date
+from benchmark_alignment import derived_root
+from benchmark_db import connect
+from trade_data import STARTING_CAPITAL, TRADES_CSV, daily_pnl_from_csv, daily_pnl_from_db, daily_pnl_matrix
+
+CURVES_DIR = "equity_lttb"
+
+PORTFOLIO = "portfolio"
+
+DEFAULT_RESOLUTIONS = "500,1500,5000"
+
+
+def lttb_buckets(y, threshold):
+    """
+    Bucket boundaries and the LTTB pick per bucket for points x = 0..n-1.
+    Returns (edges, picks): bucket i covers edges[i]:edges[i+1]; the first
+    and last buckets are the single end points.
+    """
+    n = len(y)
+    edges = np.concatenate([[0], np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64), [n]])
+    picks = np.zeros(threshold, dtype=np.int64)
+    picks[-1] = n - 1
+    for i in range(1, threshold - 1):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        # Triangle between the previous pick, each candidate and the next bucket's centroid
+        ax, ay = picks[i - 1], y[picks[i - 1]]
+        cx, cy = (next_start + next_end - 1) / 2.0, y[next_start:next_end].mean()
+        xs = np.arange(start, end)
+        area = np.abs((ax - cx) * (y[start:end] - ay) - (ax - xs) * (cy - ay))
+        picks[i] = start + int(np.argmax(area))
+    return edges, picks
+
+
+def lttb(y, threshold, keep=()):
+    """
+    Sorted indices of `threshold` points chosen by LTTB, always including
+    every `keep` index. A keep index replaces its bucket's pick; when several
+    share a bucket, each extra one displaces the nearest ordinary pick.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges, picks = lttb_buckets(np.asarray(y, dtype=np.float64), threshold)
+    keep = sorted({int(index) for index in keep})
+    pinned = {0, n - 1, *keep}
+    extras = []
+    taken = set()
+    for index in keep:
+        bucket = int(np.searchsorted(edges, index, side="right")) - 1
+        if bucket in taken:
+            extras.append(index)
+        else:
+            picks[bucket] = index
+            taken.add(bucket)
+    chosen = set(picks.tolist())
+    for index in extras:
+        ordinary = [pick for pick in chosen if pick not in pinned]
+        if ordinary:
+            chosen.remove(min(ordinary, key=lambda pick: abs(pick - index)))
+        chosen.add(index)
+    return np.array(sorted(chosen), dtype=np.int64)
+
+
+def underwater_curve(equity, base_capital=STARTING_CAPITAL):
+    """Drawdown from the running P&L peak (floored at 0) as % of base capital, <= 0"""
+    pnl = equity - equity[0]
+    peak = np.maximum(np.maximum.accumulate(pnl), 0.0)
+    return -(peak - pnl) / base_capital * 100 if base_capital > 0 else np.zeros_like(pnl)
+
+
+def extremes(equity, underwater):
+    """Indices that must survive downsampling: equity high/low, max-drawdown peak and trough"""
+    trough = int(np.argmin(underwater))
+    peak = int(np.argmax(equity[:trough + 1]))
+    return sorted({int(np.argmax(equity)), int(np.argmin(equity)), peak, trough})
+
+
+def strategy_curves(days, equity, resolutions):
+    underwater = underwater_curve(equity)
+    keep = extremes(equity, underwater)
+    dates = [day_to_date(int(day)).isoformat() for day in days]
+    points = {}
+    for resolution in resolutions:
+        curves = {}
+        for name, values in (("equity", equity), ("underwater", underwater)):
+            index = lttb(values, resolution, keep)
+            curves[name] = {
+                "dates": [dates[i] for i in index],
+                "values": [round(float(v), 2 if name == "equity" else 4) for v in values[index]],
+            }
+        points[str(resolution)] = curves
+    return {
+        "fullLength": len(days),
+        "maxDrawdownPct": round(float(underwater.min()), 4),
+        "points": points,
+    }
+
+
+def write_curves(curves_by_strategy, root=None):
+    directory = os.path.join(root or derived_root(), CURVES_DIR)
+    os.makedirs(directory, exist_ok=True)
+    for strategy, curves in curves_by_strategy.items():
+        path = os.path.join(directory, f"{strategy}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(curves, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    return directory
+
+
+def build_curves(pnl_by_strategy, resolutions, capital=STARTING_CAPITAL):
+    days, strategies, matrix = daily_pnl_matrix(pnl_by_strategy)
+    if not len(days):
+        return {}
+    # Start every curve at capital on its first trading day, like the server's curves
+    equity = capital + np.cumsum(np.hstack([matrix, matrix.sum(axis=1, keepdims=True)]), axis=0) / 100.0
+    curves = {}
+    for column, strategy in enumerate(strategies + [PORTFOLIO]):
+        active = np.flatnonzero(matrix[:, column] if column < len(strategies) else matrix.any(axis=1))
+        first = active[0] if len(active) else 0
+        series = np.concatenate([[capital], equity[first:, column]])
+        series_days = np.concatenate([[days[first] - 1], days[first:]])
+        curves[strategy] = strategy_curves(series_days, series, resolutions)
+    return curves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write LTTB-downsampled equity and underwater curves")
+    parser.add_argument("--from-csv", nargs="?", const=str(TRADES_CSV), default=None,
+                        help="Read trades from a normalized trades.csv instead of the database")
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS, help="Comma-separated point counts")
+    args = parser.parse_args()
+    resolutions = sorted(int(r) for r in args.resolutions.split(","))
+
+    try:
+        if args.from_csv:
+            pnl = daily_pnl_from_csv(args.from_csv)
+        else:
+            conn = connect()
+            try:
+                pnl = daily_pnl_from_db(conn)
+            finally:
+                conn.close()
+        curves = build_curves(pnl, resolutions)
+        directory = write_curves(curves)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    for strategy, c in curves.items():
+        sizes = ", ".join(f"{r}:{len(c['points'][str(r)]['equity']['values'])}" for r in resolutions)
+        print(f"  {strategy}: {c['fullLength']} days -> {sizes}  (max DD {c['maxDrawdownPct']:.2f}%)")
+    print(f"Curves written to {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Fetch historical benchmark data for QQQ, IWM, GLD using Yahoo Finance API
-and save to JSON files for database seeding
+and save to JSON files for database seeding. New bars are also appended to
+the memory-mapped bar store (see bar_store.py).
 """
 
 import sys
@@ -10,6 +11,9 @@ from data_api import ApiClient
 import json
 from datetime import datetime, timedelta
 
+from bar_store import BarStore
+from fixed_point import to_cents
+
 def fetch_benchmark_data_by_year(symbol: str, year: int) -> list:
     """
     Fetch historical daily data for a benchmark symbol for a specific year
@@ -47,14 +51,14 @@ def fetch_benchmark_data_by_year(symbol: str, year: int) -> list:
                 if quotes['open'][i] is None or quotes['close'][i] is None:
                     continue
                 
-                # Convert prices to cents (multiply by 100)
+                # Convert prices to cents (decimal digits, no float rounding)
                 data.append({
                     'symbol': symbol,
                     'date': date.strftime('%Y-%m-%d'),
-                    'open': int(round(quotes['open'][i] * 100)),
-                    'high': int(round(quotes['high'][i] * 100)),
-                    'low': int(round(quotes['low'][i] * 100)),
-                    'close': int(round(quotes['close'][i] * 100)),
+                    'open': to_cents(quotes['open'][i]),
+                    'high': to_cents(quotes['high'][i]),
+                    'low': to_cents(quotes['low'][i]),
+                    'close': to_cents(quotes['close'][i]),
                     'volume': quotes['volume'][i] if quotes['volume'][i] else 0
                 })
             
@@ -108,14 +112,14 @@ def fetch_all_benchmark_data(symbol: str) -> list:
                         if quotes['open'][i] is None or quotes['close'][i] is None:
                             continue
                         
-                        # Convert prices to cents (multiply by 100)
+                        # Convert prices to cents (decimal digits, no float rounding)
                         data.append({
                             'symbol': symbol,
                             'date': date.strftime('%Y-%m-%d'),
-                            'open': int(round(quotes['open'][i] * 100)),
-                            'high': int(round(quotes['high'][i] * 100)),
-                            'low': int(round(quotes['low'][i] * 100)),
-                            'close': int(round(quotes['close'][i] * 100)),
+                            'open': to_cents(quotes['open'][i]),
+                            'high': to_cents(quotes['high'][i]),
+                            'low': to_cents(quotes['low'][i]),
+                            'close': to_cents(quotes['close'][i]),
                             'volume': quotes['volume'][i] if quotes['volume'][i] else 0
                         })
                     
@@ -145,6 +149,10 @@ def main():
         json.dump(all_data, f)
     
     print(f"\nData saved to {output_file}")
+
+    with BarStore() as store:
+        appended = store.append_bars(all_data)
+    print(f"Appended {sum(appended.values())} new rows to the bar store")
     
     # Print summary
     print("\nSummary:")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Fixed-point money parsing
+
+Prices and P&L are stored as integer cents and percentages as integer
+percent x 10000 (1.5% = 15000, the trades.pnlPercent scale). Converting
+export text through float and back (float(text) * 100) can land a hair
+below .5 and round the wrong way (1.005 * 100 = 100.49999...), and the
+TypeScript side may round differently. These helpers scale the decimal
+digits directly, rounding half away from zero - the same rules as
+server/lib/fixedPoint.ts.
+"""
+
+import math
+import numbers
+
+CENTS_DIGITS = 2
+PERCENT_DIGITS = 4
+
+
+def parse_fixed(value, digits):
+    """
+    Decimal text (or an int/float) as an integer scaled by 10**digits.
+
+    Accepts an optional sign, thousands separators and an exponent
+    ("-1,234.5", "1e-05"). Floats (including NumPy scalars) are read through
+    their shortest float repr, so 1.005 becomes 101 cents, not 100.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"not a number: {value!r}")
+    # numbers.* covers NumPy scalars from pandas rows (np.int64, np.float64,
+    # np.float32), whose repr() is "np.float64(412.33)" under NumPy 2
+    if isinstance(value, numbers.Integral):
+        return int(value) * 10 ** digits
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(f"not a finite number: {value!r}")
+        value = float.__repr__(value)
+
+    text = str(value).strip().replace(",", "")
+    sign = -1 if text.startswith("-") else 1
+    if text[:1] in ("+", "-"):
+        text = text[1:]
+    mantissa, _, exponent = text.lower().partition("e")
+    whole, _, fraction = mantissa.partition(".")
+    number = whole + fraction
+    exponent_digits = exponent[1:] if exponent[:1] in ("+", "-") else exponent
+    if not number or not number.isdigit() or (exponent and not exponent_digits.isdigit()):
+        raise ValueError(f"not a decimal number: {value!r}")
+
+    # Position of the scaled decimal point within `number`
+    point = len(whole) + digits + (int(exponent) if exponent else 0)
+    if point >= len(number):
+        return sign * int(number + "0" * (point - len(number)))
+    if point < 0:
+        kept, rest = "0", "0" * -point + number
+    else:
+        kept, rest = number[:point] or "0", number[point:]
+    return sign * (int(kept) + (1 if rest[0] >= "5" else 0))
+
+
+def to_cents(value):
+    """Dollars ("1645.25") to integer cents (164525)"""
+    return parse_fixed(value, CENTS_DIGITS)
+
+
+def percent_to_e4(value):
+    """
+    Percent ("1.5") to the trades table's integer percent x 10000 (15000).
+    The unit is hundredths of a basis point, not basis points.
+    """
+    return parse_fixed(value, PERCENT_DIGITS)
+
+
+def optional(parse, value):
+    """parse(value), or None for an empty cell"""
+    return None if value is None or str(value).strip() == "" else parse(value)
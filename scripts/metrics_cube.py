@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Precomputed metrics cube
+
+Builds one daily P&L matrix (trading days x strategies, plus a combined
+portfolio column) from the normalized trades and evaluates every
+METRICS_DEFINITIONS.md metric for every strategy and every date-range preset
+of the dashboard (6M, YTD, 1Y, 3Y, 5Y, 10Y, ALL) - all columns of a range at
+once with numpy, instead of one equity-curve walk per (strategy, range)
+request in the server.
+
+Each range restarts from STARTING_CAPITAL at its first day, like the server,
+which filters trades to the range before building the equity curve.
+
+Output: data/derived/metrics_cube.json (or $DERIVED_DIR)
+  cube[strategy][range][metric] -> value; strategy "portfolio" is the
+  combined account. Values are decimals (0.25 = 25%) and never NaN/Inf.
+
+Usage:
+  python scripts/metrics_cube.py
+  python scripts/metrics_cube.py --from-csv
+  python scripts/metrics_cube.py --from-csv --as-of 2024-12-31
+"""
+
+import argparse
+import calendar as month_calendar
+import json
+import os
+import sys
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from bar_store import date_to_day, day_to_date
+from benchmark_alignment import derived_root
+from benchmark_db import connect
+from trade_data import STARTING_CAPITAL, TRADES_CSV, daily_pnl_from_csv, daily_pnl_from_db, daily_pnl_matrix
+from trading_calendar import TRADING_DAYS_PER_YEAR
+
+CUBE_FILE = "metrics_cube.json"
+
+PORTFOLIO = "portfolio"
+
+# TimeRange in server/routers.ts
+RANGES = ("6M", "YTD", "1Y", "3Y", "5Y", "10Y", "ALL")
+
+METRICS = (
+    "totalReturn", "annualizedReturn", "annualizedVol", "sharpe", "sortino",
+    "maxDrawdown", "calmar", "netProfit", "tradingDays",
+)
+
+
+def _months_back(day, months):
+    year, month = divmod(day.year * 12 + day.month - 1 - months, 12)
+    month += 1
+    return date(year, month, min(day.day, month_calendar.monthrange(year, month)[1]))
+
+
+def range_start(as_of, time_range):
+    """First calendar day of a preset ending at `as_of`; None for ALL"""
+    if time_range == "ALL":
+        return None
+    if time_range == "YTD":
+        return date(as_of.year, 1, 1)
+    if time_range.endswith("M"):
+        return _months_back(as_of, int(time_range[:-1]))
+    return _months_back(as_of, 12 * int(time_range[:-1]))
+
+
+def cube_metrics(pnl, capital=STARTING_CAPITAL):
+    """
+    Every metric for each column of a (days x columns) P&L matrix in cents.
+
+    The equity curve of a column is capital followed by capital plus the
+    running P&L, so N = days and the first return is the first day's.
+    Returns {metric: array of len(columns)}.
+    """
+    days, columns = pnl.shape
+    equity = np.vstack([np.full((1, columns), float(capital)), capital + np.cumsum(pnl, axis=0) / 100.0])
+    zero = np.zeros(columns)
+    if days == 0:
+        return {metric: zero.copy() for metric in METRICS}
+
+    previous = equity[:-1]
+    safe = np.where(previous == 0, 1.0, previous)
+    returns = np.where(previous == 0, 0.0, equity[1:] / safe - 1)
+
+    total = equity[-1] / equity[0] - 1
+    growth = np.maximum(1 + total, 0.0)
+    annualized = growth ** (TRADING_DAYS_PER_YEAR / days) - 1
+
+    mean = returns.mean(axis=0)
+    vol = returns.std(axis=0, ddof=1) if days >= 2 else zero
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(vol > 0, mean / vol * np.sqrt(TRADING_DAYS_PER_YEAR), 0.0)
+    if days < 2:
+        sharpe = zero
+
+    # Downside deviation: root mean square of the negative returns only
+    negative = returns < 0
+    count = negative.sum(axis=0)
+    downside = np.sqrt(np.where(negative, returns ** 2, 0.0).sum(axis=0) / np.maximum(count, 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = np.where(downside > 0, mean / downside * np.sqrt(TRADING_DAYS_PER_YEAR), 0.0)
+    sortino = np.where(count == 0, sharpe, sortino)
+    if days < 2:
+        sortino = zero
+
+    peak = np.maximum.accumulate(equity, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, equity / np.where(peak > 0, peak, 1.0) - 1, 0.0)
+    max_drawdown = np.minimum(drawdown.min(axis=0), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        calmar = np.where(max_drawdown < 0, annualized / np.abs(max_drawdown), 0.0)
+
+    result = {
+        "totalReturn": total,
+        "annualizedReturn": annualized,
+        "annualizedVol": vol * np.sqrt(TRADING_DAYS_PER_YEAR),
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "maxDrawdown": max_drawdown,
+        "calmar": calmar,
+        "netProfit": pnl.sum(axis=0) / 100.0,
+        "tradingDays": np.full(columns, float(days)),
+    }
+    return {metric: np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0) for metric, values in result.items()}
+
+
+def build_cube(pnl_by_strategy, as_of=None, capital=STARTING_CAPITAL):
+    """{strategy: {range: {metric: value}}} including the combined portfolio"""
+    days, strategies, matrix = daily_pnl_matrix(pnl_by_strategy, end=as_of)
+    matrix = np.hstack([matrix, matrix.sum(axis=1, keepdims=True)])
+    columns = strategies + [PORTFOLIO]
+    as_of = as_of or (day_to_date(int(days[-1])) if len(days) else date.today())
+
+    cube = {column: {} for column in columns}
+    for time_range in RANGES:
+        start = range_start(as_of, time_range)
+        first = np.searchsorted(days, date_to_day(start)) if start else 0
+        values = cube_metrics(matrix[first:], capital)
+        for i, column in enumerate(columns):
+            cube[column][time_range] = {metric: round(float(values[metric][i]), 10) for metric in METRICS}
+    return as_of, cube
+
+
+def write_cube(as_of, cube, root=None, capital=STARTING_CAPITAL):
+    root = root or derived_root()
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, CUBE_FILE)
+    payload = {
+        "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "asOf": as_of.isoformat(),
+        "startingCapital": capital,
+        "ranges": list(RANGES),
+        "metrics": list(METRICS),
+        "cube": cube,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute metrics for every strategy and date range")
+    parser.add_argument("--from-csv", nargs="?", const=str(TRADES_CSV), default=None,
+                        help="Read trades from a normalized trades.csv instead of the database")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="End date of every range (default: last trade day)")
+    parser.add_argument("--capital", type=float, default=STARTING_CAPITAL, help="Starting capital per range")
+    args = parser.parse_args()
+
+    try:
+        if args.from_csv:
+            pnl = daily_pnl_from_csv(args.from_csv)
+        else:
+            conn = connect()
+            try:
+                pnl = daily_pnl_from_db(conn)
+            finally:
+                conn.close()
+        as_of, cube = build_cube(pnl, args.as_of, args.capital)
+        path = write_cube(as_of, cube, capital=args.capital)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    print(f"Metrics cube as of {as_of}: {len(cube)} series x {len(RANGES)} ranges -> {path}")
+    for time_range in RANGES:
+        m = cube[PORTFOLIO][time_range]
+        print(f"  {PORTFOLIO} {time_range:>4}: return {m['totalReturn']:8.2%}  sharpe {m['sharpe']:6.2f}  "
+              f"maxDD {m['maxDrawdown']:8.2%}  days {int(m['tradingDays'])}")
+
+
+if __name__ == "__main__":
+    main()
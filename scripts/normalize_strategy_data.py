@@ -4,6 +4,10 @@ Normalize uploaded strategy CSV files into the format expected by the database s
 
 Input: Raw TradingView strategy export CSVs
 Output: Normalized trades.csv and strategies.csv for database seeding
+
+Money is parsed straight from the export text into the trades table's integer
+units (see fixed_point.py): prices, P&L, run-up and drawdown in cents,
+percentages as percent x 10000.
 """
 
 import csv
@@ -12,6 +16,11 @@ from datetime import datetime
 from pathlib import Path
 import sys
 
+from fixed_point import optional, parse_fixed, percent_to_e4, to_cents
+from pnl_cube import build_cube, write_cube
+from trade_data import trade_excursions_from_csv, trade_records_from_csv
+from trade_excursions import build_excursions, write_excursions
+
 # Strategy metadata mapping
 STRATEGY_METADATA = {
     "ESTrend": {
@@ -81,6 +90,13 @@ def extract_strategy_name(filename):
     """Extract strategy name from filename (e.g., 'ESTrend.csv' -> 'ESTrend')."""
     return Path(filename).stem
 
+def parse_price(value):
+    """Cents, or None where the export prints NAN (negative prices, e.g. CL in April 2020)."""
+    try:
+        return to_cents(value)
+    except ValueError:
+        return None
+
 def normalize_trade_row(row, strategy_id, strategy_name):
     """
     Transform a raw TradingView export row into database schema format.
@@ -89,10 +105,19 @@ def normalize_trade_row(row, strategy_id, strategy_name):
     trade_type = row['Type'].lower()
     dt_str = row['Date/Time']
     signal = row['Signal']
-    price = float(row['Price USD'])
-    quantity = float(row['Position size (qty)'])
-    pnl = float(row['Net P&L USD']) if row['Net P&L USD'] else 0.0
-    pnl_pct = float(row['Net P&L %']) if row['Net P&L %'] else 0.0
+    try:
+        price = parse_price(row['Price USD'])
+        quantity = parse_fixed(row['Position size (qty)'], 0)
+        pnl = optional(to_cents, row['Net P&L USD']) or 0
+        pnl_pct = optional(percent_to_e4, row['Net P&L %']) or 0
+        # Max favorable / adverse excursion of the trade (older exports lack these)
+        run_up = optional(to_cents, row.get('Run-up USD'))
+        run_up_pct = optional(percent_to_e4, row.get('Run-up %'))
+        drawdown = optional(to_cents, row.get('Drawdown USD'))
+        drawdown_pct = optional(percent_to_e4, row.get('Drawdown %'))
+    except ValueError as e:
+        print(f"Warning: Could not parse trade {trade_num}: {e}")
+        return None
     
     dt = parse_datetime(dt_str)
     if not dt:
@@ -119,9 +144,18 @@ def normalize_trade_row(row, strategy_id, strategy_name):
         'price': price,
         'quantity': quantity,
         'pnl': pnl,
-        'pnlPercent': pnl_pct
+        'pnlPercent': pnl_pct,
+        'runUp': run_up,
+        'runUpPercent': run_up_pct,
+        'drawdown': drawdown,
+        'drawdownPercent': drawdown_pct
     }
 
+def excursion(exit_trade, entry_trade, field):
+    """Excursion value for a round trip; both rows of a trade carry it, the exit row wins."""
+    value = exit_trade[field] if exit_trade[field] is not None else entry_trade[field]
+    return '' if value is None else value
+
 def pair_entry_exit_trades(trades):
     """
     Pair entry and exit trades into complete round-trip trades.
@@ -147,7 +181,11 @@ def pair_entry_exit_trades(trades):
                     'entryTime': entry['dateTime'],
                     'exitTime': trade['dateTime'],
                     'pnl': trade['pnl'],
-                    'pnlPercent': trade['pnlPercent']
+                    'pnlPercent': trade['pnlPercent'],
+                    'runUp': excursion(trade, entry, 'runUp'),
+                    'runUpPercent': excursion(trade, entry, 'runUpPercent'),
+                    'drawdown': excursion(trade, entry, 'drawdown'),
+                    'drawdownPercent': excursion(trade, entry, 'drawdownPercent')
                 }
                 paired_trades.append(paired)
     
@@ -214,12 +252,21 @@ def main():
     trades_output = output_dir / "trades.csv"
     if all_trades:
         fieldnames = ['strategyId', 'strategyName', 'symbol', 'side', 'quantity', 
-                     'entryPrice', 'exitPrice', 'entryTime', 'exitTime', 'pnl', 'pnlPercent']
+                     'entryPrice', 'exitPrice', 'entryTime', 'exitTime', 'pnl', 'pnlPercent',
+                     'runUp', 'runUpPercent', 'drawdown', 'drawdownPercent']
         with open(trades_output, 'w', newline='') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(all_trades)
         print(f"✓ Created {trades_output}")
+        
+        # MAE/MFE distributions and stop/target tables, so excursion analysis never rescans trades
+        excursions_output = write_excursions(build_excursions(trade_excursions_from_csv(trades_output)))
+        print(f"✓ Created {excursions_output}")
+        
+        # Hour x weekday x month x year aggregates behind the time-based breakdowns
+        cube_output = write_cube(*build_cube(trade_records_from_csv(trades_output)))
+        print(f"✓ Created {cube_output}")
     else:
         print("ERROR: No trades were processed!")
         sys.exit(1)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Hour x weekday x week-of-month x month x year P&L cube
+
+The day-of-week, month-of-year and week-of-month breakdowns in
+server/analytics.ts rescan every trade per request, and there is no
+time-of-day view at all. This aggregates the trades once into a dense cube
+per strategy:
+
+  cube[strategy, hour, weekday, week, month, year, stat]
+
+  hour     entry hour in exchange time (0-23) - when the position was opened
+  weekday  exit weekday, 0 = Sunday like Date.getDay() in the server
+  week     exit week of month, 0 = days 1-7 ... 4 = days 29-31, i.e.
+           calculateWeekOfMonthBreakdown()'s "Week 1".."Week 5" minus one
+  month    exit month, 0 = January
+  year     exit year, offset by the `years` array
+  stat     STATS: count, wins, losses, pnl, grossProfit, sumSquares (cents)
+
+Any breakdown is a sum over the other axes (see slice_cube()/summarize()),
+e.g. hour x weekday heatmaps for the ORB strategies. Stored with
+np.savez_compressed; the cube is mostly zeros, so it stays small.
+
+Output: data/derived/pnl_cube.npz (or $DERIVED_DIR)
+
+Usage:
+  python scripts/pnl_cube.py
+  python scripts/pnl_cube.py --from-csv --show NQORB --by hour,weekday
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from benchmark_alignment import derived_root
+from benchmark_db import connect
+from trade_data import TRADES_CSV, trade_records_from_csv, trade_records_from_db
+
+CUBE_FILE = "pnl_cube.npz"
+
+AXES = ("hour", "weekday", "week", "month", "year")
+STATS = ("count", "wins", "losses", "pnl", "grossProfit", "sumSquares")
+
+WEEKDAY_NAMES = ("Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat")
+
+
+def build_cube(records_by_strategy):
+    """(strategies, years, cube) from {strategy: [(entry_time, exit_time, pnl_cents)]}"""
+    strategies = sorted(records_by_strategy)
+    all_years = [exit_.year for records in records_by_strategy.values() for _, exit_, _ in records]
+    years = np.arange(min(all_years), max(all_years) + 1) if all_years else np.array([], dtype=np.int64)
+    cube = np.zeros((len(strategies), 24, 7, 5, 12, len(years), len(STATS)), dtype=np.float64)
+
+    for s, strategy in enumerate(strategies):
+        records = records_by_strategy[strategy]
+        if not records:
+            continue
+        hour = np.array([entry.hour for entry, _, _ in records])
+        # isoweekday(): Monday = 1 ... Sunday = 7 -> 0 = Sunday
+        weekday = np.array([exit_.isoweekday() % 7 for _, exit_, _ in records])
+        week = np.array([(exit_.day - 1) // 7 for _, exit_, _ in records])
+        month = np.array([exit_.month - 1 for _, exit_, _ in records])
+        year = np.array([exit_.year for _, exit_, _ in records]) - years[0]
+        pnl = np.array([p for _, _, p in records], dtype=np.float64)
+
+        values = np.column_stack([
+            np.ones_like(pnl), pnl > 0, pnl < 0, pnl, np.where(pnl > 0, pnl, 0.0), pnl ** 2,
+        ])
+        np.add.at(cube[s], (hour, weekday, week, month, year), values)
+    return strategies, years, cube
+
+
+def slice_cube(cube, by, strategy=None, strategies=None):
+    """
+    Sum the cube down to the `by` axes (in AXES order), for one strategy or
+    all of them combined. Returns an array shaped [*by axes, stat].
+    """
+    data = cube[strategies.index(strategy)] if strategy else cube.sum(axis=0)
+    drop = tuple(i for i, axis in enumerate(AXES) if axis not in by)
+    return data.sum(axis=drop)
+
+
+def summarize(cells):
+    """Per-cell trades, total/avg P&L, win rate, avg win/loss and P&L std (dollars) from summed stats"""
+    count, wins, losses, pnl, gross_profit, sum_squares = (cells[..., i] for i in range(len(STATS)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = np.where(count > 0, pnl / count, 0.0)
+        variance = np.where(count > 1, (sum_squares - count * avg ** 2) / (count - 1), 0.0)
+        return {
+            "trades": count,
+            "totalPnL": pnl / 100,
+            "avgPnL": avg / 100,
+            "winRate": np.where(count > 0, wins / count * 100, 0.0),
+            "avgWin": np.where(wins > 0, gross_profit / wins, 0.0) / 100,
+            "avgLoss": np.where(losses > 0, (gross_profit - pnl) / losses, 0.0) / 100,
+            "stdPnL": np.sqrt(np.maximum(variance, 0.0)) / 100,
+        }
+
+
+def write_cube(strategies, years, cube, root=None):
+    root = root or derived_root()
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, CUBE_FILE)
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, cube=cube, strategies=np.array(strategies), years=years,
+                        axes=np.array(AXES), stats=np.array(STATS))
+    os.replace(tmp, path)
+    return path
+
+
+def load_cube(path=None):
+    """(strategies, years, cube) as written by write_cube()"""
+    with np.load(path or os.path.join(derived_root(), CUBE_FILE)) as data:
+        return list(data["strategies"]), data["years"], data["cube"]
+
+
+def _labels(axis, years):
+    if axis == "hour":
+        return [f"{h:02d}h" for h in range(24)]
+    if axis == "weekday":
+        return list(WEEKDAY_NAMES)
+    if axis == "week":
+        return [f"W{w}" for w in range(1, 6)]
+    if axis == "month":
+        return [f"M{m:02d}" for m in range(1, 13)]
+    return [str(y) for y in years]
+
+
+def show(strategies, years, cube, strategy, by):
+    cells = slice_cube(cube, by, strategy, strategies)
+    stats = summarize(cells)
+    title = strategy or "all strategies"
+    if len(by) == 1:
+        print(f"{title} by {by[0]}:")
+        for label, n, total, rate in zip(_labels(by[0], years), stats["trades"], stats["totalPnL"], stats["winRate"]):
+            if n:
+                print(f"  {label:>6}  trades {int(n):5d}  P&L ${total:>12,.0f}  win {rate:5.1f}%")
+        return
+    rows, columns = [axis for axis in AXES if axis in by]
+    print(f"{title}: total P&L ($K), {rows} x {columns}")
+    column_labels = _labels(columns, years)
+    print(" " * 6 + "".join(f"{c:>8}" for c in column_labels))
+    for label, row in zip(_labels(rows, years), stats["totalPnL"]):
+        if row.any():
+            print(f"{label:>6}" + "".join(f"{v / 1000:>8.1f}" for v in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the hour x weekday x week x month x year P&L cube")
+    parser.add_argument("--from-csv", nargs="?", const=str(TRADES_CSV), default=None,
+                        help="Read trades from a normalized trades.csv instead of the database")
+    parser.add_argument("--show", nargs="?", const="", default=None,
+                        help="Print a breakdown for a strategy (no value = all strategies)")
+    parser.add_argument("--by", default="hour,weekday", help="One or two axes of " + ",".join(AXES))
+    args = parser.parse_args()
+    by = args.by.split(",")
+    if not 1 <= len(by) <= 2 or any(axis not in AXES for axis in by):
+        print(f"ERROR: --by takes one or two of {', '.join(AXES)}")
+        sys.exit(1)
+
+    try:
+        if args.from_csv:
+            records = trade_records_from_csv(args.from_csv)
+        else:
+            conn = connect()
+            try:
+                records = trade_records_from_db(conn)
+            finally:
+                conn.close()
+        strategies, years, cube = build_cube(records)
+        path = write_cube(strategies, years, cube)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    trades = int(cube[..., STATS.index("count")].sum())
+    print(f"P&L cube: {len(strategies)} strategies, {trades} trades, "
+          f"{years[0] if len(years) else '-'}-{years[-1] if len(years) else '-'} -> {path} "
+          f"({os.path.getsize(path) / 1024:.0f} KB)")
+    if args.show is not None:
+        if args.show and args.show not in strategies:
+            print(f"ERROR: unknown strategy {args.show}")
+            sys.exit(1)
+        show(strategies, years, cube, args.show or None, by)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Portfolio subset and weight optimizer
+
+Searches strategy combinations the Compare page can only evaluate one at a
+time. The per-strategy daily P&L matrix is loaded once and shipped to each
+worker process; candidates are weight vectors (contract multipliers per
+strategy) scored in batches:
+
+  portfolio P&L   = matrix @ weights.T          (days x batch)
+  Sharpe, max DD  = metrics_cube.cube_metrics() (same formulas as the server)
+  correlation     = weighted mean pairwise correlation of the members' daily P&L
+
+Candidates are every non-empty subset at weight 1, plus every point of a
+coarse multiplier grid (default 0/1/2 per strategy). The efficient frontier
+is the set of candidates no other candidate beats on Sharpe, max drawdown
+and correlation at once. A single-strategy candidate has no correlation
+(NaN, null in the output) and counts as worse on that axis than any mix,
+so a lone strategy is on the frontier only if no mix matches its Sharpe
+and drawdown.
+
+Output: data/derived/portfolio_frontier.json (or $DERIVED_DIR)
+
+Usage:
+  python scripts/portfolio_optimizer.py --from-csv
+  python scripts/portfolio_optimizer.py --from-csv --range 3Y --grid 0,0.5,1,2 --workers 8
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from bar_store import date_to_day, day_to_date
+from benchmark_alignment import derived_root
+from benchmark_db import connect
+from metrics_cube import RANGES, cube_metrics, range_start
+from trade_data import STARTING_CAPITAL, TRADES_CSV, daily_pnl_from_csv, daily_pnl_from_db, daily_pnl_matrix
+
+FRONTIER_FILE = "portfolio_frontier.json"
+
+DEFAULT_GRID = "0,1,2"
+DEFAULT_BATCH = 512
+
+# Set in each worker by _init_worker(), so the matrix is pickled once per process
+_matrix = None
+_correlation = None
+_capital = STARTING_CAPITAL
+
+
+def _init_worker(matrix, correlation, capital):
+    global _matrix, _correlation, _capital
+    _matrix, _correlation, _capital = matrix, correlation, capital
+
+
+def pnl_correlation(matrix):
+    """Strategy x strategy correlation of daily P&L (0 where a strategy is flat)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.corrcoef(matrix, rowvar=False)
+    return np.nan_to_num(np.atleast_2d(correlation), nan=0.0)
+
+
+def mean_correlation(weights, correlation):
+    """
+    Weighted mean off-diagonal correlation per candidate:
+    sum_{i!=j} w_i w_j C_ij / sum_{i!=j} w_i w_j, NaN for single-strategy candidates.
+    """
+    cross = np.einsum("bi,ij,bj->b", weights, correlation, weights) - np.einsum("bi,i,bi->b", weights, np.diag(correlation), weights)
+    pairs = weights.sum(axis=1) ** 2 - (weights ** 2).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(pairs > 0, cross / pairs, np.nan)
+
+
+def score_batch(weights):
+    """(sharpe, maxDrawdown, correlation, totalReturn, annualizedReturn) arrays for a batch"""
+    pnl = np.rint(_matrix @ weights.T).astype(np.int64)
+    metrics = cube_metrics(pnl, _capital)
+    return (metrics["sharpe"], metrics["maxDrawdown"], mean_correlation(weights, _correlation),
+            metrics["totalReturn"], metrics["annualizedReturn"])
+
+
+def candidate_weights(count, grid):
+    """Every non-empty subset at weight 1, then every grid point; duplicates removed"""
+    subsets = np.array(list(itertools.product((0.0, 1.0), repeat=count))[1:])
+    levels = sorted(set(grid))
+    points = np.array(list(itertools.product(levels, repeat=count))) if len(levels) > 1 else subsets[:0]
+    weights = np.unique(np.vstack([subsets, points]), axis=0)
+    return weights[weights.sum(axis=1) > 0]
+
+
+def pareto_mask(sharpe, drawdown, correlation, batch=DEFAULT_BATCH):
+    """
+    True for candidates not dominated on (higher Sharpe, shallower drawdown,
+    lower correlation). NaN correlation ranks below every defined one.
+    """
+    points = np.column_stack([sharpe, drawdown, np.nan_to_num(-correlation, nan=-np.inf)])
+    keep = np.ones(len(points), dtype=bool)
+    for start in range(0, len(points), batch):
+        block = points[start:start + batch, None, :]
+        no_worse = (points[None, :, :] >= block).all(axis=2)
+        better = (points[None, :, :] > block).any(axis=2)
+        keep[start:start + batch] = ~(no_worse & better).any(axis=1)
+    return keep
+
+
+def optimize(matrix, strategies, grid, capital=STARTING_CAPITAL, workers=None, batch=DEFAULT_BATCH):
+    weights = candidate_weights(len(strategies), grid)
+    correlation = pnl_correlation(matrix)
+    batches = [weights[i:i + batch] for i in range(0, len(weights), batch)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(batches)))
+
+    if workers == 1:
+        _init_worker(matrix, correlation, capital)
+        scored = list(map(score_batch, batches))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(matrix, correlation, capital)) as pool:
+            scored = list(pool.map(score_batch, batches))
+
+    sharpe, drawdown, corr, total, annualized = (np.concatenate(column) for column in zip(*scored))
+    frontier = np.flatnonzero(pareto_mask(sharpe, drawdown, corr, batch))
+    frontier = frontier[np.argsort(-sharpe[frontier])]
+
+    def describe(i):
+        return {
+            "weights": {s: float(w) for s, w in zip(strategies, weights[i]) if w},
+            "sharpe": round(float(sharpe[i]), 6),
+            "maxDrawdown": round(float(drawdown[i]), 6),
+            "correlation": None if np.isnan(corr[i]) else round(float(corr[i]), 6),
+            "totalReturn": round(float(total[i]), 6),
+            "annualizedReturn": round(float(annualized[i]), 6),
+        }
+
+    return {
+        "candidates": len(weights),
+        "workers": workers,
+        "best": describe(int(np.argmax(sharpe))),
+        "frontier": [describe(int(i)) for i in frontier],
+    }
+
+
+def write_frontier(result, root=None):
+    root = root or derived_root()
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, FRONTIER_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(result, f, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search strategy subsets and weights for the efficient frontier")
+    parser.add_argument("--from-csv", nargs="?", const=str(TRADES_CSV), default=None,
+                        help="Read trades from a normalized trades.csv instead of the database")
+    parser.add_argument("--range", choices=RANGES, default="ALL", help="Date range preset to optimize over")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="End date of the range (default: last trade day)")
+    parser.add_argument("--grid", default=DEFAULT_GRID, help="Comma-separated multiplier levels per strategy")
+    parser.add_argument("--capital", type=float, default=STARTING_CAPITAL)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="Candidates per matrix batch")
+    args = parser.parse_args()
+
+    try:
+        if args.from_csv:
+            pnl = daily_pnl_from_csv(args.from_csv)
+        else:
+            conn = connect()
+            try:
+                pnl = daily_pnl_from_db(conn)
+            finally:
+                conn.close()
+        days, strategies, matrix = daily_pnl_matrix(pnl, end=args.as_of)
+        if not strategies:
+            raise ValueError("no trades found")
+        as_of = args.as_of or day_to_date(int(days[-1]))
+        start = range_start(as_of, args.range)
+        if start:
+            matrix = matrix[np.searchsorted(days, date_to_day(start)):]
+
+        started = time.perf_counter()
+        result = optimize(matrix.astype(np.float64), strategies, [float(g) for g in args.grid.split(",")],
+                          args.capital, args.workers, args.batch)
+        elapsed = time.perf_counter() - started
+        result.update({
+            "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "range": args.range,
+            "asOf": as_of.isoformat(),
+            "strategies": strategies,
+            "grid": args.grid,
+            "elapsedSeconds": round(elapsed, 3),
+        })
+        path = write_frontier(result)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    print(f"Scored {result['candidates']} candidates over {len(matrix)} days "
+          f"on {result['workers']} workers in {elapsed:.2f}s")
+    print(f"\nEfficient frontier ({len(result['frontier'])} portfolios, best Sharpe first):")
+    for entry in result["frontier"][:20]:
+        weights = " ".join(f"{s}x{w:g}" for s, w in entry["weights"].items())
+        corr = "  n/a" if entry["correlation"] is None else f"{entry['correlation']:5.2f}"
+        print(f"  sharpe {entry['sharpe']:5.2f}  maxDD {entry['maxDrawdown']:8.2%}  corr {corr}  {weights}")
+    print(f"\nFrontier written to {path}")
+
+
+if __name__ == "__main__":
+    main()
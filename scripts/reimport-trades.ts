@@ -6,6 +6,7 @@
 import { drizzle } from 'drizzle-orm/mysql2';  
 import mysql from 'mysql2/promise';
 import * as schema from '../drizzle/schema.js';
+import { toCents, percentToE4 } from '../server/lib/fixedPoint.js';
 import { sql } from 'drizzle-orm';
 import * as fs from 'fs';
 import * as path from 'path';
@@ -123,14 +124,12 @@ async function reimportStrategy(connection: mysql.Connection, csvPath: string, s
       exitDate.setHours(16, 45, 0, 0);
     }
     
-    const pnl = parseFloat(exitRow.tradePL);
-    const pnlPct = parseFloat(exitRow.tradePLPct);
-    
-    // Convert to database format (cents and basis points)
-    const pnlCents = Math.round(pnl * 100); // dollars to cents
-    const pnlPercentBps = Math.round(pnlPct * 10000); // percentage to basis points (1.5% = 15000)
-    const entryPriceCents = Math.round(parseFloat(entryRow.price) * 100);
-    const exitPriceCents = Math.round(parseFloat(exitRow.price) * 100);
+    // Convert to database format (cents and percent x 10000) straight from the text
+    const pnlCents = toCents(exitRow.tradePL); // dollars to cents
+    const pnlPercentE4 = percentToE4(exitRow.tradePLPct); // percent x 10000 (1.5% = 15000)
+    // Prices can be "NAN" in the exports (negative CL prices); the column is NOT NULL
+    const entryPriceCents = /^\s*nan\s*$/i.test(entryRow.price) ? 0 : toCents(entryRow.price);
+    const exitPriceCents = /^\s*nan\s*$/i.test(exitRow.price) ? 0 : toCents(exitRow.price);
     
     // Insert trade
     await connection.execute(
@@ -141,7 +140,7 @@ async function reimportStrategy(connection: mysql.Connection, csvPath: string, s
         entryDate,
         exitDate,
         pnlCents,
-        pnlPercentBps,
+        pnlPercentE4,
         entryRow.signal.toLowerCase().includes('long') ? 'long' : 'short',
         entryPriceCents,
         exitPriceCents,
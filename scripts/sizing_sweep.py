@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Leverage and fractional-Kelly sizing sweep
+
+calculateLeveragedEquityCurve() compounds each trade's return on the
+$100K base (pnl / baseCapital) for one contract multiplier per call, and
+calculateTradeStats() reports one closed-form Kelly percentage. This script
+evaluates a whole grid of sizes per strategy in one broadcast computation:
+
+  sizes    = contract multipliers (--multipliers) followed by fractional-Kelly
+             levels (--kelly), each converted to the multiplier at which the
+             average losing trade costs fraction * f* of equity
+  equity   = capital * cumprod(1 + size x trade_return)   (sizes x trades)
+  ruin     = share of bootstrapped trade sequences (sizes x paths x trades)
+             whose drawdown from peak reaches --ruin-drawdown
+
+Output: data/derived/sizing_sweep.json (or $DERIVED_DIR), per strategy:
+  sizes[], terminalEquity[], maxDrawdown[], medianTerminalEquity[], riskOfRuin[]
+
+Usage:
+  python scripts/sizing_sweep.py --from-csv
+  python scripts/sizing_sweep.py --from-csv --multipliers 1,2,5,10 --kelly 0.25,0.5,1 --paths 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmark_alignment import derived_root
+from benchmark_db import connect
+from trade_data import STARTING_CAPITAL, TRADES_CSV, trade_pnl_from_csv, trade_pnl_from_db
+
+SWEEP_FILE = "sizing_sweep.json"
+
+# calculateLeveragedEquityCurve()'s baseCapital: the account one mini contract's P&L is measured on
+BASE_CAPITAL = 100000
+
+DEFAULT_MULTIPLIERS = "0.25,0.5,1,2,3,5,10"
+DEFAULT_KELLY = "0.1,0.25,0.5,0.75,1"
+DEFAULT_PATHS = 1000
+DEFAULT_RUIN_DRAWDOWN = 0.5
+DEFAULT_SEED = 7
+
+# Bootstrapped paths are simulated in chunks to bound memory (sizes x chunk x trades floats)
+PATH_CHUNK = 100
+
+
+def kelly_fraction(returns):
+    """f* = (p * b - q) / b as in calculateTradeStats(), as a fraction (not percent)"""
+    wins = returns[returns > 0]
+    losses = returns[returns < 0]
+    if len(wins) == 0 or len(losses) == 0:
+        return 0.0
+    payoff = wins.mean() / -losses.mean()
+    p = len(wins) / len(returns)
+    return max(0.0, (p * payoff - (1 - p)) / payoff)
+
+
+def size_grid(returns, multipliers, kelly_levels):
+    """[(label, multiplier)] - plain multipliers, then Kelly levels converted to multipliers"""
+    sizes = [(f"{m:g}x", m) for m in multipliers]
+    losses = returns[returns < 0]
+    full_kelly = kelly_fraction(returns)
+    if len(losses) and full_kelly > 0:
+        # At multiplier m the average loss costs m * |avg loss return| of equity
+        per_unit = -losses.mean()
+        sizes += [(f"{k:g} kelly", k * full_kelly / per_unit) for k in kelly_levels]
+    return sizes, full_kelly
+
+
+def equity_paths(returns, sizes, capital):
+    """
+    Compounded equity for every size at once: returns (..., trades) broadcast
+    against sizes (S, 1[, 1]). A trade that would take equity to zero or below
+    ruins the path, which stays at 0 afterwards.
+    """
+    growth = 1 + sizes * returns
+    ruined = np.logical_or.accumulate(growth <= 0, axis=-1)
+    log_equity = np.cumsum(np.log(np.where(ruined, 1.0, growth)), axis=-1)
+    return np.where(ruined, 0.0, capital * np.exp(log_equity))
+
+
+def max_drawdowns(equity, capital):
+    """min(E / peak - 1) along the trade axis, starting from capital"""
+    peak = np.maximum(np.maximum.accumulate(equity, axis=-1), capital)
+    return np.minimum((equity / peak - 1).min(axis=-1), 0.0)
+
+
+def sweep_strategy(pnl_cents, multipliers, kelly_levels, capital=STARTING_CAPITAL,
+                   paths=DEFAULT_PATHS, ruin_drawdown=DEFAULT_RUIN_DRAWDOWN, rng=None):
+    returns = np.asarray(pnl_cents, dtype=np.float64) / 100.0 / BASE_CAPITAL
+    sizes, full_kelly = size_grid(returns, multipliers, kelly_levels)
+    factors = np.array([m for _, m in sizes])
+
+    # Historical sequence: sizes x trades
+    equity = equity_paths(returns[None, :], factors[:, None], capital)
+    terminal = equity[:, -1]
+    drawdown = max_drawdowns(equity, capital)
+
+    # Bootstrapped sequences: sizes x paths x trades, chunked over paths
+    rng = rng or np.random.default_rng(DEFAULT_SEED)
+    ruined = np.zeros(len(factors))
+    terminals = []
+    for start in range(0, paths, PATH_CHUNK):
+        count = min(PATH_CHUNK, paths - start)
+        sample = returns[rng.integers(0, len(returns), size=(count, len(returns)))]
+        simulated = equity_paths(sample[None, :, :], factors[:, None, None], capital)
+        ruined += (max_drawdowns(simulated, capital) <= -ruin_drawdown).sum(axis=1)
+        terminals.append(simulated[:, :, -1])
+    median_terminal = np.median(np.concatenate(terminals, axis=1), axis=1) if terminals else terminal
+
+    return {
+        "trades": len(returns),
+        "kellyFraction": round(full_kelly, 6),
+        "sizes": [{"label": label, "multiplier": round(float(m), 6)} for label, m in sizes],
+        "terminalEquity": [round(float(v), 2) for v in terminal],
+        "maxDrawdown": [round(float(v), 6) for v in drawdown],
+        "medianTerminalEquity": [round(float(v), 2) for v in median_terminal],
+        "riskOfRuin": [round(float(v), 6) for v in ruined / max(paths, 1)],
+    }
+
+
+def write_sweep(result, root=None):
+    root = root or derived_root()
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, SWEEP_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(result, f, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep position size and Kelly fraction per strategy")
+    parser.add_argument("--from-csv", nargs="?", const=str(TRADES_CSV), default=None,
+                        help="Read trades from a normalized trades.csv instead of the database")
+    parser.add_argument("--multipliers", default=DEFAULT_MULTIPLIERS, help="Comma-separated contract multipliers")
+    parser.add_argument("--kelly", default=DEFAULT_KELLY, help="Comma-separated fractions of full Kelly")
+    parser.add_argument("--capital", type=float, default=STARTING_CAPITAL, help="Starting account equity")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS, help="Bootstrapped sequences for risk of ruin")
+    parser.add_argument("--ruin-drawdown", type=float, default=DEFAULT_RUIN_DRAWDOWN,
+                        help="Drawdown from peak that counts as ruin (0.5 = 50%%)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    multipliers = [float(m) for m in args.multipliers.split(",")]
+    kelly_levels = [float(k) for k in args.kelly.split(",")]
+    rng = np.random.default_rng(args.seed)
+
+    try:
+        if args.from_csv:
+            trades = trade_pnl_from_csv(args.from_csv)
+        else:
+            conn = connect()
+            try:
+                trades = trade_pnl_from_db(conn)
+            finally:
+                conn.close()
+        strategies = {
+            strategy: sweep_strategy(pnl, multipliers, kelly_levels, args.capital,
+                                     args.paths, args.ruin_drawdown, rng)
+            for strategy, pnl in sorted(trades.items()) if pnl
+        }
+        path = write_sweep({
+            "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "startingCapital": args.capital,
+            "baseCapital": BASE_CAPITAL,
+            "paths": args.paths,
+            "ruinDrawdown": args.ruin_drawdown,
+            "strategies": strategies,
+        })
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    for strategy, sweep in strategies.items():
+        print(f"{strategy}: {sweep['trades']} trades, full Kelly {sweep['kellyFraction']:.1%}")
+        for i, size in enumerate(sweep["sizes"]):
+            print(f"  {size['label']:>10} ({size['multiplier']:7.2f}x)  "
+                  f"equity ${sweep['terminalEquity'][i]:>14,.0f}  maxDD {sweep['maxDrawdown'][i]:8.2%}  "
+                  f"ruin {sweep['riskOfRuin'][i]:6.1%}")
+    print(f"\nSweep written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""The scripts import their sibling modules directly, as when run from scripts/"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
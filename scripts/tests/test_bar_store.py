@@ -0,0 +1,27 @@
+from datetime import date
+
+from bar_store import ColumnStore
+
+
+def _rows(days):
+    return [{"date": date(2026, 1, d), "close": d * 100} for d in days]
+
+
+def test_append_repairs_a_torn_date_column(tmp_path):
+    store = ColumnStore(tmp_path, {"close": "q"})
+    assert store.append("SPY", _rows([5, 6, 7])) == 3
+    store.close()
+
+    # Crash mid-append: half an int32 date and a whole extra close value
+    with open(store.column_path("SPY", "date"), "ab") as f:
+        f.write(b"\x01\x02")
+    with open(store.column_path("SPY", "close"), "ab") as f:
+        f.write(b"\x00" * 8)
+
+    reopened = ColumnStore(tmp_path, {"close": "q"})
+    assert reopened.count("SPY") == 3
+    assert reopened.append("SPY", _rows([8])) == 1
+    series = reopened.read("SPY")
+    assert reopened.column_path("SPY", "date").stat().st_size == 4 * 4
+    assert list(series.columns["close"]) == [500, 600, 700, 800]
+    reopened.close()
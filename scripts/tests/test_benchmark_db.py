@@ -0,0 +1,131 @@
+from datetime import date, datetime
+from pathlib import Path
+
+from benchmark_db import plan_update
+from benchmark_scheduler import EXCHANGE_TZ, last_closed_session
+from trading_calendar import get_trading_calendar
+
+# A few ^GSPC bars in the benchmark-data.json layout (the seed file itself has no ^GSPC)
+STUB_FILE = Path(__file__).parent / "fixtures" / "benchmark_stub.json"
+
+
+def test_plan_update_includes_as_of():
+    watermarks = {"QQQ": date(2026, 1, 8), "SPY": date(2026, 1, 9)}
+    assert plan_update(watermarks, date(2026, 1, 9)) == {"QQQ": date(2026, 1, 9)}
+
+
+def test_last_closed_session():
+    calendar = get_trading_calendar("NYSE")
+
+    def at(text):
+        return last_closed_session(datetime.fromisoformat(text).replace(tzinfo=EXCHANGE_TZ), calendar)
+
+    assert at("2026-01-09T16:25") == date(2026, 1, 9)  # Friday, after close + delay
+    assert at("2026-01-09T16:15") == date(2026, 1, 8)  # before the delay has passed
+    assert at("2026-01-12T09:00") == date(2026, 1, 9)  # Monday morning -> Friday
+
+
+def test_scheduler_keeps_and_awaits_spawned_triggers():
+    import asyncio
+
+    from benchmark_scheduler import BenchmarkScheduler
+
+    runs = []
+
+    async def scenario():
+        scheduler = BenchmarkScheduler.__new__(BenchmarkScheduler)
+        scheduler._tasks = set()
+        scheduler.store = None
+
+        async def trigger(reason):
+            await asyncio.sleep(0.01)
+            runs.append(reason)
+
+        scheduler.trigger = trigger
+        scheduler.spawn("market close")
+        assert len(scheduler._tasks) == 1
+        await scheduler.close()
+        assert not scheduler._tasks
+
+    asyncio.run(scenario())
+    assert runs == ["market close"]
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=()):
+        self.conn.queries.append((sql, tuple(params)))
+
+    def fetchall(self):
+        return list(self.conn.watermarks.items())
+
+    def executemany(self, sql, rows):
+        self.conn.writes.append((sql, list(rows)))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records every statement instead of talking to MySQL"""
+
+    def __init__(self, watermarks):
+        self.watermarks = watermarks
+        self.queries = []
+        self.writes = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        raise AssertionError("unexpected rollback")
+
+
+def _bars(symbol, days):
+    return [{"symbol": symbol, "date": f"2026-01-{d:02d}", "open": 100, "high": 110, "low": 90, "close": 105,
+             "volume": 1000} for d in days]
+
+
+def test_update_benchmarks_batches_every_symbol(tmp_path, monkeypatch):
+    import json
+
+    from benchmark_db import parse_benchmarks, update_benchmarks
+    from benchmark_sources import LocalFileSource
+
+    stub = tmp_path / "bars.json"
+    stub.write_text(json.dumps({"^GSPC": _bars("^GSPC", [6, 7, 8, 9]), "QQQ": _bars("QQQ", [6, 7, 8, 9])}))
+    monkeypatch.setenv("CACHE_EVENTS_DIR", str(tmp_path / "events"))
+
+    source = LocalFileSource(stub)
+    conn = FakeConnection({"SPY": date(2026, 1, 7), "QQQ": date(2026, 1, 8)})
+    written = update_benchmarks(conn, source, parse_benchmarks("SPY=^GSPC,QQQ"), as_of=date(2026, 1, 9),
+                                log=lambda *_: None)
+
+    assert written == {"SPY": 2, "QQQ": 1}
+    assert len(conn.queries) == 1 and "GROUP BY symbol" in conn.queries[0][0]
+    assert source.calls == [(("^GSPC", "QQQ"), date(2026, 1, 8), date(2026, 1, 10))]
+    assert len(conn.writes) == 1 and conn.commits == 1
+    assert [(row[0], row[1]) for row in conn.writes[0][1]] == [
+        ("SPY", date(2026, 1, 8)), ("SPY", date(2026, 1, 9)), ("QQQ", date(2026, 1, 9)),
+    ]
+    assert len(list((tmp_path / "events").glob("*.json"))) == 1
+
+
+def test_default_config_dry_runs_from_the_stub_file():
+    from benchmark_db import parse_benchmarks
+    from benchmark_sources import get_source
+
+    benchmarks = parse_benchmarks("")
+    source = get_source(f"file:{STUB_FILE}")
+    bars = source.download(list(benchmarks.values()), date(2025, 7, 1), date(2025, 7, 8))
+    assert benchmarks == {"SPY": "^GSPC"}
+    # Bars up to the exclusive end date; 07-05/06 are a weekend
+    assert [bar["date"] for bar in bars["^GSPC"]] == [
+        date(2025, 7, 1), date(2025, 7, 2), date(2025, 7, 3), date(2025, 7, 4), date(2025, 7, 7),
+    ]
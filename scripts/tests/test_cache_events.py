@@ -0,0 +1,31 @@
+import json
+import re
+from datetime import date
+from pathlib import Path
+
+from cache_events import publish_change_set
+
+# Shared with server/cacheEvents.test.ts, which drains it in the TS consumer
+FIXTURE = Path(__file__).parent / "fixtures" / "cache_events" / "20260105T213002123456-0a1b2c3d.json"
+
+
+def test_publisher_matches_the_consumer_fixture(tmp_path):
+    path = publish_change_set(
+        "update-benchmark",
+        strategies={"ESTrend": (None, date(2026, 1, 2))},
+        benchmarks={"SPY": (date(2026, 1, 2), date(2026, 1, 5))},
+        directory=str(tmp_path),
+    )
+    assert re.fullmatch(r"\d{8}T\d{12}-[0-9a-f]{8}\.json", Path(path).name)
+
+    published = json.loads(Path(path).read_text())
+    expected = json.loads(FIXTURE.read_text())
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ", published.pop("createdAt"))
+    expected.pop("createdAt")
+    assert published == expected
+
+
+def test_nothing_published_without_changes(tmp_path):
+    assert publish_change_set("noop", directory=str(tmp_path)) is None
+    assert publish_change_set("off", benchmarks={"SPY": (None, date(2026, 1, 5))}, directory="off") is None
+    assert list(tmp_path.iterdir()) == []
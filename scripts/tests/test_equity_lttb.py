@@ -0,0 +1,42 @@
+import numpy as np
+
+from equity_lttb import extremes, lttb, strategy_curves, underwater_curve
+
+RESOLUTIONS = [50, 300, 500, 1500, 5000]
+
+
+def _equity(n=10000, high=9111, trough=9114):
+    rng = np.random.default_rng(7)
+    equity = 100000 + np.cumsum(rng.normal(0, 50, n))
+    # The all-time high and the bottom of the max drawdown a few days apart
+    equity[high] = equity.max() + 20000
+    equity[trough] = equity[high] - 60000
+    return equity
+
+
+def test_lttb_keeps_indices_that_share_a_bucket():
+    equity = _equity()
+    for resolution in RESOLUTIONS:
+        index = lttb(equity, resolution, [9114, 9111])
+        assert len(index) == resolution
+        assert {0, 9111, 9114, len(equity) - 1} <= set(index.tolist())
+        assert np.all(np.diff(index) > 0)
+
+
+def test_extremes_survive_every_resolution():
+    equity = _equity()
+    underwater = underwater_curve(equity)
+    assert extremes(equity, underwater)[-2:] == [9111, 9114]
+
+    days = np.arange(20000, 20000 + len(equity))
+    curves = strategy_curves(days, equity, RESOLUTIONS)
+    for resolution in RESOLUTIONS:
+        points = curves["points"][str(resolution)]
+        assert len(points["equity"]["values"]) == resolution
+        assert min(points["underwater"]["values"]) == curves["maxDrawdownPct"]
+        assert max(points["equity"]["values"]) == round(float(equity.max()), 2)
+        assert min(points["equity"]["values"]) == round(float(equity.min()), 2)
+
+
+def test_short_series_is_returned_whole():
+    assert list(lttb(np.arange(5.0), 10, [2])) == [0, 1, 2, 3, 4]
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_sources import price_to_cents
+from fixed_point import optional, parse_fixed, to_cents
+
+
+def test_text_rounds_half_away_from_zero():
+    assert to_cents("1645.25") == 164525
+    assert to_cents("1.005") == 101
+    assert to_cents("-1.005") == -101
+    assert to_cents("1,234.5") == 123450
+    assert to_cents("2.5e3") == 250000
+    assert to_cents("+5") == 500
+    assert to_cents("-1e+2") == -10000
+
+
+def test_python_numbers():
+    assert to_cents(12) == 1200
+    assert to_cents(1.005) == 101
+    assert parse_fixed(7.5, 0) == 8
+
+
+def test_numpy_scalars():
+    assert to_cents(np.float64(412.33)) == 41233
+    assert to_cents(np.float32(412.33)) == 41233
+    assert to_cents(np.int64(412)) == 41200
+    assert to_cents(np.float64(1.005)) == 101
+
+
+def test_pandas_row_values():
+    row = pd.DataFrame({"Open": [412.33], "Volume": [1000]}).iloc[0]
+    assert price_to_cents(row["Open"]) == 41233
+    assert price_to_cents(row["Volume"]) == 100000
+
+
+@pytest.mark.parametrize("value", [
+    "NAN", "", "1.2.3", "-", "--5", "+-5", "1e--2", float("nan"), np.float64("inf"), True,
+])
+def test_rejects_non_numbers(value):
+    with pytest.raises(ValueError):
+        to_cents(value)
+
+
+def test_optional_empty_cell():
+    assert optional(to_cents, "") is None
+    assert optional(to_cents, " 3 ") == 300
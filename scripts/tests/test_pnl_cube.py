@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import numpy as np
+
+from pnl_cube import STATS, build_cube, slice_cube, summarize
+
+# Exits: Sunday 2024-01-07, Monday 2024-01-08, Saturday 2024-01-13, Monday 2025-03-03
+RECORDS = {
+    "NQORB": [
+        (datetime(2024, 1, 5, 9, 30), datetime(2024, 1, 7, 10, 0), 10000),
+        (datetime(2024, 1, 8, 9, 45), datetime(2024, 1, 8, 15, 0), -4000),
+        (datetime(2024, 1, 8, 14, 0), datetime(2024, 1, 13, 12, 0), 6000),
+        (datetime(2025, 3, 3, 9, 30), datetime(2025, 3, 3, 16, 0), 2000),
+    ],
+    "ESTrend": [
+        (datetime(2024, 6, 14, 10, 0), datetime(2024, 6, 16, 18, 0), -1500),
+    ],
+}
+
+
+def test_weekdays_follow_date_get_day():
+    strategies, years, cube = build_cube(RECORDS)
+    assert strategies == ["ESTrend", "NQORB"]
+    assert years.tolist() == [2024, 2025]
+
+    counts = slice_cube(cube, ["weekday"], "NQORB", strategies)[:, STATS.index("count")]
+    # 0 = Sunday ... 6 = Saturday, as calculateDayOfWeekBreakdown() groups them
+    assert counts.tolist() == [1, 2, 0, 0, 0, 0, 1]
+    combined = slice_cube(cube, ["weekday"])[:, STATS.index("count")]
+    assert combined.tolist() == [2, 2, 0, 0, 0, 0, 1]
+
+
+def test_weekday_summary_by_hand():
+    strategies, _, cube = build_cube(RECORDS)
+    stats = summarize(slice_cube(cube, ["weekday"], "NQORB", strategies))
+    # Monday: -$40 and +$20
+    assert stats["trades"][1] == 2
+    assert stats["totalPnL"][1] == -20.0
+    assert stats["avgPnL"][1] == -10.0
+    assert stats["winRate"][1] == 50.0
+    assert stats["avgWin"][1] == 20.0
+    assert stats["avgLoss"][1] == 40.0
+    # Sample std of (-40, 20): sqrt(2 * 30^2)
+    assert np.isclose(stats["stdPnL"][1], np.sqrt(1800))
+    # Empty cells summarize to zeros, not NaN
+    assert stats["avgPnL"][3] == 0.0 and stats["stdPnL"][0] == 0.0
+
+
+def test_hour_is_the_entry_hour_and_years_are_offset():
+    strategies, _, cube = build_cube(RECORDS)
+    by_hour = slice_cube(cube, ["hour", "weekday"], "NQORB", strategies)
+    assert by_hour[9, 1, STATS.index("count")] == 2
+    assert by_hour[14, 6, STATS.index("pnl")] == 6000
+    by_year = slice_cube(cube, ["month", "year"], "NQORB", strategies)
+    assert by_year[2, 1, STATS.index("pnl")] == 2000
+    assert by_year[0, 0, STATS.index("count")] == 3
+
+
+def test_week_of_month_matches_the_server_breakdown():
+    # calculateWeekOfMonthBreakdown(): days 1-7 = Week 1 ... 29-31 = Week 5
+    exits = [(1, 500), (7, -200), (8, 300), (14, 300), (15, -100), (21, -300), (22, 900), (28, 0), (29, 400), (31, -600)]
+    records = {"ESTrend": [(datetime(2024, 1, day, 9), datetime(2024, 1, day, 15), pnl) for day, pnl in exits]}
+    strategies, _, cube = build_cube(records)
+    stats = summarize(slice_cube(cube, ["week"], "ESTrend", strategies))
+    assert stats["trades"].tolist() == [2, 2, 2, 2, 2]
+    assert stats["totalPnL"].tolist() == [3.0, 6.0, -4.0, 9.0, -2.0]
+    assert stats["winRate"].tolist() == [50.0, 100.0, 0.0, 50.0, 50.0]
+    assert stats["avgWin"].tolist() == [5.0, 3.0, 0.0, 9.0, 4.0]
+    assert stats["avgLoss"].tolist() == [2.0, 0.0, 2.0, 0.0, 6.0]
@@ -0,0 +1,36 @@
+import numpy as np
+
+from portfolio_optimizer import mean_correlation, optimize, pareto_mask
+
+CORRELATION = np.array([
+    [1.0, 0.5, -0.2],
+    [0.5, 1.0, 0.1],
+    [-0.2, 0.1, 1.0],
+])
+
+
+def test_mean_correlation_is_undefined_for_one_strategy():
+    weights = np.array([[1.0, 0, 0], [0, 2.0, 0], [1.0, 1.0, 0], [1.0, 0, 2.0]])
+    corr = mean_correlation(weights, CORRELATION)
+    assert np.isnan(corr[0]) and np.isnan(corr[1])
+    assert corr[2] == 0.5
+    # (2 * 1 * 2 * -0.2) / (2 * 1 * 2)
+    assert np.isclose(corr[3], -0.2)
+
+
+def test_single_strategy_needs_to_beat_mixes_on_sharpe_or_drawdown():
+    sharpe = np.array([1.0, 1.0, 1.5, 0.5])
+    drawdown = np.array([-0.10, -0.10, -0.20, -0.30])
+    correlation = np.array([np.nan, 0.6, np.nan, np.nan])
+    # A mix as good as a lone strategy dominates it; a lone strategy with a better
+    # Sharpe stays; lone strategies still dominate each other on Sharpe and drawdown
+    assert pareto_mask(sharpe, drawdown, correlation).tolist() == [False, True, True, False]
+
+
+def test_frontier_reports_null_correlation_for_single_strategies():
+    rng = np.random.default_rng(3)
+    matrix = rng.normal(100, 5000, size=(500, 3)).round()
+    result = optimize(matrix, ["A", "B", "C"], [0.0, 1.0], workers=1)
+    assert result["candidates"] == 7
+    for entry in result["frontier"]:
+        assert (entry["correlation"] is None) == (len(entry["weights"]) == 1)
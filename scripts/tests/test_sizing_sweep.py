@@ -0,0 +1,34 @@
+import numpy as np
+
+from sizing_sweep import BASE_CAPITAL, equity_paths, kelly_fraction, max_drawdowns
+
+
+def _returns(dollars):
+    return np.array(dollars, dtype=np.float64) / BASE_CAPITAL
+
+
+def test_kelly_fraction_matches_trade_stats():
+    # calculateTradeStats(): winRate 40% (2 of 5, the scratch trade counts), avgWin 250,
+    # avgLoss 150, payoff 5/3 -> kellyPercentage (0.4 * 5/3 - 0.6) / (5/3) * 100 = 4
+    assert np.isclose(kelly_fraction(_returns([300, -100, 200, -200, 0])), 0.04)
+    # No losers (payoffRatio 0) and a negative edge both report 0
+    assert kelly_fraction(_returns([100, 200])) == 0.0
+    assert kelly_fraction(_returns([100, -300, -300])) == 0.0
+
+
+def test_equity_stays_at_zero_from_the_ruining_trade():
+    returns = np.array([0.1, -0.5, -1.0, 0.2])
+    equity = equity_paths(returns[None, :], np.array([[1.0], [2.0], [0.5]]), 100)
+    # 1x: growth 0 on the third trade; 2x: growth 0 then -1 on the second and third
+    assert np.allclose(equity[0], [110, 55, 0, 0])
+    assert np.allclose(equity[1], [120, 0, 0, 0])
+    assert np.allclose(equity[2], [105, 78.75, 39.375, 43.3125])
+
+    drawdowns = max_drawdowns(equity, 100)
+    assert np.allclose(drawdowns, [-1.0, -1.0, 39.375 / 105 - 1])
+
+
+def test_drawdown_is_measured_from_starting_capital():
+    equity = equity_paths(np.array([[-0.1, 0.05]]), np.array([[1.0]]), 100)
+    assert np.allclose(equity, [[90, 94.5]])
+    assert np.allclose(max_drawdowns(equity, 100), [-0.1])
@@ -0,0 +1,45 @@
+import numpy as np
+
+from trade_excursions import HISTOGRAM_BINS, histogram, level_table, strategy_tables
+
+# Dollars per trade: a winner that barely dips, a loser, a winner that dips 250
+PNL = np.array([500.0, -300.0, 200.0])
+MAE = np.array([100.0, 400.0, 250.0])
+MFE = np.array([800.0, 50.0, 300.0])
+WINNERS = PNL > 0
+
+
+def test_stop_levels_replace_the_pnl_of_trades_they_hit():
+    hit, winners_stopped, net = level_table(np.array([200.0, 300.0, 500.0]), MAE, PNL, -1, WINNERS)
+    assert hit.tolist() == [2 / 3, 1 / 3, 0.0]
+    assert winners_stopped.tolist() == [0.5, 0.0, 0.0]
+    # $200 stops the loser and the $200 winner: 500 - 200 - 200
+    assert net.tolist() == [100.0, 400.0, 400.0]
+
+
+def test_target_levels_cap_the_trades_that_reach_them():
+    hit, losers_reached, net = level_table(np.array([50.0, 300.0]), MFE, PNL, 1, ~WINNERS)
+    assert hit.tolist() == [1.0, 2 / 3]
+    assert losers_reached.tolist() == [1.0, 0.0]
+    assert net.tolist() == [150.0, 300.0]
+
+
+def test_strategy_tables_from_cents():
+    trades = [(50000, 80000, -10000), (-30000, 5000, -40000), (20000, 30000, -25000), (1000, None, None)]
+    tables = strategy_tables(trades)
+    assert tables["trades"] == 4 and tables["withExcursions"] == 3
+    assert tables["netPnl"] == 400.0
+    # Deepest stop is the 99th percentile MAE, 250 + 0.98 * 150 = 397: only the loser reaches it
+    assert tables["stops"]["levels"][-1] == 397
+    assert tables["stops"]["netPnl"][-1] == 500 - 397 + 200
+    assert tables["stops"]["hitRate"][-1] == 0.3333
+
+
+def test_histogram_bins_up_to_the_99th_percentile():
+    values = np.array([0.0, 5.0, 39.0] + [40.0] * 97 + [1000.0])
+    result = histogram(values)
+    assert result["binWidth"] == 40 / HISTOGRAM_BINS
+    assert result["counts"][0] == result["counts"][5] == result["counts"][39] == 1
+    assert sum(result["counts"]) == 3
+    assert result["overflow"] == 98
+    assert histogram(np.array([]))["counts"] == []
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from trade_reconcile import CsvSide, block_digests, diff_block, reconcile
+
+FIXTURES = Path(__file__).parent / "fixtures" / "trade_reconcile"
+SEED = CsvSide(FIXTURES / "seed.csv")
+STORED = CsvSide(FIXTURES / "stored.csv")
+
+
+def test_block_digests_ignore_row_order_and_other_strategies():
+    digests = block_digests(SEED.rows())
+    assert digests == block_digests(reversed(list(SEED.rows())))
+    assert {block: count for block, (count, _) in digests.items()} == {
+        ("ESTrend", "2010-11"): 2,
+        ("ESTrend", "2010-12"): 1,
+        ("NQTrend", "2011-01"): 1,
+    }
+    stored = block_digests(STORED.rows(), {"ESTrend", "NQTrend"})
+    assert ("CLSwing", "2011-02") not in stored
+    assert stored[("NQTrend", "2011-01")][0] == 2
+
+
+def test_update_carries_only_the_changed_column():
+    block = ("ESTrend", "2010-11")
+    ops = diff_block(SEED.block_rows({block})[block], STORED.block_rows({block})[block])
+    assert ops == [
+        {"op": "update", "id": None, "strategy": "ESTrend", "entryDate": "2010-11-18T11:30:00", "set": {"pnl": 2100}},
+    ]
+
+
+def test_reconcile_inserts_missing_and_deletes_extra_and_duplicate_rows():
+    ops, summary = reconcile(SEED, STORED, log=lambda message: None)
+    assert ops == [
+        {"op": "update", "id": None, "strategy": "ESTrend", "entryDate": "2010-11-18T11:30:00", "set": {"pnl": 2100}},
+        {"op": "insert", "strategy": "ESTrend", "row": {
+            "entryDate": "2010-12-01T11:30:00", "exitDate": "2010-12-03T16:50:00", "direction": "Short",
+            "quantity": 2, "entryPrice": 163000, "exitPrice": 161500, "pnl": 7500, "pnlPercent": 900,
+            "runUp": 9000, "runUpPercent": 1100, "drawdown": -1500, "drawdownPercent": -200,
+        }},
+        {"op": "delete", "id": None, "strategy": "ESTrend", "entryDate": "2010-12-10T11:30:00"},
+        {"op": "delete", "id": None, "strategy": "NQTrend", "entryDate": "2011-01-05T10:00:00"},
+    ]
+    assert summary == {
+        "ESTrend": {"seed": 3, "stored": 3, "match": False, "update": 1, "insert": 1, "delete": 1},
+        "NQTrend": {"seed": 1, "stored": 2, "match": False, "delete": 1},
+    }
+
+
+def test_identical_inputs_give_an_empty_patch():
+    ops, summary = reconcile(SEED, CsvSide(FIXTURES / "seed.csv"), log=lambda message: None)
+    assert ops == []
+    assert all(s["match"] for s in summary.values())
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from webhook_load import HttpClient, alert_events, saturation, schedule, summarize
+
+T0 = datetime(2024, 3, 4, 9, 30)
+
+
+def _row(strategy, entry, exit_, side="long", entry_price="1500025", exit_price="1501050"):
+    return {
+        "strategyName": strategy, "side": side, "quantity": "2",
+        "entryTime": entry.isoformat(), "exitTime": exit_.isoformat(),
+        "entryPrice": entry_price, "exitPrice": exit_price,
+    }
+
+
+def test_alert_events_in_time_order():
+    rows = [
+        _row("ESTrend", T0, T0 + timedelta(hours=3)),
+        _row("NQORB", T0 + timedelta(hours=1), T0 + timedelta(hours=2), side="short"),
+        _row("CLSwing", T0, T0 + timedelta(hours=1), entry_price=""),  # no printable price
+    ]
+    events = alert_events(rows)
+    assert [(t - T0, p["symbol"], p["signalType"]) for t, p in events] == [
+        (timedelta(0), "ESTrend", "entry"),
+        (timedelta(hours=1), "NQORB", "entry"),
+        (timedelta(hours=2), "NQORB", "exit"),
+        (timedelta(hours=3), "ESTrend", "exit"),
+    ]
+    assert events[0][1] == {"symbol": "ESTrend", "signalType": "entry", "data": "buy", "direction": "long",
+                            "quantity": 2, "price": 15000.25}
+    assert events[1][1]["data"] == "sell"
+    assert events[3][1] == {"symbol": "ESTrend", "signalType": "exit", "data": "exit", "position": "flat",
+                            "quantity": 2, "price": 15010.5}
+    assert len(alert_events(rows, {"NQORB"})) == 2
+
+
+def test_schedule_compresses_history_and_caps_gaps():
+    times = [T0 + timedelta(seconds=s) for s in (0, 10, 20, 100)]
+    # Gaps of 10s / 10 = 1s; the 80s gap would be 8s and is capped at 5s
+    assert schedule(times, speedup=10, max_gap=5).tolist() == [0.0, 1.0, 2.0, 7.0]
+    assert schedule(times, rate=2).tolist() == [0.0, 0.5, 1.0, 1.5]
+    assert schedule(times, rate=2, burst=3).tolist() == [0.0, 0.0, 0.0, 1.5]
+
+
+def _result(offset, latency, status=200, error=None):
+    return {"offset": offset, "status": status, "error": error, "latency": latency,
+            "correctedLatency": latency + 0.1, "done": offset + latency}
+
+
+def test_summarize_and_saturation():
+    results = [_result(i * 0.5, 0.01 * (i + 1)) for i in range(9)]
+    results.append(_result(4.5, 0.5, status=0, error="ConnectionClosed"))
+    summary = summarize(results, offered_rate=2)
+    assert summary["requests"] == 10 and summary["ok"] == 9
+    assert summary["errorRate"] == 0.1
+    assert summary["errors"] == {"ConnectionClosed": 1}
+    assert summary["statuses"] == {"0": 1, "200": 9}
+    assert summary["elapsedSeconds"] == 5.0
+    assert summary["throughput"] == 2.0
+    assert summary["latencyMs"]["max"] == 500.0
+    assert np.isclose(summary["latencyMs"]["p50"], 55.0)
+    assert summary["offeredRate"] == 2
+
+    clean = dict(summary, errorRate=0.0, offeredRate=1)
+    assert saturation([clean, summary], slo_ms=1000) == 2
+    assert saturation([clean], slo_ms=1000) is None
+
+
+def test_idle_connection_closed_by_the_server_is_retried_fresh():
+    async def scenario():
+        connections = []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            await reader.readuntil(b"\r\n\r\n")
+            await reader.readexactly(2)
+            body = b'{"success": true}'
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+            # Keep-alive timeout: drop the connection once it is idle
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = HttpClient(f"http://127.0.0.1:{port}", 1, 5)
+        try:
+            first = await client.post("/", {})
+            await asyncio.sleep(0.05)
+            assert len(client.idle) == 1
+            second = await client.post("/", {})
+        finally:
+            client.close()
+            server.close()
+            await server.wait_closed()
+        return first, second, len(connections)
+
+    first, second, connections = asyncio.run(scenario())
+    assert first[:2] == (200, {"success": True})
+    assert second[:2] == (200, {"success": True})
+    assert connections == 2
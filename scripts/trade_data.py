@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Trade loaders shared by the analytics batch scripts
+
+Strategies are keyed by their symbol (e.g. "ESTrend"), which is both the
+`strategyName` column of data/seed/trades.csv and `strategies.symbol` in the
+database, so artifacts built from either source line up. trades.csv carries
+the trades table's integer units (cents, percent x 10000), so both sources
+yield identical integers.
+"""
+
+import csv
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from bar_store import date_to_day, day_to_date
+from trading_calendar import get_trading_calendar
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TRADES_CSV = REPO_ROOT / "data" / "seed" / "trades.csv"
+
+# Matches calculateEquityCurve()'s default in server/analytics.ts
+STARTING_CAPITAL = 100000
+
+
+def load_trades_csv(path=TRADES_CSV):
+    """Read normalized trades (normalize_strategy_data.py output) as dicts"""
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def daily_pnl_from_csv(path=TRADES_CSV):
+    """{strategy: {day_number: pnl_cents}} summed by exit date"""
+    daily = defaultdict(lambda: defaultdict(int))
+    for row in load_trades_csv(path):
+        day = date_to_day(datetime.fromisoformat(row["exitTime"]))
+        daily[row["strategyName"]][day] += int(row["pnl"])
+    return {strategy: dict(days) for strategy, days in daily.items()}
+
+
+def daily_pnl_from_db(conn):
+    """
+    {strategy: {day_number: pnl_cents}} aggregated in MySQL.
+    Test trades are excluded, like every analytics query in the server.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT s.symbol, DATE(t.exitDate) AS day, SUM(t.pnl)
+            FROM trades t
+            JOIN strategies s ON s.id = t.strategyId
+            WHERE t.isTest = 0
+            GROUP BY s.symbol, DATE(t.exitDate)
+            ORDER BY s.symbol, day
+            """
+        )
+        daily = defaultdict(dict)
+        for symbol, day, pnl in cursor:
+            daily[symbol][date_to_day(day)] = int(pnl)
+        return dict(daily)
+    finally:
+        cursor.close()
+
+
+def trade_pnl_from_csv(path=TRADES_CSV):
+    """{strategy: [pnl_cents, ...]} per trade, in exit order"""
+    trades = defaultdict(list)
+    for row in load_trades_csv(path):
+        trades[row["strategyName"]].append((row["exitTime"], int(row["pnl"])))
+    return {strategy: [pnl for _, pnl in sorted(rows)] for strategy, rows in trades.items()}
+
+
+def trade_pnl_from_db(conn):
+    """{strategy: [pnl_cents, ...]} per trade, in exit order, test trades excluded"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT s.symbol, t.pnl
+            FROM trades t
+            JOIN strategies s ON s.id = t.strategyId
+            WHERE t.isTest = 0
+            ORDER BY s.symbol, t.exitDate, t.id
+            """
+        )
+        trades = defaultdict(list)
+        for symbol, pnl in cursor:
+            trades[symbol].append(int(pnl))
+        return dict(trades)
+    finally:
+        cursor.close()
+
+
+def trade_records_from_csv(path=TRADES_CSV):
+    """{strategy: [(entry_time, exit_time, pnl_cents), ...]} with naive exchange-time datetimes"""
+    trades = defaultdict(list)
+    for row in load_trades_csv(path):
+        trades[row["strategyName"]].append((
+            datetime.fromisoformat(row["entryTime"]),
+            datetime.fromisoformat(row["exitTime"]),
+            int(row["pnl"]),
+        ))
+    return dict(trades)
+
+
+def trade_records_from_db(conn):
+    """trade_records_from_csv() from the trades table, test trades excluded"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT s.symbol, t.entryDate, t.exitDate, t.pnl
+            FROM trades t
+            JOIN strategies s ON s.id = t.strategyId
+            WHERE t.isTest = 0
+            """
+        )
+        trades = defaultdict(list)
+        for symbol, entry, exit_, pnl in cursor:
+            trades[symbol].append((entry, exit_, int(pnl)))
+        return dict(trades)
+    finally:
+        cursor.close()
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, "") else None
+
+
+def trade_excursions_from_csv(path=TRADES_CSV):
+    """
+    {strategy: [(pnl, run_up, drawdown), ...]} in cents per trade, in exit order.
+    run_up/drawdown are None for trades normalized without excursion columns.
+    """
+    trades = defaultdict(list)
+    for row in load_trades_csv(path):
+        trades[row["strategyName"]].append((row["exitTime"], (
+            int(row["pnl"]), _optional_int(row.get("runUp")), _optional_int(row.get("drawdown")))))
+    return {strategy: [t for _, t in sorted(rows)] for strategy, rows in trades.items()}
+
+
+def trade_excursions_from_db(conn):
+    """trade_excursions_from_csv() from the trades table, test trades excluded"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT s.symbol, t.pnl, t.runUp, t.drawdown
+            FROM trades t
+            JOIN strategies s ON s.id = t.strategyId
+            WHERE t.isTest = 0
+            ORDER BY s.symbol, t.exitDate, t.id
+            """
+        )
+        trades = defaultdict(list)
+        for symbol, pnl, run_up, drawdown in cursor:
+            trades[symbol].append((int(pnl), run_up, drawdown))
+        return dict(trades)
+    finally:
+        cursor.close()
+
+
+def daily_pnl_matrix(pnl_by_strategy, end=None, calendar=None):
+    """
+    Dense (days x strategies) P&L matrix in cents.
+
+    Rows are every exchange trading day from the first exit to `end`
+    (default: the last exit), plus any other day that has an exit (futures
+    trade on some exchange holidays), so a strategy with no trades on a day
+    contributes 0 - the forward fill the server's equity curves use.
+    Returns (day_numbers, strategies, matrix).
+    """
+    strategies = sorted(pnl_by_strategy)
+    pnl_days = {day for days in pnl_by_strategy.values() for day in days}
+    if not pnl_days:
+        return np.array([], dtype=np.int64), strategies, np.zeros((0, len(strategies)), dtype=np.int64)
+
+    calendar = calendar or get_trading_calendar("NYSE")
+    first = min(pnl_days)
+    last = date_to_day(end) if end is not None else max(pnl_days)
+    trading = calendar.trading_day_numbers(day_to_date(first), day_to_date(last))
+    days = np.array(sorted(set(trading) | {day for day in pnl_days if day <= last}), dtype=np.int64)
+
+    matrix = np.zeros((len(days), len(strategies)), dtype=np.int64)
+    for column, strategy in enumerate(strategies):
+        items = [(day, pnl) for day, pnl in pnl_by_strategy[strategy].items() if day <= last]
+        if items:
+            rows = np.searchsorted(days, [day for day, _ in items])
+            np.add.at(matrix[:, column], rows, [pnl for _, pnl in items])
+    return days, strategies, matrix
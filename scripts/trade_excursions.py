@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Per-strategy MAE/MFE distributions and stop/target tables
+
+The TradingView exports record each trade's Run-up (maximum favorable
+excursion, MFE) and Drawdown (maximum adverse excursion, MAE);
+normalize_strategy_data.py carries them into trades.csv and the trades table.
+This precomputes what stop-placement analysis needs, so it reads one small
+JSON document instead of scanning every trade:
+
+  mae / mfe  histogram (bins up to the 99th percentile + overflow count) and
+             quantile sketch, MAE also split into winners and losers
+  stops      for each stop distance on a grid: share of trades whose MAE
+             reaches it, share of winners it would have stopped out, and the
+             net P&L had those trades been closed at the stop
+  targets    the same for profit targets against MFE
+
+All amounts are dollars per trade (excursions as positive magnitudes).
+Stop/target P&L treats each level on its own: the exports do not say whether
+the run-up or the drawdown came first, so combined stop+target grids are not
+derivable.
+
+Output: data/derived/trade_excursions.json (or $DERIVED_DIR)
+
+Usage:
+  python scripts/trade_excursions.py
+  python scripts/trade_excursions.py --from-csv
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmark_alignment import derived_root
+from benchmark_db import connect
+from trade_data import TRADES_CSV, trade_excursions_from_csv, trade_excursions_from_db
+
+EXCURSIONS_FILE = "trade_excursions.json"
+
+HISTOGRAM_BINS = 40
+GRID_STEPS = 20
+QUANTILES = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+
+def _round(values, digits=2):
+    return [round(float(v), digits) for v in values]
+
+
+def quantile_sketch(values):
+    if len(values) == 0:
+        return {}
+    return {f"p{round(q * 100)}": round(float(v), 2) for q, v in zip(QUANTILES, np.quantile(values, QUANTILES))}
+
+
+def histogram(values):
+    """Equal-width bins from 0 to the 99th percentile; larger values are counted as overflow"""
+    if len(values) == 0:
+        return {"binWidth": 0.0, "counts": [], "overflow": 0}
+    top = float(np.quantile(values, 0.99)) or float(values.max()) or 1.0
+    width = top / HISTOGRAM_BINS
+    index = np.floor(values / width).astype(np.int64)
+    counts = np.bincount(np.minimum(index, HISTOGRAM_BINS), minlength=HISTOGRAM_BINS + 1)
+    return {"binWidth": round(width, 4), "counts": counts[:HISTOGRAM_BINS].tolist(), "overflow": int(counts[HISTOGRAM_BINS])}
+
+
+def level_grid(values):
+    """GRID_STEPS evenly spaced levels up to the 99th percentile, in whole dollars"""
+    top = float(np.quantile(values, 0.99)) if len(values) else 0.0
+    levels = np.unique(np.ceil(np.linspace(0, top, GRID_STEPS + 1)[1:]))
+    return levels[levels > 0]
+
+
+def level_table(levels, excursion, pnl, sign, group):
+    """
+    Hit rates and P&L for stops (sign -1) or targets (sign +1) at every level
+    in one (levels x trades) broadcast. `group` marks the trades whose
+    outcome a hit reverses: winners for stops, losers for targets.
+    """
+    hit = excursion[None, :] >= levels[:, None]
+    net = np.where(hit, sign * levels[:, None], pnl[None, :]).sum(axis=1)
+    share = hit[:, group].mean(axis=1) if group.any() else np.zeros(len(levels))
+    return hit.mean(axis=1), share, net
+
+
+def strategy_tables(trades):
+    """Distributions and tables for one strategy's [(pnl, run_up, drawdown)] in cents"""
+    known = [t for t in trades if t[1] is not None and t[2] is not None]
+    result = {"trades": len(trades), "withExcursions": len(known)}
+    if not known:
+        return result
+
+    pnl, run_up, drawdown = (np.array(column, dtype=np.float64) / 100.0 for column in zip(*known))
+    mfe = np.maximum(run_up, 0.0)
+    mae = np.abs(np.minimum(drawdown, 0.0))
+    winners = pnl > 0
+
+    result["mae"] = {
+        **histogram(mae),
+        "quantiles": quantile_sketch(mae),
+        "winnerQuantiles": quantile_sketch(mae[winners]),
+        "loserQuantiles": quantile_sketch(mae[~winners]),
+    }
+    result["mfe"] = {**histogram(mfe), "quantiles": quantile_sketch(mfe)}
+
+    stops = level_grid(mae)
+    hit, winners_stopped, net = level_table(stops, mae, pnl, -1, winners)
+    result["stops"] = {
+        "levels": _round(stops, 0), "hitRate": _round(hit, 4),
+        "winnersStopped": _round(winners_stopped, 4), "netPnl": _round(net),
+    }
+    targets = level_grid(mfe)
+    hit, losers_reached, net = level_table(targets, mfe, pnl, 1, ~winners)
+    result["targets"] = {
+        "levels": _round(targets, 0), "hitRate": _round(hit, 4),
+        "losersReached": _round(losers_reached, 4), "netPnl": _round(net),
+    }
+    result["netPnl"] = round(float(pnl.sum()), 2)
+    return result
+
+
+def build_excursions(trades_by_strategy):
+    return {strategy: strategy_tables(trades) for strategy, trades in sorted(trades_by_strategy.items())}
+
+
+def write_excursions(tables, root=None):
+    root = root or derived_root()
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, EXCURSIONS_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "quantiles": list(QUANTILES),
+            "strategies": tables,
+        }, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute MAE/MFE distributions and stop/target tables")
+    parser.add_argument("--from-csv", nargs="?", const=str(TRADES_CSV), default=None,
+                        help="Read trades from a normalized trades.csv instead of the database")
+    args = parser.parse_args()
+
+    try:
+        if args.from_csv:
+            trades = trade_excursions_from_csv(args.from_csv)
+        else:
+            conn = connect()
+            try:
+                trades = trade_excursions_from_db(conn)
+            finally:
+                conn.close()
+        tables = build_excursions(trades)
+        path = write_excursions(tables)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    for strategy, t in tables.items():
+        if "mae" not in t:
+            print(f"  {strategy}: no excursion data ({t['trades']} trades)")
+            continue
+        print(f"  {strategy}: {t['withExcursions']}/{t['trades']} trades  "
+              f"MAE p50 ${t['mae']['quantiles']['p50']:,.0f} p95 ${t['mae']['quantiles']['p95']:,.0f}  "
+              f"MFE p50 ${t['mfe']['quantiles']['p50']:,.0f}")
+    print(f"Excursion tables written to {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Streaming reconciliation of data/seed/trades.csv against the trades table
+
+Both sides are streamed in chunks (the database through an unbuffered,
+server-side cursor sorted by strategy and entry time) and folded into one
+digest per block - a strategy's trades entered in one calendar month. A
+block digest is the row count plus the sum of 64-bit row hashes, so it does
+not depend on row order and a strategy's digest is the sum of its blocks'.
+Only blocks whose digests differ are read again and diffed row by row, so
+a clean full-table check holds one digest per block in memory, never the
+trades themselves.
+
+Rows are matched on entry time within a block and the result is a minimal
+patch: inserts for seed rows missing from the table, updates carrying only
+the changed columns, and deletes by trade id. Database rows are limited to
+csv_import, non-test trades of the strategies in the seed file; webhook and
+manual trades are never touched.
+
+Output: data/derived/trades_patch.jsonl (or $DERIVED_DIR), one operation per line
+  {"op": "insert", "strategy": "ESTrend", "row": {"entryDate": ..., "pnl": ...}}
+  {"op": "update", "id": 123, "strategy": "ESTrend", "entryDate": ..., "set": {"pnl": -4150}}
+  {"op": "delete", "id": 124, "strategy": "ESTrend", "entryDate": ...}
+
+With --against another trades.csv, ids are null and entryDate identifies the row.
+
+Usage:
+  python scripts/trade_reconcile.py
+  python scripts/trade_reconcile.py --seed data/seed/trades.csv --against old_trades.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+from benchmark_alignment import derived_root
+from benchmark_db import connect
+from trade_data import TRADES_CSV
+
+PATCH_FILE = "trades_patch.jsonl"
+
+CHUNK_ROWS = 10000
+
+HASH_MASK = (1 << 64) - 1
+
+# Compared columns in trades-table naming, after the entry time that keys a row
+COLUMNS = (
+    "exitDate", "direction", "quantity", "entryPrice", "exitPrice", "pnl", "pnlPercent",
+    "runUp", "runUpPercent", "drawdown", "drawdownPercent",
+)
+
+DB_QUERY = f"""
+    SELECT s.symbol, t.id, t.entryDate, {", ".join(f"t.{column}" for column in COLUMNS)}
+    FROM trades t
+    JOIN strategies s ON s.id = t.strategyId
+    WHERE t.isTest = 0 AND t.source = 'csv_import'{{where}}
+    ORDER BY s.symbol, t.entryDate
+"""
+
+
+def _iso(value):
+    return (value if isinstance(value, datetime) else datetime.fromisoformat(value)).isoformat(timespec="seconds")
+
+
+def _int(value, default=None):
+    return int(value) if value not in (None, "") else default
+
+
+def csv_values(row):
+    """A trades.csv row as the column values seed-trades.ts writes"""
+    return (
+        _iso(row["exitTime"]),
+        "Long" if row["side"].lower() == "long" else "Short",
+        _int(row["quantity"], 0) or 1,
+        _int(row["entryPrice"], 0),
+        _int(row["exitPrice"], 0),
+        _int(row["pnl"], 0),
+        _int(row["pnlPercent"], 0),
+        _int(row.get("runUp")),
+        _int(row.get("runUpPercent")),
+        _int(row.get("drawdown")),
+        _int(row.get("drawdownPercent")),
+    )
+
+
+def db_values(row):
+    exit_, direction, *numbers = row
+    return (_iso(exit_), direction, *(None if n is None else int(n) for n in numbers))
+
+
+def row_hash(entry, values):
+    digest = hashlib.blake2b(repr((entry, values)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def block_of(strategy, entry):
+    return strategy, entry[:7]
+
+
+class CsvSide:
+    """Trades from a normalized trades.csv, read one row at a time"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def rows(self):
+        """(strategy, entry, values, id) per trade; id is None for seed rows"""
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield row["strategyName"], _iso(row["entryTime"]), csv_values(row), None
+
+    def block_rows(self, blocks):
+        """{block: [row, ...]} for the requested blocks, in one more pass"""
+        found = defaultdict(list)
+        for row in self.rows():
+            block = block_of(row[0], row[1])
+            if block in blocks:
+                found[block].append(row)
+        return found
+
+
+class DbSide:
+    """csv_import, non-test trades streamed from the database"""
+
+    def __init__(self, conn, chunk_rows=CHUNK_ROWS):
+        self.conn = conn
+        self.chunk_rows = chunk_rows
+
+    def _stream(self, where="", params=()):
+        cursor = self.conn.cursor(buffered=False)
+        try:
+            cursor.execute(DB_QUERY.format(where=where), params)
+            while True:
+                chunk = cursor.fetchmany(self.chunk_rows)
+                if not chunk:
+                    break
+                for symbol, trade_id, entry, *values in chunk:
+                    yield symbol, _iso(entry), db_values(values), trade_id
+        finally:
+            cursor.close()
+
+    def rows(self):
+        return self._stream()
+
+    def block_rows(self, blocks):
+        # One range query per mismatched block, narrowed by idx_trades_strategy
+        found = {}
+        for strategy, month in sorted(blocks):
+            year, mon = int(month[:4]), int(month[5:7])
+            end = f"{year + mon // 12:04d}-{mon % 12 + 1:02d}-01"
+            found[(strategy, month)] = list(self._stream(
+                " AND s.symbol = %s AND t.entryDate >= %s AND t.entryDate < %s",
+                (strategy, f"{month}-01", end),
+            ))
+        return found
+
+
+def block_digests(rows, strategies=None):
+    """{block: [count, hash_sum]} over a row stream, optionally limited to `strategies`"""
+    digests = defaultdict(lambda: [0, 0])
+    for strategy, entry, values, _ in rows:
+        if strategies is not None and strategy not in strategies:
+            continue
+        digest = digests[block_of(strategy, entry)]
+        digest[0] += 1
+        digest[1] = (digest[1] + row_hash(entry, values)) & HASH_MASK
+    return dict(digests)
+
+
+def strategy_digests(digests):
+    """Fold block digests into one (count, hash_sum) per strategy"""
+    totals = defaultdict(lambda: [0, 0])
+    for (strategy, _), (count, hash_sum) in digests.items():
+        totals[strategy][0] += count
+        totals[strategy][1] = (totals[strategy][1] + hash_sum) & HASH_MASK
+    return {strategy: tuple(total) for strategy, total in totals.items()}
+
+
+def diff_block(seed_rows, db_rows):
+    """Minimal operations turning a block's database rows into its seed rows"""
+    by_entry = defaultdict(lambda: ([], []))
+    for row in seed_rows:
+        by_entry[row[1]][0].append(row)
+    for row in db_rows:
+        by_entry[row[1]][1].append(row)
+
+    ops = []
+    for entry in sorted(by_entry):
+        wanted, stored = by_entry[entry]
+        # Identical rows need nothing; pair the leftovers as updates
+        unmatched = []
+        for row in wanted:
+            match = next((i for i, s in enumerate(stored) if s[2] == row[2]), None)
+            if match is None:
+                unmatched.append(row)
+            else:
+                stored.pop(match)
+        for row, old in zip(unmatched, stored):
+            changed = {column: new for column, new, was in zip(COLUMNS, row[2], old[2]) if new != was}
+            ops.append({"op": "update", "id": old[3], "strategy": row[0], "entryDate": entry, "set": changed})
+        for row in unmatched[len(stored):]:
+            ops.append({"op": "insert", "strategy": row[0], "row": {"entryDate": entry, **dict(zip(COLUMNS, row[2]))}})
+        for old in stored[len(unmatched):]:
+            ops.append({"op": "delete", "id": old[3], "strategy": old[0], "entryDate": entry})
+    return ops
+
+
+def reconcile(seed, target, log=print):
+    """
+    Compare two sides block by block and diff only the mismatched blocks.
+    Returns (ops, per-strategy summary).
+    """
+    seed_digests = block_digests(seed.rows())
+    strategies = {strategy for strategy, _ in seed_digests}
+    target_digests = block_digests(target.rows(), strategies)
+
+    mismatched = {
+        block for block in seed_digests.keys() | target_digests.keys()
+        if seed_digests.get(block) != target_digests.get(block)
+    }
+    log(f"{len(seed_digests)} seed blocks, {len(target_digests)} stored, {len(mismatched)} to diff")
+
+    ops = []
+    if mismatched:
+        seed_rows = seed.block_rows(mismatched)
+        target_rows = target.block_rows(mismatched)
+        for block in sorted(mismatched):
+            ops.extend(diff_block(seed_rows.get(block, []), target_rows.get(block, [])))
+
+    seed_totals, target_totals = strategy_digests(seed_digests), strategy_digests(target_digests)
+    summary = {}
+    for strategy in sorted(strategies):
+        counts = defaultdict(int)
+        for op in ops:
+            if op["strategy"] == strategy:
+                counts[op["op"]] += 1
+        summary[strategy] = {
+            "seed": seed_totals[strategy][0],
+            "stored": target_totals.get(strategy, (0, 0))[0],
+            "match": seed_totals[strategy] == target_totals.get(strategy),
+            **counts,
+        }
+    return ops, summary
+
+
+def write_patch(ops, path=None):
+    path = path or os.path.join(derived_root(), PATCH_FILE)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        for op in ops:
+            f.write(json.dumps(op) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile trades.csv against the trades table")
+    parser.add_argument("--seed", default=str(TRADES_CSV), help="Normalized trades.csv to treat as the source of truth")
+    parser.add_argument("--against", default=None,
+                        help="Compare with another trades.csv instead of the database")
+    parser.add_argument("--patch", default=None, help=f"Patch output path (default $DERIVED_DIR/{PATCH_FILE})")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows fetched per database round trip")
+    args = parser.parse_args()
+
+    conn = None
+    try:
+        if args.against:
+            target = CsvSide(args.against)
+        else:
+            conn = connect()
+            target = DbSide(conn, args.chunk_rows)
+        ops, summary = reconcile(CsvSide(args.seed), target)
+        path = write_patch(ops, args.patch)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    for strategy, s in summary.items():
+        status = "ok" if s["match"] else f"+{s.get('insert', 0)} ~{s.get('update', 0)} -{s.get('delete', 0)}"
+        print(f"  {strategy:10s} seed {s['seed']:6d}  stored {s['stored']:6d}  {status}")
+    print(f"{len(ops)} patch operations written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Trading Calendar Module (Python mirror of server/core/tradingCalendar.ts)
+
+Provides market holiday detection and trading day validation for US
+equity/futures markets. US_MARKET_HOLIDAYS is copied verbatim from the
+TypeScript module; years outside that table are filled in from the NYSE
+holiday rules plus known special closures, so integrity checks over long
+benchmark histories don't report holidays as gaps.
+
+Trading days are precomputed once per calendar as a sorted list of day
+numbers (days since 1970-01-01, the bar store's date index), so "which
+trading days fall in [start, end]" is two binary searches.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from bar_store import date_to_day, day_to_date
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Range covered by the precomputed trading day index
+CALENDAR_START_YEAR = 1990
+CALENDAR_END_YEAR = 2035
+
+# US Market Holidays (NYSE/NASDAQ) - keep in sync with server/core/tradingCalendar.ts
+US_MARKET_HOLIDAYS = {
+    2020: [
+        '2020-01-01',  # New Year's Day
+        '2020-01-20',  # MLK Day
+        '2020-02-17',  # Presidents Day
+        '2020-04-10',  # Good Friday
+        '2020-05-25',  # Memorial Day
+        '2020-07-03',  # Independence Day (observed)
+        '2020-09-07',  # Labor Day
+        '2020-11-26',  # Thanksgiving
+        '2020-12-25',  # Christmas
+    ],
+    2021: [
+        '2021-01-01',  # New Year's Day
+        '2021-01-18',  # MLK Day
+        '2021-02-15',  # Presidents Day
+        '2021-04-02',  # Good Friday
+        '2021-05-31',  # Memorial Day
+        '2021-07-05',  # Independence Day (observed)
+        '2021-09-06',  # Labor Day
+        '2021-11-25',  # Thanksgiving
+        '2021-12-24',  # Christmas (observed)
+    ],
+    2022: [
+        '2022-01-17',  # MLK Day
+        '2022-02-21',  # Presidents Day
+        '2022-04-15',  # Good Friday
+        '2022-05-30',  # Memorial Day
+        '2022-06-20',  # Juneteenth (new holiday)
+        '2022-07-04',  # Independence Day
+        '2022-09-05',  # Labor Day
+        '2022-11-24',  # Thanksgiving
+        '2022-12-26',  # Christmas (observed)
+    ],
+    2023: [
+        '2023-01-02',  # New Year's Day (observed)
+        '2023-01-16',  # MLK Day
+        '2023-02-20',  # Presidents Day
+        '2023-04-07',  # Good Friday
+        '2023-05-29',  # Memorial Day
+        '2023-06-19',  # Juneteenth
+        '2023-07-04',  # Independence Day
+        '2023-09-04',  # Labor Day
+        '2023-11-23',  # Thanksgiving
+        '2023-12-25',  # Christmas
+    ],
+    2024: [
+        '2024-01-01',  # New Year's Day
+        '2024-01-15',  # MLK Day
+        '2024-02-19',  # Presidents Day
+        '2024-03-29',  # Good Friday
+        '2024-05-27',  # Memorial Day
+        '2024-06-19',  # Juneteenth
+        '2024-07-04',  # Independence Day
+        '2024-09-02',  # Labor Day
+        '2024-11-28',  # Thanksgiving
+        '2024-12-25',  # Christmas
+    ],
+    2025: [
+        '2025-01-01',  # New Year's Day
+        '2025-01-20',  # MLK Day
+        '2025-02-17',  # Presidents Day
+        '2025-04-18',  # Good Friday
+        '2025-05-26',  # Memorial Day
+        '2025-06-19',  # Juneteenth
+        '2025-07-04',  # Independence Day
+        '2025-09-01',  # Labor Day
+        '2025-11-27',  # Thanksgiving
+        '2025-12-25',  # Christmas
+    ],
+    2026: [
+        '2026-01-01',  # New Year's Day
+        '2026-01-19',  # MLK Day
+        '2026-02-16',  # Presidents Day
+        '2026-04-03',  # Good Friday
+        '2026-05-25',  # Memorial Day
+        '2026-06-19',  # Juneteenth
+        '2026-07-03',  # Independence Day (observed)
+        '2026-09-07',  # Labor Day
+        '2026-11-26',  # Thanksgiving
+        '2026-12-25',  # Christmas
+    ],
+}
+
+# Unscheduled full-day closures
+SPECIAL_CLOSURES = [
+    '1994-04-27',  # Nixon national day of mourning
+    '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14',  # September 11
+    '2004-06-11',  # Reagan national day of mourning
+    '2007-01-02',  # Ford national day of mourning
+    '2012-10-29', '2012-10-30',  # Hurricane Sandy
+    '2018-12-05',  # Bush national day of mourning
+    '2025-01-09',  # Carter national day of mourning
+]
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th (1-based) weekday (Mon=0) of a month"""
+    first = date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + timedelta(days=offset + 7 * (n - 1))
+
+
+def _last_weekday(year, month, weekday):
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day):
+    """Saturday holidays move to Friday, Sunday holidays to Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def rule_based_holidays(year):
+    """NYSE full-day holidays for a year, derived from the exchange rules"""
+    holidays = []
+
+    # New Year's Day: Sunday moves to Monday; Saturday is not observed
+    new_year = date(year, 1, 1)
+    if new_year.weekday() == 6:
+        holidays.append(new_year + timedelta(days=1))
+    elif new_year.weekday() != 5:
+        holidays.append(new_year)
+
+    if year >= 1998:
+        holidays.append(_nth_weekday(year, 1, 0, 3))  # MLK Day
+    holidays.append(_nth_weekday(year, 2, 0, 3))  # Presidents Day
+    holidays.append(_easter(year) - timedelta(days=2))  # Good Friday
+    holidays.append(_last_weekday(year, 5, 0))  # Memorial Day
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))  # Juneteenth
+    holidays.append(_observed(date(year, 7, 4)))  # Independence Day
+    holidays.append(_nth_weekday(year, 9, 0, 1))  # Labor Day
+    holidays.append(_nth_weekday(year, 11, 3, 4))  # Thanksgiving
+    holidays.append(_observed(date(year, 12, 25)))  # Christmas
+    return holidays
+
+
+class TradingCalendar:
+    """Holiday set plus a precomputed, sorted index of trading day numbers"""
+
+    def __init__(self, holidays, market='NYSE'):
+        self.holidays = frozenset(holidays)
+        self.market = market
+
+        start = date(CALENDAR_START_YEAR, 1, 1)
+        end = date(CALENDAR_END_YEAR, 12, 31)
+        self.first_day = date_to_day(start)
+        self.last_day = date_to_day(end)
+        holiday_days = {date_to_day(h) for h in self.holidays}
+        # 1970-01-01 was a Thursday: weekday(day) == (day + 3) % 7 with Mon=0
+        self.trading_days = [
+            day for day in range(self.first_day, self.last_day + 1)
+            if (day + 3) % 7 < 5 and day not in holiday_days
+        ]
+
+    def is_holiday(self, day):
+        return day in self.holidays
+
+    def is_market_open(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _bounds(self, start, end):
+        lo = bisect_left(self.trading_days, date_to_day(start))
+        hi = bisect_right(self.trading_days, date_to_day(end))
+        return lo, hi
+
+    def trading_day_numbers(self, start, end):
+        """Trading days in [start, end] as day numbers (a list slice, no iteration)"""
+        lo, hi = self._bounds(start, end)
+        return self.trading_days[lo:hi]
+
+    def get_trading_days(self, start, end):
+        return [day_to_date(day) for day in self.trading_day_numbers(start, end)]
+
+    def get_trading_days_between(self, start, end):
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+
+    def get_next_trading_day(self, day):
+        index = bisect_right(self.trading_days, date_to_day(day))
+        return day_to_date(self.trading_days[index])
+
+    def get_previous_trading_day(self, day):
+        index = bisect_left(self.trading_days, date_to_day(day)) - 1
+        return day_to_date(self.trading_days[index])
+
+
+_calendars = {}
+
+
+def get_trading_calendar(market='NYSE'):
+    """
+    Creates (once) a trading calendar for US markets: the explicit holiday
+    table, rule-based holidays for the other years, and special closures.
+    """
+    calendar = _calendars.get(market)
+    if calendar is None:
+        holidays = set()
+        for year in range(CALENDAR_START_YEAR, CALENDAR_END_YEAR + 1):
+            if year in US_MARKET_HOLIDAYS:
+                holidays.update(date.fromisoformat(h) for h in US_MARKET_HOLIDAYS[year])
+            else:
+                holidays.update(rule_based_holidays(year))
+        holidays.update(date.fromisoformat(h) for h in SPECIAL_CLOSURES)
+        calendar = TradingCalendar(holidays, market)
+        _calendars[market] = calendar
+    return calendar
+
+
+def is_weekend(day):
+    return day.weekday() >= 5
+
+
+def is_market_open(day, calendar=None):
+    if is_weekend(day):
+        return False
+    return calendar is None or not calendar.is_holiday(day)
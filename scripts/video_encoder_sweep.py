@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Encoder settings sweep for the marketing video renders
+
+Renders a representative clip from the video-assets screenshots (Ken Burns
+motion, crossfades - the same filtergraph create_pro_video.py uses) once as
+a lossless reference, then re-encodes it across a grid of x264 presets, CRF
+values, thread counts and tunes. For every configuration it records encode
+wall/CPU time, file size and SSIM/PSNR against the reference, prints the
+Pareto-optimal settings (no other configuration is faster, smaller and
+better at once) and the fastest one that meets the quality bar.
+
+Encodes run one at a time so timings are not skewed by each other.
+
+Usage:
+  python scripts/video_encoder_sweep.py
+  python scripts/video_encoder_sweep.py --scenes 3 --presets veryfast,fast,medium --crf 18,20,23
+  python scripts/video_encoder_sweep.py --threads 1,4,0 --tunes none,stillimage --min-ssim 0.985
+"""
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from video_render import (
+    REPO_ROOT,
+    ken_burns_canvas,
+    ken_burns_filters,
+    prepare_stills,
+    render_timeline,
+    run_ffmpeg,
+)
+
+WIDTH = 1920
+HEIGHT = 1080
+FPS = 30
+SCENE_SECONDS = 3.0
+
+DEFAULT_ASSETS = REPO_ROOT / "video-assets-v2"
+DEFAULT_PRESETS = "ultrafast,veryfast,fast,medium,slow"
+DEFAULT_CRF = "18,20,23"
+DEFAULT_THREADS = "0"  # 0 = x264's automatic thread count
+DEFAULT_TUNES = "none,stillimage,animation"
+DEFAULT_MIN_SSIM = 0.98
+
+# A gentle zoom and pan, like most SCENES entries
+SAMPLE_MOTION = (1.0, 1.08, -20, 10)
+
+
+def pick_scenes(assets_dir, count):
+    """`count` screenshots spread evenly over the scene*.png files"""
+    scenes = sorted(Path(assets_dir).glob("scene*.png"), key=lambda p: [int(n) for n in re.findall(r"\d+", p.name)])
+    if len(scenes) <= count:
+        return scenes
+    step = len(scenes) / count
+    return [scenes[int(i * step)] for i in range(count)]
+
+
+def render_reference(scenes, output_file):
+    """Lossless render of the sample timeline; every candidate is compared against it"""
+    zoom_start, zoom_end, pan_x, pan_y = SAMPLE_MOTION
+    canvas = ken_burns_canvas(WIDTH, HEIGHT, zoom_start, zoom_end, pan_x, pan_y)[:2]
+    stills = prepare_stills([(scene, *canvas) for scene in scenes])
+    if None in stills:
+        raise RuntimeError("could not prepare sample stills")
+    timeline = [
+        (still, SCENE_SECONDS, ken_burns_filters(WIDTH, HEIGHT, SCENE_SECONDS + 0.5, *SAMPLE_MOTION, prefitted=True))
+        for still in stills
+    ]
+    result = render_timeline(timeline, output_file, [
+        "-c:v", "libx264", "-preset", "ultrafast", "-qp", "0", "-pix_fmt", "yuv420p",
+    ], fps=FPS)
+    if result.returncode != 0:
+        raise RuntimeError(f"reference render failed: {result.stderr[-500:]}")
+    return result.telemetry["outputSeconds"]
+
+
+def encode_args(preset, crf, threads, tune):
+    args = ["-c:v", "libx264", "-preset", preset, "-crf", str(crf), "-pix_fmt", "yuv420p"]
+    if tune != "none":
+        args += ["-tune", tune]
+    return args + ["-threads", str(threads)]
+
+
+def measure_quality(candidate, reference):
+    """(SSIM All, PSNR average dB) of candidate vs reference"""
+    cmd = [
+        "ffmpeg", "-i", str(candidate), "-i", str(reference),
+        "-lavfi", "[0:v]split[a0][a1];[1:v]split[b0][b1];[a0][b0]ssim;[a1][b1]psnr",
+        "-f", "null", "-",
+    ]
+    result = run_ffmpeg(cmd, label="quality")
+    ssim = re.search(r"SSIM .*All:([\d.]+)", result.stderr)
+    psnr = re.search(r"PSNR .*average:([\d.]+|inf)", result.stderr)
+    if result.returncode != 0 or not ssim or not psnr:
+        raise RuntimeError(f"quality measurement failed: {result.stderr[-500:]}")
+    return float(ssim.group(1)), float(psnr.group(1))
+
+
+def pareto_front(results):
+    """Configurations not dominated on (encode time, size, SSIM)"""
+    def dominates(a, b):
+        no_worse = (a["wallSeconds"] <= b["wallSeconds"] and a["outputBytes"] <= b["outputBytes"]
+                    and a["ssim"] >= b["ssim"])
+        better = (a["wallSeconds"] < b["wallSeconds"] or a["outputBytes"] < b["outputBytes"]
+                  or a["ssim"] > b["ssim"])
+        return no_worse and better
+    return [r for r in results if not any(dominates(other, r) for other in results if other is not r)]
+
+
+def describe(r):
+    return f"preset={r['preset']} crf={r['crf']} threads={r['threads']} tune={r['tune']}"
+
+
+def run_sweep(scenes, presets, crfs, threads_list, tunes, workdir, log=print):
+    reference = Path(workdir) / "reference.mkv"
+    seconds = render_reference(scenes, reference)
+    log(f"Reference: {len(scenes)} scenes, {seconds:.1f}s lossless")
+
+    grid = [(p, c, t, tune) for p in presets for c in crfs for t in threads_list for tune in tunes]
+    results = []
+    for i, (preset, crf, threads, tune) in enumerate(grid):
+        output = Path(workdir) / f"candidate_{i:03d}.mp4"
+        cmd = ["ffmpeg", "-y", "-i", str(reference), *encode_args(preset, crf, threads, tune), str(output)]
+        encoded = run_ffmpeg(cmd, label=f"{i+1}/{len(grid)} {preset} crf{crf} t{threads} {tune}")
+        if encoded.returncode != 0:
+            log(f"  Skipping {preset}/{crf}/{threads}/{tune}: {encoded.stderr[-200:]}")
+            continue
+        ssim, psnr = measure_quality(output, reference)
+        stats = encoded.telemetry
+        results.append({
+            "preset": preset, "crf": crf, "threads": threads, "tune": tune,
+            "wallSeconds": stats["wallSeconds"],
+            "cpuSeconds": stats["cpuSeconds"],
+            "outputBytes": stats["outputBytes"],
+            "bitrateKbps": stats["bitrateKbps"],
+            "speed": stats["speed"],
+            "ssim": ssim,
+            "psnr": psnr,
+        })
+        output.unlink()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark x264 settings for the marketing renders")
+    parser.add_argument("--assets", default=str(DEFAULT_ASSETS), help="Directory with scene*.png screenshots")
+    parser.add_argument("--scenes", type=int, default=3, help="Number of sample scenes")
+    parser.add_argument("--presets", default=DEFAULT_PRESETS)
+    parser.add_argument("--crf", default=DEFAULT_CRF)
+    parser.add_argument("--threads", default=DEFAULT_THREADS, help="Comma-separated -threads values (0 = auto)")
+    parser.add_argument("--tunes", default=DEFAULT_TUNES, help="Comma-separated -tune values ('none' = no tune)")
+    parser.add_argument("--min-ssim", type=float, default=DEFAULT_MIN_SSIM, help="Quality bar for the recommendation")
+    parser.add_argument("--report", default=None, help="Write all results as JSON")
+    args = parser.parse_args()
+
+    scenes = pick_scenes(args.assets, args.scenes)
+    if not scenes:
+        print(f"ERROR: no scene*.png files in {args.assets}")
+        sys.exit(1)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="encoder-sweep-") as workdir:
+            results = run_sweep(
+                scenes,
+                args.presets.split(","),
+                [int(c) for c in args.crf.split(",")],
+                [int(t) for t in args.threads.split(",")],
+                args.tunes.split(","),
+                workdir,
+            )
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    front = pareto_front(results)
+    print(f"\n{'settings':<52} {'wall s':>7} {'cpu s':>7} {'KB':>8} {'SSIM':>8} {'PSNR':>6}")
+    for r in sorted(results, key=lambda r: r["wallSeconds"]):
+        mark = "*" if r in front else " "
+        print(f"{mark}{describe(r):<51} {r['wallSeconds']:>7.2f} {r['cpuSeconds']:>7.2f} "
+              f"{r['outputBytes'] / 1024:>8.0f} {r['ssim']:>8.5f} {r['psnr']:>6.2f}")
+    print("* = Pareto-optimal (encode time, size, SSIM)")
+
+    passing = [r for r in results if r["ssim"] >= args.min_ssim]
+    if passing:
+        best = min(passing, key=lambda r: (r["wallSeconds"], r["outputBytes"]))
+        print(f"\nFastest with SSIM >= {args.min_ssim}: {describe(best)} "
+              f"({best['wallSeconds']:.2f}s, {best['outputBytes'] / 1024:.0f} KB, SSIM {best['ssim']:.5f})")
+    else:
+        print(f"\nNo configuration reached SSIM {args.min_ssim}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"scenes": [str(s) for s in scenes], "results": results,
+                       "pareto": [describe(r) for r in front]}, f, indent=2)
+        print(f"Results written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
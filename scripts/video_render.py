@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""
+Shared ffmpeg render helpers for the marketing video scripts
+(video-assets/create_video_v2.py, video-assets-v2/create_pro_video.py,
+video-assets-v2/assemble_final.py)
+
+Scene segments are independent, so they are rendered concurrently on a
+process pool instead of one blocking ffmpeg call at a time. Each worker gets
+an ffmpeg thread budget so the pool as a whole uses the machine's cores
+without oversubscribing them, and results always come back in scene order
+regardless of which segment finishes first.
+
+Segments are joined with the concat demuxer using stream copy when their
+stream parameters match (ffprobe), so the final assembly is a remux rather
+than a second generation of x264 encoding. Mismatched segments fall back to
+the caller's re-encode settings.
+
+render_timeline() goes further for still-image timelines: one filter_complex
+scales every scene, crossfades neighbours with xfade and fades the ends, so
+the whole video is a single decode/encode pass with no intermediate files.
+
+render_variants() fans one decoded timeline out through `split` to several
+encoders in the same ffmpeg process, so extra deliverables (720p, vertical,
+WebM, poster, GIF) cost only their own scaling and encoding.
+
+Screenshots are preprocessed once by prepare_stills(): decoded, fitted onto
+the exact canvas a render needs, converted to yuv420p and stored as
+single-frame y4m files keyed by source hash, on a thread pool. Renders then
+read raw, ready-sized, ready-to-encode frames: no PNG decode, rescale or
+RGB->YUV conversion per output frame.
+
+Every ffmpeg call goes through run_ffmpeg(), which follows ffmpeg's
+-progress stream to print live fps/speed/ETA per job and records wall time,
+CPU time, output size and bitrate; write_telemetry_report() collects those
+records (from all pool workers) into a JSON report.
+
+Rendered segments are kept in a content-addressed cache (SegmentCache) keyed
+by the source bytes plus every render parameter, so a rebuild after changing
+one screenshot re-encodes only that scene and the final assembly.
+
+Configuration:
+  VIDEO_WORKERS      concurrent ffmpeg jobs (default: number of CPUs, capped at the job count)
+  VIDEO_JOB_THREADS  ffmpeg -threads per job (default: CPUs / workers, at least 1)
+  VIDEO_CONCAT       "auto" (default), "copy" or "reencode"
+  VIDEO_CACHE_DIR    segment cache location (default: .cache/video-segments; "off" disables)
+  VIDEO_CACHE_MAX_MB cache size bound, least recently used segments are evicted (default: 2048)
+  VIDEO_STILLS_DIR   preprocessed screenshot cache (default: .cache/video-stills)
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = REPO_ROOT / ".cache" / "video-segments"
+DEFAULT_STILLS_DIR = REPO_ROOT / ".cache" / "video-stills"
+DEFAULT_CACHE_MAX_MB = 2048
+STALE_STAGING_SECONDS = 24 * 3600
+
+# Prepared stills: raw frames in the pixel format every encode uses
+STILL_SUFFIX = ".y4m"
+STILL_PIX_FMT = "yuv420p"
+
+# Seconds between live progress lines per ffmpeg job
+PROGRESS_INTERVAL = 1.0
+
+# Telemetry log shared with pool workers through the environment
+TELEMETRY_ENV = "VIDEO_TELEMETRY_LOG"
+TELEMETRY_STARTED_ENV = "VIDEO_TELEMETRY_STARTED"
+
+# ffmpeg -threads for every run_ffmpeg() call in this process (set per pool worker)
+_job_threads = None
+
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(jobs, workers=None):
+    workers = workers or int(os.getenv("VIDEO_WORKERS", "0")) or cpu_count()
+    return max(1, min(workers, jobs))
+
+
+def thread_budget(workers, threads=None):
+    threads = threads or int(os.getenv("VIDEO_JOB_THREADS", "0"))
+    return threads or max(1, cpu_count() // workers)
+
+
+def _init_worker(threads):
+    global _job_threads
+    _job_threads = threads
+
+
+def _command_duration(cmd):
+    """Seconds of output an ffmpeg command will produce, from its last -t (None if unknown)"""
+    for i in range(len(cmd) - 2, -1, -1):
+        if cmd[i] == "-t":
+            try:
+                return float(cmd[i + 1])
+            except ValueError:
+                return None
+    return None
+
+
+def _log_telemetry(record):
+    """Append one job record to the run's telemetry log (shared by pool workers)"""
+    path = os.getenv(TELEMETRY_ENV)
+    if path:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def run_ffmpeg(cmd, label=None, duration=None, marks=None):
+    """
+    Run an ffmpeg command, applying this worker's thread budget.
+    The last element of `cmd` must be the output file.
+
+    Progress is read from ffmpeg's -progress stream and printed about once
+    a second as fps, speed multiplier and ETA. The returned CompletedProcess
+    carries a `telemetry` dict (wall/CPU time, output size, bitrate), which
+    is also appended to the telemetry log when one is active.
+
+    `marks` ([(name, end_seconds), ...]) splits a single-pass render into
+    sections - e.g. the scenes of a timeline - and records the wall time and
+    output bytes spent on each, as the output clock passes their end.
+    """
+    if _job_threads and "-threads" not in cmd:
+        cmd = cmd[:-1] + ["-threads", str(_job_threads)] + cmd[-1:]
+    cmd = cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+    output = cmd[-1]
+    label = label or Path(output).name
+    duration = duration or _command_duration(cmd)
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    stderr = []
+    drain = threading.Thread(target=lambda: stderr.extend(proc.stderr), daemon=True)
+    drain.start()
+
+    state = {}
+    last_print = 0.0
+    sections = []
+    pending_marks = list(marks or [])
+    section_start = (started, 0, 0.0)
+    for line in proc.stdout:
+        key, _, value = line.strip().partition("=")
+        state[key] = value
+        if key != "progress":
+            continue
+        now = time.perf_counter()
+        done = _out_seconds(state)
+        while pending_marks and (done >= pending_marks[0][1] or value == "end"):
+            name, end = pending_marks.pop(0)
+            size_now = int(state.get("total_size", 0) or 0)
+            since, size_then, out_from = section_start
+            section_bytes = size_now - size_then
+            sections.append({
+                "label": name,
+                "wallSeconds": round(now - since, 3),
+                "outputBytes": section_bytes,
+                "bitrateKbps": round(section_bytes * 8 / (end - out_from) / 1000, 1) if end > out_from else None,
+            })
+            section_start = (now, size_now, end)
+        if value == "continue" and now - last_print < PROGRESS_INTERVAL:
+            continue
+        last_print = now
+        print(f"  [{label}] {_progress_line(state, duration)}", flush=True)
+
+    # wait4 reaps this child alone, so CPU time is per job even with concurrent workers
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    drain.join()
+    wall = time.perf_counter() - started
+
+    out_seconds = _out_seconds(state)
+    size = os.path.getsize(output) if os.path.exists(output) else 0
+    telemetry = {
+        "label": label,
+        "output": str(output),
+        "ok": proc.returncode == 0,
+        "startedAt": time.time() - wall,
+        "wallSeconds": round(wall, 3),
+        "cpuSeconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "maxRssMb": round(usage.ru_maxrss / 1024, 1),
+        "frames": int(state.get("frame", 0) or 0),
+        "outputSeconds": round(out_seconds, 3),
+        "outputBytes": size,
+        "bitrateKbps": round(size * 8 / out_seconds / 1000, 1) if out_seconds else None,
+        "speed": round(out_seconds / wall, 2) if wall else None,
+    }
+    if sections:
+        telemetry["sections"] = sections
+    _log_telemetry(telemetry)
+
+    result = subprocess.CompletedProcess(cmd, proc.returncode, "", "".join(stderr))
+    result.telemetry = telemetry
+    return result
+
+
+def _out_seconds(state):
+    try:
+        return int(state.get("out_time_us", 0)) / 1e6
+    except ValueError:
+        return 0.0
+
+
+def _progress_line(state, duration):
+    done = _out_seconds(state)
+    speed = state.get("speed", "N/A").rstrip("x").strip()
+    parts = [f"{done:.1f}s"]
+    if duration:
+        parts[0] = f"{min(done / duration, 1):4.0%} {done:.1f}/{duration:.1f}s"
+    parts.append(f"fps={state.get('fps', '?')}")
+    parts.append(f"speed={speed}x")
+    try:
+        if duration and float(speed) > 0:
+            parts.append(f"ETA {max(duration - done, 0) / float(speed):.1f}s")
+    except ValueError:
+        pass
+    if state.get("progress") == "end":
+        parts.append("done")
+    return " ".join(parts)
+
+
+def start_telemetry():
+    """Begin collecting per-job records for write_telemetry_report() (inherited by pool workers)"""
+    fd, path = tempfile.mkstemp(prefix="video-telemetry-", suffix=".jsonl")
+    os.close(fd)
+    os.environ[TELEMETRY_ENV] = path
+    os.environ[TELEMETRY_STARTED_ENV] = str(time.time())
+
+
+def write_telemetry_report(report_file):
+    """
+    Write the collected job records as a JSON report and print the slowest
+    jobs. Returns the report dict (None if telemetry was not started).
+    """
+    path = os.environ.pop(TELEMETRY_ENV, None)
+    started = float(os.environ.pop(TELEMETRY_STARTED_ENV, "0") or 0)
+    if not path:
+        return None
+    with open(path) as f:
+        jobs = sorted((json.loads(line) for line in f if line.strip()), key=lambda job: job["startedAt"])
+    os.unlink(path)
+
+    report = {
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpuCount": cpu_count(),
+        "wallSeconds": round(time.time() - started, 3) if started else None,
+        "ffmpegCpuSeconds": round(sum(job["cpuSeconds"] for job in jobs), 3),
+        "jobs": jobs,
+    }
+    with open(report_file, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nRender report: {report_file}")
+    for job in sorted(jobs, key=lambda job: job["wallSeconds"], reverse=True)[:5]:
+        print(f"   {job['label']}: {job['wallSeconds']:.1f}s wall, {job['cpuSeconds']:.1f}s CPU, "
+              f"{job['outputBytes'] / 1024:.0f} KB, {job['speed']}x realtime")
+    return report
+
+
+def render_parallel(jobs, workers=None, threads=None):
+    """
+    Run render jobs concurrently and return their results in job order.
+
+    `jobs` is a list of (function, args) pairs; the functions must be
+    module-level (picklable) and build their ffmpeg commands through
+    run_ffmpeg(). A job that raises counts as a failed (False) result.
+    """
+    if not jobs:
+        return []
+    workers = worker_count(len(jobs), workers)
+    threads = thread_budget(workers, threads)
+    print(f"Rendering {len(jobs)} segments on {workers} worker(s), {threads} ffmpeg thread(s) each")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(function, *args) for function, args in jobs]
+        results = []
+        for i, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"  Job {i+1} failed: {e}")
+                results.append(False)
+    return results
+
+
+# Stream fields that must agree for the concat demuxer to stream-copy safely
+CONCAT_STREAM_FIELDS = (
+    "codec_type", "codec_name", "profile", "width", "height", "pix_fmt",
+    "sample_aspect_ratio", "r_frame_rate", "time_base", "sample_rate", "channels",
+)
+
+
+def probe_streams(path):
+    """Concat-relevant parameters of every stream in a media file"""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "stream=" + ",".join(CONCAT_STREAM_FIELDS),
+        "-of", "json", str(path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {result.stderr.strip()}")
+    streams = json.loads(result.stdout).get("streams", [])
+    return [tuple(stream.get(field) for field in CONCAT_STREAM_FIELDS) for stream in streams]
+
+
+def segments_compatible(segments):
+    """(True, None) when every segment has identical stream parameters, else (False, reason)"""
+    if not segments:
+        return False, "no segments"
+    try:
+        reference = probe_streams(segments[0])
+        for segment in segments[1:]:
+            streams = probe_streams(segment)
+            if streams != reference:
+                return False, f"{segment.name} differs from {segments[0].name}"
+    except RuntimeError as e:
+        return False, str(e)
+    return True, None
+
+
+def write_concat_list(segments, concat_file):
+    with open(concat_file, 'w') as f:
+        for seg in segments:
+            escaped = str(seg).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def concat_segments(segments, output_file, concat_file, reencode_args, output_args=(), variants=()):
+    """
+    Join segments with the concat demuxer.
+
+    Stream-copies when the segments are parameter-compatible (or VIDEO_CONCAT=copy);
+    otherwise, or if the copy fails, re-encodes with `reencode_args`
+    (e.g. ["-c:v", "libx264", "-crf", "20", "-pix_fmt", "yuv420p"]).
+    `output_args` apply to both modes (e.g. ["-movflags", "+faststart"]).
+    `variants` (render_variants() entries) are encoded in the same ffmpeg
+    run, from the one read of the segments that also produces the output.
+    Returns the CompletedProcess of the last ffmpeg run.
+    """
+    write_concat_list(segments, concat_file)
+    concat_input = ["-f", "concat", "-safe", "0", "-i", str(concat_file)]
+    base = ["ffmpeg", "-y", *concat_input]
+    if variants:
+        def join(filters, args, label):
+            return render_variants(concat_input, [(output_file, filters, [*args, *output_args]), *variants], label)
+    else:
+        def join(filters, args, label):
+            return run_ffmpeg(base + [*args, *output_args, str(output_file)], label=label)
+
+    mode = os.getenv("VIDEO_CONCAT", "auto")
+    copy = mode == "copy"
+    if mode == "auto":
+        copy, reason = segments_compatible(segments)
+        if not copy:
+            print(f"  Segments are not stream-compatible ({reason}); re-encoding")
+
+    if copy:
+        print("  Stream-copying segments (no re-encode)")
+        result = join(None, ["-c", "copy"], "concat (copy)")
+        if result.returncode == 0:
+            return result
+        print("  Stream copy failed; re-encoding")
+
+    return join("", reencode_args, "concat (re-encode)")
+
+
+def fit_filters(width, height):
+    """Letterbox a source into width x height (the scripts' scale + pad chain)"""
+    return [
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black",
+    ]
+
+
+def ken_burns_canvas(width, height, zoom_start, zoom_end, pan_x=0, pan_y=0):
+    """
+    Canvas a Ken Burns source is fitted onto: just large enough for the
+    largest zoom plus the pan travel. Returns (canvas_w, canvas_h, pan_margin).
+    """
+    # Extra zoom so a pan never runs out of image at zoom 1.0
+    pan_margin = 1 + 2 * max(abs(pan_x) / width, abs(pan_y) / height)
+    max_zoom = max(zoom_start, zoom_end) * pan_margin
+    return int(width * max_zoom) // 2 * 2, int(height * max_zoom) // 2 * 2, pan_margin
+
+
+def ken_burns_filters(width, height, duration, zoom_start, zoom_end, pan_x=0, pan_y=0, prefitted=False):
+    """
+    Animated zoom + pan for a still, without the 8000px zoompan upscale.
+
+    The source is fitted once onto ken_burns_canvas() (skipped when
+    `prefitted`, i.e. the input already comes from prepare_stills() at that
+    size); each frame is then scaled to the current zoom (scale eval=frame)
+    and cropped to width x height with the pan offset applied. pan_x/pan_y
+    are the pixel offsets reached at the end of the scene, as in SCENES.
+    Needs ffmpeg 5.0+ (per-frame `t` in scale).
+    """
+    canvas_w, canvas_h, pan_margin = ken_burns_canvas(width, height, zoom_start, zoom_end, pan_x, pan_y)
+
+    progress = f"min(t/{duration:.3f},1)"
+    zoom = f"({zoom_start}+({zoom_end}-{zoom_start})*{progress})*{pan_margin:.5f}"
+    return [
+        *([] if prefitted else fit_filters(canvas_w, canvas_h)),
+        f"scale=w='trunc({width}*{zoom}/2)*2':h='trunc({height}*{zoom}/2)*2':eval=frame:flags=bicubic",
+        f"crop={width}:{height}"
+        f":x='clip((iw-ow)/2+{pan_x}*{progress},0,iw-ow)'"
+        f":y='clip((ih-oh)/2+{pan_y}*{progress},0,ih-oh)'",
+    ]
+
+
+def still_input(path, duration, fps):
+    """
+    Input args that loop a still image for `duration` seconds. Prepared
+    stills (single-frame y4m) are looped by the demuxer with timestamps
+    regenerated at `fps`; anything else goes through the image2 loop.
+    """
+    if Path(path).suffix == STILL_SUFFIX:
+        loop = ["-stream_loop", "-1", "-r", str(fps)]
+    else:
+        loop = ["-loop", "1", "-framerate", str(fps)]
+    return [*loop, "-t", f"{duration:.3f}", "-i", str(path)]
+
+
+def overlay_chain(fps, length, delay, fade):
+    """Loop a single decoded overlay frame for `length` seconds with alpha fade in/out"""
+    return ",".join([
+        "loop=loop=-1:size=1",
+        f"setpts=N/({fps}*TB)",
+        f"trim=duration={length:.3f}",
+        f"fade=t=in:st={delay}:d={fade}:alpha=1",
+        f"fade=t=out:st={max(length - delay - fade, delay + fade):.3f}:d={fade}:alpha=1",
+    ])
+
+
+def timeline_filtergraph(scene_filters, durations, fps, transition=0.5, fade=0.3,
+                         overlays=None, overlay_delay=0.5, overlay_fade=0.4):
+    """
+    filter_complex for a sequence of scenes, one input per scene.
+
+    scene_filters[i] is the filter list applied to input i. Inputs must be
+    `durations[i] + transition` seconds long (except the last), so each
+    crossfade starts on the nominal scene boundary and the timeline keeps
+    sum(durations). The result is faded in from / out to black.
+
+    overlays[i] is the input index of scene i's overlay image (or None).
+    Each overlay input is a single decoded frame, split to every scene that
+    uses it, looped in memory and composited bottom-aligned with an alpha
+    fade in after `overlay_delay` and out before the scene's crossfade.
+
+    Returns (filter_complex, output_label, total_duration).
+    """
+    overlays = overlays or [None] * len(scene_filters)
+    chains = []
+
+    uses = {}
+    for i, overlay in enumerate(overlays):
+        if overlay is not None:
+            uses.setdefault(overlay, []).append(i)
+    for overlay, scenes in uses.items():
+        branches = "".join(f"[ov{overlay}_{i}]" for i in scenes)
+        chains.append(f"[{overlay}:v]format=rgba,split={len(scenes)}{branches}")
+
+    normalize = [f"fps={fps}", "format=yuv420p", "setsar=1", "settb=AVTB"]
+    for i, filters in enumerate(scene_filters):
+        if overlays[i] is None:
+            chains.append(f"[{i}:v]{','.join([*filters, *normalize])}[s{i}]")
+            continue
+        chains.append(f"[{i}:v]{','.join(filters) or 'null'}[b{i}]")
+        chains.append(f"[ov{overlays[i]}_{i}]{overlay_chain(fps, durations[i], overlay_delay, overlay_fade)}[c{i}]")
+        chains.append(f"[b{i}][c{i}]overlay=x=(main_w-overlay_w)/2:y=main_h-overlay_h:eof_action=pass,"
+                      f"{','.join(normalize)}[s{i}]")
+
+    current = "s0"
+    offset = 0.0
+    for i in range(1, len(scene_filters)):
+        offset += durations[i - 1]
+        chains.append(
+            f"[{current}][s{i}]xfade=transition=fade:duration={transition}:offset={offset:.3f}[x{i}]"
+        )
+        current = f"x{i}"
+
+    total = sum(durations)
+    chains.append(
+        f"[{current}]fade=t=in:st=0:d={fade},fade=t=out:st={total - fade:.3f}:d={fade}[out]"
+    )
+    return ";".join(chains), "[out]", total
+
+
+def render_timeline(scenes, output_file, encode_args, fps, transition=0.5, fade=0.3, labels=None, overlays=None):
+    """
+    Render [(image_path, duration, filters), ...] in one ffmpeg invocation
+    with crossfades between scenes. `labels` name the scenes in the
+    per-section telemetry; `overlays` optionally gives an overlay image per
+    scene (None for none) - each distinct file is one input, decoded once.
+    Returns the CompletedProcess.
+    """
+    inputs = []
+    for i, (path, duration, _) in enumerate(scenes):
+        extra = transition if i < len(scenes) - 1 else 0
+        inputs += still_input(path, duration + extra, fps)
+
+    overlay_inputs = {}
+    for overlay in overlays or []:
+        if overlay is not None and overlay not in overlay_inputs:
+            overlay_inputs[overlay] = len(scenes) + len(overlay_inputs)
+            inputs += ["-i", str(overlay)]
+
+    graph, label, total = timeline_filtergraph(
+        [filters for _, _, filters in scenes],
+        [duration for _, duration, _ in scenes],
+        fps, transition, fade,
+        overlays=[overlay_inputs.get(overlay) for overlay in overlays] if overlays else None,
+    )
+    cmd = [
+        "ffmpeg", "-y", *inputs,
+        "-filter_complex", graph,
+        "-map", label,
+        "-t", f"{total:.3f}",
+        *encode_args,
+        str(output_file),
+    ]
+    labels = labels or [Path(path).name for path, _, _ in scenes]
+    ends = list(itertools.accumulate(duration for _, duration, _ in scenes))
+    return run_ffmpeg(cmd, label="timeline", duration=total, marks=list(zip(labels, ends)))
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SegmentCache:
+    """
+    Rendered segments stored under the hash of their inputs.
+
+    key() covers the source file's bytes and any render parameters (duration,
+    filter string, encoder args...), so a cached segment is only reused when
+    re-rendering it would produce the same file. Lookups refresh the entry's
+    mtime; evict() removes least recently used entries until the cache fits
+    its size bound.
+    """
+
+    def __init__(self, root=None, max_bytes=None, suffix=".mp4"):
+        root = root or os.getenv("VIDEO_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.enabled = str(root) != "off"
+        self.root = Path(root)
+        self.max_bytes = max_bytes or int(os.getenv("VIDEO_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._staged = itertools.count(1)
+        if self.enabled:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    def key(self, source, *params):
+        digest = hashlib.sha256(file_digest(source).encode())
+        digest.update(json.dumps(params, default=str, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return self.root / f"{key}{self.suffix}"
+
+    def staging_path(self, key, fallback):
+        """Where a worker should render a segment before commit() (`fallback` when disabled)"""
+        if not self.enabled:
+            return fallback
+        return self.root / f".{key}.{os.getpid()}-{next(self._staged)}.tmp{self.suffix}"
+
+    def lookup(self, key):
+        """Cached segment path, or None"""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        if path.exists():
+            os.utime(path)
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+    def commit(self, key, rendered):
+        """Move a freshly rendered segment into the cache; returns its cached path"""
+        if not self.enabled:
+            return rendered
+        path = self.path(key)
+        os.replace(rendered, path)
+        return path
+
+    def evict(self):
+        """Drop least recently used segments until the cache fits max_bytes"""
+        if not self.enabled:
+            return 0
+        entries = []
+        for entry in self.root.glob(f"*{self.suffix}"):
+            if entry.name.startswith("."):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink()
+            total -= size
+            removed += 1
+        # Staging files left behind by interrupted runs
+        cutoff = time.time() - STALE_STAGING_SECONDS
+        for stale in self.root.glob(f".*.tmp{self.suffix}"):
+            if stale.stat().st_mtime < cutoff:
+                stale.unlink()
+        return removed
+
+
+def render_variants(input_args, variants, label="variants"):
+    """
+    Decode the input once and encode every variant from a `split`.
+
+    `variants` is a list of (output_file, filters, output_args). `filters`
+    is a filter chain string applied to that variant's branch (may contain
+    its own labelled sub-graph, e.g. palettegen/paletteuse); "" passes the
+    frames through. None maps the input streams straight to the output
+    without decoding, for a stream copy (output_args ["-c", "copy"]) in the
+    same run. Returns the CompletedProcess.
+    """
+    filtered = [i for i, (_, filters, _) in enumerate(variants) if filters is not None]
+    graph = []
+    if filtered:
+        graph.append(f"[0:v]split={len(filtered)}" + "".join(f"[v{i}]" for i in filtered))
+    outputs = []
+    for i, (output_file, filters, output_args) in enumerate(variants):
+        if filters is None:
+            outputs += ["-map", "0:v", "-map", "0:a?", *output_args, str(output_file)]
+            continue
+        graph.append(f"[v{i}]{filters or 'null'}[o{i}]")
+        outputs += ["-map", f"[o{i}]", *output_args, str(output_file)]
+
+    complex_args = ["-filter_complex", ";".join(graph)] if graph else []
+    cmd = ["ffmpeg", "-y", *input_args, *complex_args, *outputs]
+    return run_ffmpeg(cmd, label=label)
+
+
+def _prepare_still(cache, source, width, height):
+    key = cache.key(source, width, height)
+    cached = cache.lookup(key)
+    if cached:
+        return cached
+    staging = cache.staging_path(key, Path(tempfile.gettempdir()) / f"{key}{STILL_SUFFIX}")
+    cmd = [
+        "ffmpeg", "-y", "-i", str(source),
+        "-vf", ",".join([*fit_filters(width, height), f"format={STILL_PIX_FMT}"]),
+        "-frames:v", "1", "-threads", "1",
+        str(staging),
+    ]
+    result = run_ffmpeg(cmd, label=f"still {Path(source).name}")
+    if result.returncode != 0:
+        print(f"  Failed to preprocess {Path(source).name}: {result.stderr[-300:]}")
+        return None
+    return cache.commit(key, staging)
+
+
+def prepare_stills(requests, workers=None, cache=None):
+    """
+    Decode, fit (scale + pad) and convert screenshots to the encoders'
+    yuv420p once each, stored as raw single-frame y4m (see still_input()).
+
+    `requests` is a list of (source_path, width, height). Sources are hashed
+    and converted concurrently on a thread pool (the work happens in hashlib
+    and ffmpeg, outside the GIL); results are cached by source hash and
+    target size. Returns prepared paths in request order, None for failures.
+    """
+    if not requests:
+        return []
+    cache = cache or SegmentCache(os.getenv("VIDEO_STILLS_DIR") or DEFAULT_STILLS_DIR, suffix=STILL_SUFFIX)
+    workers = worker_count(len(requests), workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        prepared = list(pool.map(lambda request: _prepare_still(cache, *request), requests))
+    print(f"Prepared {len(requests)} stills ({cache.hits} cached) on {workers} thread(s)")
+    cache.evict()
+    return prepared
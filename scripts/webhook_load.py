@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Webhook replay load generator
+
+Turns the normalized trade history (data/seed/trades.csv) into the entry and
+exit alerts TradingView would have sent - the payloads from
+getEntryAlertTemplate()/getExitAlertTemplate() in server/webhookService.ts -
+and replays them in time order against POST /api/webhook/tradingview.
+
+Pacing is open-loop: every alert has a scheduled send time, and it goes out
+then whether or not earlier requests have answered (up to --concurrency
+connections), so a slow server shows up as queueing, not as a lower offered
+load. Latency is reported both from the actual send and from the scheduled
+time (the latter includes time spent waiting for a free connection).
+
+  --speedup S     historical spacing / S (default), idle gaps capped by --max-gap
+  --rate R        fixed R alerts per second instead
+  --rates A,B,..  stepped stages of --stage-seconds each, to find saturation
+  --burst N       send alerts in groups of N at once
+
+Alerts create real positions and trades: run against a local or staging
+server with a disposable database. The `date` field is the send time, since
+the server rejects stale timestamps; the server's per-IP rate limit applies
+unless --source-ips spreads requests over X-Forwarded-For addresses.
+
+Usage:
+  python scripts/webhook_load.py --url http://localhost:3000 --speedup 86400 --limit 2000
+  python scripts/webhook_load.py --rates 5,10,20,50,100 --stage-seconds 30 --source-ips 64
+  python scripts/webhook_load.py --rate 200 --burst 8 --concurrency 32 --report load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from trade_data import TRADES_CSV, load_trades_csv
+
+WEBHOOK_PATH = "/api/webhook/tradingview"
+
+DEFAULT_URL = "http://localhost:3000"
+DEFAULT_SPEEDUP = 86400.0  # one trading day per second
+DEFAULT_MAX_GAP = 5.0
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_STAGE_SECONDS = 30.0
+DEFAULT_SLO_MS = 1000.0
+
+
+def alert_events(rows, strategies=None):
+    """[(historical_time, payload)] for every entry and exit, in time order"""
+    events = []
+    for row in rows:
+        strategy = row["strategyName"]
+        if strategies and strategy not in strategies:
+            continue
+        if not row["entryPrice"] or not row["exitPrice"]:
+            continue  # the export had no printable price (negative CL prices, April 2020)
+        side = row["side"].lower()
+        quantity = int(row["quantity"] or 1)
+        events.append((datetime.fromisoformat(row["entryTime"]), {
+            "symbol": strategy,
+            "signalType": "entry",
+            "data": "buy" if side == "long" else "sell",
+            "direction": side,
+            "quantity": quantity,
+            "price": int(row["entryPrice"]) / 100,
+        }))
+        events.append((datetime.fromisoformat(row["exitTime"]), {
+            "symbol": strategy,
+            "signalType": "exit",
+            "data": "exit",
+            "position": "flat",
+            "quantity": quantity,
+            "price": int(row["exitPrice"]) / 100,
+        }))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def schedule(times, speedup=DEFAULT_SPEEDUP, rate=None, burst=1, max_gap=DEFAULT_MAX_GAP):
+    """Send offsets (seconds from start) for historical times; bursts share their first offset"""
+    if rate:
+        offsets = np.arange(len(times)) / rate
+    else:
+        seconds = np.array([t.timestamp() for t in times])
+        gaps = np.minimum(np.diff(seconds, prepend=seconds[:1]) / speedup, max_gap)
+        offsets = np.cumsum(gaps)
+    if burst > 1:
+        offsets = offsets[(np.arange(len(offsets)) // burst) * burst]
+    return offsets
+
+
+class ConnectionClosed(ConnectionError):
+    """The server closed the connection before sending any part of a response"""
+
+
+class HttpClient:
+    """
+    Minimal keep-alive HTTP/1.1 JSON poster on asyncio streams.
+
+    The server may close a pooled connection while it sits idle (keep-alive
+    timeout); a request that finds its reused connection closed before any
+    response bytes arrive is sent once more on a fresh connection, so idle
+    closes are not counted as server errors.
+    """
+
+    def __init__(self, url, concurrency, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(concurrency)
+        self.idle = []
+
+    async def _connection(self, fresh=False):
+        """(reader, writer, reused)"""
+        if self.idle and not fresh:
+            return (*self.idle.pop(), True)
+        return (*await asyncio.open_connection(self.host, self.port, ssl=self.ssl), False)
+
+    async def _read_response(self, reader):
+        try:
+            status_line = await reader.readline()
+        except ConnectionError as e:
+            raise ConnectionClosed(str(e)) from e
+        if not status_line:
+            raise ConnectionClosed("connection closed")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding") == "chunked":
+            body = b""
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+        return status, headers, body
+
+    async def post(self, path, payload, headers=None):
+        """(status, parsed JSON body or None, seconds waited for a slot)"""
+        queued = time.perf_counter()
+        async with self.slots:
+            waited = time.perf_counter() - queued
+            body = json.dumps(payload).encode()
+            extra = "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items())
+            request = (
+                f"POST {path} HTTP/1.1\r\nHost: {self.host_header}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"User-Agent: webhook-load\r\n{extra}\r\n"
+            ).encode() + body
+            for attempt in range(2):
+                reader, writer, reused = await self._connection(fresh=attempt > 0)
+                try:
+                    try:
+                        writer.write(request)
+                        await writer.drain()
+                    except ConnectionError as e:
+                        raise ConnectionClosed(str(e)) from e
+                    status, response_headers, response = await asyncio.wait_for(
+                        self._read_response(reader), self.timeout)
+                except ConnectionClosed:
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue  # closed while idle in the pool
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                break
+            if response_headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self.idle.append((reader, writer))
+        try:
+            return status, json.loads(response), waited
+        except ValueError:
+            return status, None, waited
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle.clear()
+
+
+async def replay(client, events, offsets, token=None, source_ips=0, log=print):
+    """Fire every event at its offset; returns one result dict per event"""
+    results = [None] * len(events)
+    start = time.perf_counter()
+
+    async def fire(i, payload):
+        scheduled = start + offsets[i]
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        payload = dict(payload, date=datetime.now(timezone.utc).isoformat(timespec="milliseconds"))
+        if token:
+            payload["token"] = token
+        headers = {"X-Forwarded-For": f"10.77.{(i % source_ips) // 256}.{(i % source_ips) % 256}"} if source_ips else None
+        sent = time.perf_counter()
+        try:
+            status, body, waited = await client.post(WEBHOOK_PATH, payload, headers)
+            error = None if status < 400 and (body or {}).get("success", True) else (body or {}).get("error") or f"HTTP {status}"
+        except Exception as e:
+            status, waited, error = 0, 0.0, type(e).__name__
+        done = time.perf_counter()
+        results[i] = {
+            "offset": offsets[i],
+            "status": status,
+            "error": error,
+            "latency": done - sent - waited,
+            "correctedLatency": done - scheduled,
+            "done": done - start,
+        }
+
+    tasks = [asyncio.ensure_future(fire(i, payload)) for i, (_, payload) in enumerate(events)]
+    total = len(tasks)
+    finished = 0
+    for task in asyncio.as_completed(tasks):
+        await task
+        finished += 1
+        if finished % 500 == 0 or finished == total:
+            log(f"  {finished}/{total} sent ({time.perf_counter() - start:.1f}s)")
+    return results
+
+
+def summarize(results, offered_rate=None):
+    latency = np.array([r["latency"] for r in results]) * 1000
+    corrected = np.array([r["correctedLatency"] for r in results]) * 1000
+    elapsed = max(r["done"] for r in results) - min(r["offset"] for r in results)
+    errors = Counter(r["error"] for r in results if r["error"])
+    ok = len(results) - sum(errors.values())
+    summary = {
+        "requests": len(results),
+        "ok": ok,
+        "errorRate": round(1 - ok / len(results), 6),
+        "errors": dict(errors.most_common()),
+        "statuses": {str(k): v for k, v in sorted(Counter(r["status"] for r in results).items())},
+        "elapsedSeconds": round(elapsed, 3),
+        "throughput": round(len(results) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latencyMs": {f"p{q}": round(float(np.percentile(latency, q)), 2) for q in (50, 95, 99)},
+        "correctedLatencyMs": {f"p{q}": round(float(np.percentile(corrected, q)), 2) for q in (50, 95, 99)},
+    }
+    summary["latencyMs"]["max"] = round(float(latency.max()), 2)
+    if offered_rate:
+        summary["offeredRate"] = offered_rate
+    return summary
+
+
+def print_summary(label, s):
+    lat, cor = s["latencyMs"], s["correctedLatencyMs"]
+    print(f"{label}: {s['requests']} requests, {s['throughput']:.1f}/s, errors {s['errorRate']:.1%}  "
+          f"latency p50 {lat['p50']:.0f}ms p95 {lat['p95']:.0f}ms p99 {lat['p99']:.0f}ms  "
+          f"(from schedule p99 {cor['p99']:.0f}ms)")
+    if s["errors"]:
+        print("  " + ", ".join(f"{k}: {v}" for k, v in s["errors"].items()))
+
+
+async def run(args, events):
+    client = HttpClient(args.url, args.concurrency, args.timeout)
+    stages = []
+    try:
+        if args.rates:
+            position = 0
+            for rate in args.rates:
+                count = int(rate * args.stage_seconds)
+                stage = events[position:position + count]
+                if not stage:
+                    break
+                position += len(stage)
+                print(f"\nStage {rate:g}/s: {len(stage)} alerts")
+                offsets = schedule([t for t, _ in stage], rate=rate, burst=args.burst)
+                results = await replay(client, stage, offsets, args.token, args.source_ips)
+                stages.append(summarize(results, rate))
+        else:
+            offsets = schedule([t for t, _ in events], args.speedup, args.rate, args.burst, args.max_gap)
+            print(f"\nReplaying {len(events)} alerts over {offsets[-1]:.1f}s")
+            results = await replay(client, events, offsets, args.token, args.source_ips)
+            stages.append(summarize(results, args.rate))
+    finally:
+        client.close()
+    return stages
+
+
+def saturation(stages, slo_ms):
+    """First stage whose p95 breaks the SLO, errors exceed 1% or throughput falls 10% short"""
+    for stage in stages:
+        rate = stage.get("offeredRate")
+        if (stage["correctedLatencyMs"]["p95"] > slo_ms or stage["errorRate"] > 0.01
+                or (rate and stage["throughput"] < 0.9 * rate)):
+            return rate
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay trade history as TradingView webhooks and measure latency")
+    parser.add_argument("--url", default=os.getenv("WEBHOOK_LOAD_URL", DEFAULT_URL), help="Server base URL")
+    parser.add_argument("--trades", default=str(TRADES_CSV), help="Normalized trades CSV")
+    parser.add_argument("--token", default=os.getenv("TRADINGVIEW_WEBHOOK_TOKEN"),
+                        help="Webhook token (default: $TRADINGVIEW_WEBHOOK_TOKEN)")
+    parser.add_argument("--strategies", default=None, help="Comma-separated strategy symbols to replay")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N alerts")
+    parser.add_argument("--speedup", type=float, default=DEFAULT_SPEEDUP, help="Historical time compression")
+    parser.add_argument("--max-gap", type=float, default=DEFAULT_MAX_GAP, help="Longest idle gap (seconds)")
+    parser.add_argument("--rate", type=float, default=None, help="Fixed alerts per second")
+    parser.add_argument("--rates", default=None, help="Comma-separated stepped rates, e.g. 5,10,20,50")
+    parser.add_argument("--stage-seconds", type=float, default=DEFAULT_STAGE_SECONDS)
+    parser.add_argument("--burst", type=int, default=1, help="Alerts sent together per burst")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Open connections")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request timeout (seconds)")
+    parser.add_argument("--source-ips", type=int, default=0,
+                        help="Spread requests over N X-Forwarded-For addresses (per-IP rate limit)")
+    parser.add_argument("--slo-ms", type=float, default=DEFAULT_SLO_MS, help="p95 latency bar for saturation")
+    parser.add_argument("--report", default=None, help="Write the summary as JSON")
+    args = parser.parse_args()
+    args.rates = [float(r) for r in args.rates.split(",")] if args.rates else None
+
+    try:
+        events = alert_events(load_trades_csv(args.trades),
+                              set(args.strategies.split(",")) if args.strategies else None)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"ERROR: could not read trades: {e}")
+        sys.exit(1)
+    events = events[:args.limit] if args.limit else events
+    if not events:
+        print("ERROR: no alerts to replay")
+        sys.exit(1)
+
+    print(f"Target: {args.url}{WEBHOOK_PATH}  concurrency {args.concurrency}  burst {args.burst}")
+    stages = asyncio.run(run(args, events))
+
+    print()
+    for stage in stages:
+        label = f"{stage['offeredRate']:g}/s" if stage.get("offeredRate") else "replay"
+        print_summary(label, stage)
+    if args.rates:
+        saturated = saturation(stages, args.slo_ms)
+        print(f"\nSaturation: {f'{saturated:g}/s' if saturated else 'not reached'} "
+              f"(p95 > {args.slo_ms:.0f}ms, >1% errors or <90% of offered rate)")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"url": args.url, "concurrency": args.concurrency, "burst": args.burst,
+                       "stages": stages}, f, indent=2)
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
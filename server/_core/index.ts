@@ -34,9 +34,11 @@ import {
   waitForActiveRequests,
   getActiveRequestCount,
 } from "./connectionMiddleware";
+import { startCacheEventConsumer } from "../cacheEvents";
 
 // Server state tracking
 let httpServer: Server | null = null;
+let stopCacheEvents: (() => void) | null = null;
 let isShuttingDown = false;
 
 function isPortAvailable(port: number): Promise<boolean> {
@@ -256,6 +258,11 @@ async function startServer() {
     );
   });
 
+  // Evict cache keys named by change sets from the ingest/benchmark jobs
+  if (process.env.CACHE_EVENTS_DIR !== "off") {
+    stopCacheEvents = startCacheEventConsumer();
+  }
+
   // Handle server errors
   httpServer.on("error", (error: NodeJS.ErrnoException) => {
     if (error.code === "EADDRINUSE") {
@@ -284,6 +291,8 @@ async function startServer() {
     console.log(`${signal} received, initiating graceful shutdown...`);
     console.log(`Active requests: ${getActiveRequestCount()}`);
 
+    stopCacheEvents?.();
+
     // Wait for active requests to complete (max 10 seconds)
     await waitForActiveRequests(10000);
 
@@ -66,6 +66,13 @@ class MemoryCache {
     });
   }
 
+  /**
+   * List cached keys (used for targeted invalidation)
+   */
+  keys(): string[] {
+    return Array.from(this.cache.keys());
+  }
+
   /**
    * Invalidate a specific cache key
    */
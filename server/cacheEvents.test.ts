@@ -0,0 +1,177 @@
+import { describe, it, expect } from 'vitest';
+import { copyFileSync, mkdtempSync, readdirSync, writeFileSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import {
+  affectedKeys,
+  drainChangeSets,
+  evictAllDerived,
+  timeRangeStart,
+  type ChangeSet,
+  type ResolvedChange,
+} from './cacheEvents';
+import { addToSpan, changeSetFileName, publishChangeSet, type DateSpan } from './lib/cacheChangeSets';
+
+const NOW = new Date('2026-01-15T12:00:00Z');
+
+// Written by scripts/cache_events.py publish_change_set()
+const PYTHON_FIXTURE = join(process.cwd(), 'scripts/tests/fixtures/cache_events/20260105T213002123456-0a1b2c3d.json');
+
+const KEYS = [
+  'portfolio:overview:6M:100000',
+  'portfolio:overview:ALL:100000',
+  'public_overview_1Y_100000_1',
+  'strategy:detail:1:6M',
+  'strategy:detail:1:ALL',
+  'strategy:detail:2:ALL',
+  'public_strategy_2_ALL_100000',
+  'strategy:metrics:1:5Y',
+  'compare:2-3:ALL',
+  'trades:1,2:2015-01-01:2015-12-31',
+  'trades:2:all:now',
+  'benchmark:2025-01-01:now',
+  'platform:stats',
+  'public_strategies_list',
+  'webhook:logs:all:100',
+  'positions:open',
+];
+
+function change(strategies: ResolvedChange['strategies'], benchmarks: DateSpan[] = []): ResolvedChange {
+  return { strategies, benchmarks };
+}
+
+describe('Targeted Cache Invalidation', () => {
+  describe('timeRangeStart', () => {
+    it('should match the router presets', () => {
+      expect(timeRangeStart('6M', NOW)).toBe('2025-07-15');
+      expect(timeRangeStart('YTD', NOW)).toBe('2026-01-01');
+      expect(timeRangeStart('5Y', NOW)).toBe('2021-01-15');
+      expect(timeRangeStart('ALL', NOW)).toBeNull();
+    });
+  });
+
+  describe('affectedKeys', () => {
+    it('should evict only the changed strategy and ranges its dates reach', () => {
+      const keys = affectedKeys(KEYS, change([{ id: 1, start: '2015-03-02', end: '2015-03-06' }]), NOW);
+      expect(keys).toEqual([
+        'portfolio:overview:ALL:100000',
+        'strategy:detail:1:ALL',
+        'trades:1,2:2015-01-01:2015-12-31',
+        'platform:stats',
+        'public_strategies_list',
+      ]);
+    });
+
+    it('should reach recent ranges for recent trades', () => {
+      const keys = affectedKeys(KEYS, change([{ id: 2, start: '2026-01-12', end: '2026-01-14' }]), NOW);
+      expect(keys).toContain('portfolio:overview:6M:100000');
+      expect(keys).toContain('public_overview_1Y_100000_1');
+      expect(keys).toContain('public_strategy_2_ALL_100000');
+      expect(keys).toContain('compare:2-3:ALL');
+      expect(keys).toContain('trades:2:all:now');
+      expect(keys).not.toContain('strategy:detail:1:6M');
+      expect(keys).not.toContain('trades:1,2:2015-01-01:2015-12-31');
+      expect(keys).not.toContain('benchmark:2025-01-01:now');
+    });
+
+    it('should treat an unresolved strategy as any strategy', () => {
+      const keys = affectedKeys(KEYS, change([{ id: null, start: null, end: '2026-01-14' }]), NOW);
+      expect(keys).toContain('strategy:detail:1:6M');
+      expect(keys).toContain('strategy:detail:2:ALL');
+      expect(keys).not.toContain('benchmark:2025-01-01:now');
+    });
+
+    it('should evict benchmark-backed keys without touching trade lists', () => {
+      const keys = affectedKeys(KEYS, change([], [{ start: '2026-01-13', end: '2026-01-14' }]), NOW);
+      expect(keys).toContain('benchmark:2025-01-01:now');
+      expect(keys).toContain('portfolio:overview:6M:100000');
+      expect(keys).not.toContain('trades:2:all:now');
+      expect(keys).not.toContain('platform:stats');
+    });
+
+    it('should never evict keys unrelated to trades or benchmarks', () => {
+      const keys = affectedKeys(KEYS, change([{ id: null, start: null, end: '2026-01-14' }], [{ start: null, end: '2026-01-14' }]), NOW);
+      expect(keys).not.toContain('webhook:logs:all:100');
+      expect(keys).not.toContain('positions:open');
+    });
+  });
+
+  describe('spool', () => {
+    it('should apply published change sets in order and delete them', async () => {
+      const dir = mkdtempSync(join(tmpdir(), 'cache-events-'));
+      const spans: Record<string, DateSpan> = {};
+      addToSpan(spans, 'ESTrend', new Date('2025-03-05T15:00:00Z'));
+      addToSpan(spans, 'ESTrend', new Date('2025-03-03T15:00:00Z'));
+      expect(spans).toEqual({ ESTrend: { start: '2025-03-03', end: '2025-03-05' } });
+
+      publishChangeSet('first', { strategies: spans }, dir);
+      publishChangeSet('second', { benchmarks: { SPY: { start: '2025-03-05', end: '2025-03-05' } } }, dir);
+      expect(publishChangeSet('empty', {}, dir)).toBeNull();
+      writeFileSync(join(dir, '.partial.json.tmp'), '{');
+
+      const seen: ChangeSet[] = [];
+      const applied = await drainChangeSets(dir, async c => {
+        seen.push(c);
+        return 0;
+      });
+
+      expect(applied).toBe(2);
+      expect(seen.map(c => c.source)).toEqual(['first', 'second']);
+      expect(seen[0]!.strategies.ESTrend).toEqual({ start: '2025-03-03', end: '2025-03-05' });
+      expect(readdirSync(dir)).toEqual(['.partial.json.tmp']);
+    });
+
+    it('should evict broadly and still delete a change set that fails', async () => {
+      const dir = mkdtempSync(join(tmpdir(), 'cache-events-'));
+      writeFileSync(join(dir, '20260105T000000000000-aaaaaaaa.json'), '{not json');
+      publishChangeSet('throws', { benchmarks: { SPY: { start: null, end: '2026-01-05' } } }, dir);
+
+      let fallbacks = 0;
+      const applied = await drainChangeSets(
+        dir,
+        async () => {
+          throw new Error('lookup failed');
+        },
+        () => fallbacks++
+      );
+
+      expect(applied).toBe(0);
+      expect(fallbacks).toBe(2);
+      expect(readdirSync(dir)).toEqual([]);
+    });
+
+    it('should read Python-published change sets in publish order with TypeScript ones', async () => {
+      const dir = mkdtempSync(join(tmpdir(), 'cache-events-'));
+      copyFileSync(PYTHON_FIXTURE, join(dir, '20260105T213002123456-0a1b2c3d.json'));
+      writeFileSync(
+        join(dir, '20260105T213002124999-0a1b2c3e.json'),
+        JSON.stringify({ source: 'python-later', createdAt: '2026-01-05T21:30:02Z', strategies: {}, benchmarks: {} })
+      );
+      const name = changeSetFileName(new Date('2026-01-05T21:30:02.124Z'));
+      expect(name).toMatch(/^20260105T213002124\d{3}-[0-9a-f]{8}\.json$/);
+      writeFileSync(
+        join(dir, name),
+        JSON.stringify({ source: 'typescript', createdAt: '2026-01-05T21:30:02Z', strategies: {}, benchmarks: {} })
+      );
+
+      const seen: ChangeSet[] = [];
+      await drainChangeSets(dir, async c => {
+        seen.push(c);
+        return 0;
+      });
+
+      expect(seen.map(c => c.source)).toEqual(['update-benchmark', 'typescript', 'python-later']);
+      expect(seen[0]!.strategies).toEqual({ ESTrend: { start: null, end: '2026-01-02' } });
+      expect(seen[0]!.benchmarks).toEqual({ SPY: { start: '2026-01-02', end: '2026-01-05' } });
+    });
+  });
+
+  describe('evictAllDerived', () => {
+    it('should evict every trade or benchmark derived key and nothing else', () => {
+      const keys = new Set([...KEYS, 'strategy:summary:1']);
+      const fake = { keys: () => Array.from(keys), invalidate: (key: string) => keys.delete(key) };
+      expect(evictAllDerived([fake])).toBe(KEYS.length - 1);
+      expect(Array.from(keys)).toEqual(['webhook:logs:all:100', 'positions:open']);
+    });
+  });
+});
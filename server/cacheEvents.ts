@@ -0,0 +1,252 @@
+/**
+ * Targeted Cache Invalidation
+ *
+ * Jobs that write trades or benchmark rows publish a change set - which
+ * strategies and benchmarks changed, and over which dates - to a spool
+ * directory (scripts/cache_events.py, lib/cacheChangeSets.ts). The
+ * server polls the spool and evicts only the cache keys those dates can
+ * reach: a strategy's 6M detail survives a backfill of 2015 trades, and
+ * other strategies' entries survive entirely. Keys that are not derived
+ * from trades or benchmarks (webhook logs, open positions) are never touched.
+ *
+ * Change sets are deleted from the spool once applied. One that cannot be
+ * read or applied falls back to evicting every trade/benchmark-derived key.
+ */
+
+import { readdirSync, readFileSync, unlinkSync } from "fs";
+import { join } from "path";
+import { cache } from "./cache";
+import { cacheService } from "./services/cacheService";
+import { getAllStrategies } from "./db";
+import { eventsDir, type ChangeSet, type DateSpan } from "./lib/cacheChangeSets";
+
+export type { ChangeSet, DateSpan };
+
+// A strategy change with its symbol resolved; id null = unknown, matches every strategy
+export interface ResolvedChange {
+  strategies: Array<DateSpan & { id: number | null }>;
+  benchmarks: DateSpan[];
+}
+
+export interface EvictableCache {
+  keys(): string[];
+  invalidate(key: string): unknown;
+}
+
+/**
+ * First day covered by a TimeRange preset, as in the routers; null for ALL
+ */
+export function timeRangeStart(timeRange: string, now: Date = new Date()): string | null {
+  const start = new Date(now);
+  switch (timeRange) {
+    case "6M":
+      start.setMonth(now.getMonth() - 6);
+      break;
+    case "YTD":
+      return `${now.getFullYear()}-01-01`;
+    case "1Y":
+      start.setFullYear(now.getFullYear() - 1);
+      break;
+    case "3Y":
+      start.setFullYear(now.getFullYear() - 3);
+      break;
+    case "5Y":
+      start.setFullYear(now.getFullYear() - 5);
+      break;
+    case "10Y":
+      start.setFullYear(now.getFullYear() - 10);
+      break;
+    default:
+      return null;
+  }
+  return start.toISOString().slice(0, 10);
+}
+
+function day(value: string | undefined): string | null {
+  return !value || value === "all" || value === "now" ? null : value.slice(0, 10);
+}
+
+// Does a changed span reach into [from, to]? null bounds are open.
+function overlaps(span: DateSpan, from: string | null, to: string | null = null): boolean {
+  return (from === null || span.end >= from) && (to === null || span.start === null || span.start <= to);
+}
+
+function ids(list: string): number[] | null {
+  const found = list.match(/\d+/g);
+  return found ? found.map(Number) : null; // "all" or empty = every strategy
+}
+
+type Rule = (match: RegExpMatchArray, change: ResolvedChange, now: Date) => boolean;
+
+const anyTrades: Rule = (_m, change) => change.strategies.length > 0;
+
+function inRange(timeRange: string, change: ResolvedChange, now: Date, strategyIds: number[] | null): boolean {
+  const from = timeRangeStart(timeRange, now);
+  return (
+    change.strategies.some(
+      s => overlaps(s, from) && (strategyIds === null || s.id === null || strategyIds.includes(s.id))
+    ) || change.benchmarks.some(b => overlaps(b, from))
+  );
+}
+
+// Key families from cacheKeys (cache.ts, cacheService.ts) and the public routes
+const RULES: Array<[RegExp, Rule]> = [
+  [/^portfolio:overview:([^:]+):/, (m, c, now) => inRange(m[1], c, now, null)],
+  [/^public_overview_([^_]+)_/, (m, c, now) => inRange(m[1], c, now, null)],
+  [/^strategy:(?:detail|metrics):(\d+):([^:]+)$/, (m, c, now) => inRange(m[2], c, now, [Number(m[1])])],
+  [/^public_strategy_(\d+)_([^_]+)_/, (m, c, now) => inRange(m[2], c, now, [Number(m[1])])],
+  [/^compare:([\d-]+):([^:]+)$/, (m, c, now) => inRange(m[2], c, now, ids(m[1]))],
+  [
+    /^strategy:trades:(\d+):/,
+    (m, c) => c.strategies.some(s => s.id === null || s.id === Number(m[1])),
+  ],
+  [
+    /^trades:(.*):([^:]+):([^:]+)$/,
+    (m, c) => {
+      const wanted = ids(m[1]);
+      return c.strategies.some(
+        s => (wanted === null || s.id === null || wanted.includes(s.id)) && overlaps(s, day(m[2]), day(m[3]))
+      );
+    },
+  ],
+  [/^benchmark:([^:]+):([^:]+)$/, (m, c) => c.benchmarks.some(b => overlaps(b, day(m[1]), day(m[2])))],
+  [/^(?:platform:stats|portfolio:strategies|public_strategies_list|strategies:all|user:portfolio:)/, anyTrades],
+];
+
+/**
+ * The subset of `keys` a change set can affect
+ */
+export function affectedKeys(keys: string[], change: ResolvedChange, now: Date = new Date()): string[] {
+  return keys.filter(key => {
+    for (const [pattern, rule] of RULES) {
+      const match = key.match(pattern);
+      if (match) return rule(match, change, now);
+    }
+    return false;
+  });
+}
+
+/**
+ * Map strategy symbols to ids; unknown symbols stay null and match every strategy
+ */
+export async function resolveChangeSet(
+  change: ChangeSet,
+  lookup: () => Promise<Array<{ id: number; symbol: string }>> = getAllStrategies
+): Promise<ResolvedChange> {
+  const symbols = Object.keys(change.strategies ?? {});
+  let idBySymbol = new Map<string, number>();
+  if (symbols.length > 0) {
+    try {
+      idBySymbol = new Map((await lookup()).map(s => [s.symbol, s.id]));
+    } catch (error) {
+      console.warn("[CacheEvents] Strategy lookup failed, evicting for all strategies:", error);
+    }
+  }
+  return {
+    strategies: symbols.map(symbol => ({ ...change.strategies[symbol], id: idBySymbol.get(symbol) ?? null })),
+    benchmarks: Object.values(change.benchmarks ?? {}),
+  };
+}
+
+/**
+ * Evict the keys a change set affects from each cache; returns the number evicted
+ */
+export async function applyChangeSet(
+  change: ChangeSet,
+  caches: EvictableCache[] = [cache, cacheService],
+  now: Date = new Date()
+): Promise<number> {
+  const resolved = await resolveChangeSet(change);
+  let evicted = 0;
+  for (const target of caches) {
+    for (const key of affectedKeys(target.keys(), resolved, now)) {
+      target.invalidate(key);
+      evicted++;
+    }
+  }
+  return evicted;
+}
+
+/**
+ * Apply and delete every spooled change set, oldest first
+ */
+export async function drainChangeSets(
+  dir: string = eventsDir(),
+  apply: (change: ChangeSet) => Promise<number> = change => applyChangeSet(change),
+  fallback: () => unknown = () => evictAllDerived()
+): Promise<number> {
+  let names: string[];
+  try {
+    names = readdirSync(dir)
+      .filter(name => name.endsWith(".json") && !name.startsWith("."))
+      .sort();
+  } catch {
+    return 0; // Nothing published yet
+  }
+
+  let applied = 0;
+  for (const name of names) {
+    const path = join(dir, name);
+    try {
+      try {
+        const change = JSON.parse(readFileSync(path, "utf-8")) as ChangeSet;
+        const evicted = await apply(change);
+        console.log(`[CacheEvents] ${change.source}: evicted ${evicted} cache entries`);
+        applied++;
+      } catch (error) {
+        // We can't tell what changed, so don't let anything derived from it go stale
+        console.error(`[CacheEvents] Could not apply change set ${name}, evicting broadly:`, error);
+        fallback();
+      }
+      unlinkSync(path);
+    } catch (error) {
+      console.error(`[CacheEvents] Could not process change set ${name}, will retry:`, error);
+    }
+  }
+  return applied;
+}
+
+// Key families cache.invalidatePortfolio() clears, including ones RULES does not know
+const PORTFOLIO_FAMILIES = /^(?:portfolio|strategy|trades):/;
+
+/**
+ * Broad eviction for a change set that could not be applied: every key a
+ * trade or benchmark change can reach, plus everything invalidatePortfolio()
+ * would clear, in each of `caches`
+ */
+export function evictAllDerived(caches: EvictableCache[] = [cache, cacheService]): number {
+  const everything: ResolvedChange = {
+    strategies: [{ id: null, start: null, end: "9999-12-31" }],
+    benchmarks: [{ start: null, end: "9999-12-31" }],
+  };
+  let evicted = 0;
+  for (const target of caches) {
+    const keys = target.keys();
+    const affected = new Set(affectedKeys(keys, everything));
+    for (const key of keys) {
+      if (affected.has(key) || PORTFOLIO_FAMILIES.test(key)) {
+        target.invalidate(key);
+        evicted++;
+      }
+    }
+  }
+  return evicted;
+}
+
+/**
+ * Poll the spool directory; returns a function that stops polling
+ */
+export function startCacheEventConsumer(intervalMs: number = 5000, dir: string = eventsDir()): () => void {
+  let draining = false;
+  const timer = setInterval(async () => {
+    if (draining) return;
+    draining = true;
+    try {
+      await drainChangeSets(dir);
+    } finally {
+      draining = false;
+    }
+  }, intervalMs);
+  timer.unref();
+  return () => clearInterval(timer);
+}
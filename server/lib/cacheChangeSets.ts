@@ -0,0 +1,86 @@
+/**
+ * Cache Change Sets
+ *
+ * Format and publisher for the cache invalidation spool consumed by
+ * server/cacheEvents.ts; scripts/cache_events.py writes the same files.
+ * One JSON file per change set, renamed into place so partial writes are
+ * never read. Kept free of the cache singletons so one-off scripts can
+ * publish without starting cache timers.
+ */
+
+import { mkdirSync, renameSync, writeFileSync } from "fs";
+import { join } from "path";
+import { randomBytes } from "crypto";
+
+export interface DateSpan {
+  start: string | null; // ISO date; null = from the first stored day
+  end: string;
+}
+
+export interface ChangeSet {
+  source: string;
+  createdAt: string;
+  strategies: Record<string, DateSpan>; // keyed by strategy symbol
+  benchmarks: Record<string, DateSpan>;
+}
+
+let sequence = 0;
+
+export function eventsDir(): string {
+  return (
+    process.env.CACHE_EVENTS_DIR ||
+    join(process.env.DERIVED_DIR || join(process.cwd(), "data/derived"), "cache_events")
+  );
+}
+
+/**
+ * Time-ordered file name, so change sets are applied in publish order. Matches
+ * scripts/cache_events.py (YYYYMMDDTHHMMSS + 6 sub-second digits); the
+ * sequence fills the microsecond digits Python writes.
+ */
+export function changeSetFileName(now: Date = new Date()): string {
+  const stamp = now.toISOString().replace(/[-:.Z]/g, "") + String(sequence++ % 1000).padStart(3, "0");
+  return `${stamp}-${randomBytes(4).toString("hex")}.json`;
+}
+
+/**
+ * Spool a change set from a TypeScript job (same format as scripts/cache_events.py)
+ */
+export function publishChangeSet(
+  source: string,
+  changes: { strategies?: Record<string, DateSpan>; benchmarks?: Record<string, DateSpan> },
+  dir: string = eventsDir()
+): string | null {
+  const strategies = changes.strategies ?? {};
+  const benchmarks = changes.benchmarks ?? {};
+  if (dir === "off" || (Object.keys(strategies).length === 0 && Object.keys(benchmarks).length === 0)) {
+    return null;
+  }
+
+  const now = new Date();
+  const change: ChangeSet = {
+    source,
+    createdAt: now.toISOString().replace(/\.\d+Z$/, "Z"),
+    strategies,
+    benchmarks,
+  };
+  const name = changeSetFileName(now);
+  mkdirSync(dir, { recursive: true });
+  writeFileSync(join(dir, `.${name}.tmp`), JSON.stringify(change));
+  renameSync(join(dir, `.${name}.tmp`), join(dir, name));
+  return join(dir, name);
+}
+
+/**
+ * Extend per-symbol spans with a date (for publishers that scan rows)
+ */
+export function addToSpan(spans: Record<string, DateSpan>, symbol: string, date: Date): void {
+  const iso = date.toISOString().slice(0, 10);
+  const span = spans[symbol];
+  if (!span) {
+    spans[symbol] = { start: iso, end: iso };
+    return;
+  }
+  if (span.start !== null && iso < span.start) span.start = iso;
+  if (iso > span.end) span.end = iso;
+}
@@ -0,0 +1,51 @@
+import { describe, it, expect } from 'vitest';
+import { parseFixedPoint, toCents, percentToE4 } from './fixedPoint';
+
+describe('Fixed-Point Money Parsing', () => {
+  describe('toCents', () => {
+    it('should convert dollar strings to integer cents', () => {
+      expect(toCents('1645.25')).toBe(164525);
+      expect(toCents('-41.5')).toBe(-4150);
+      expect(toCents('12')).toBe(1200);
+      expect(toCents('.5')).toBe(50);
+    });
+
+    it('should round half away from zero without float drift', () => {
+      // parseFloat('1.005') * 100 === 100.49999999999999
+      expect(toCents('1.005')).toBe(101);
+      expect(toCents('-1.005')).toBe(-101);
+      expect(toCents('0.004')).toBe(0);
+      expect(toCents('-0.004')).toBe(0);
+    });
+
+    it('should accept separators and exponents', () => {
+      expect(toCents('1,234.5')).toBe(123450);
+      expect(toCents('2.5e3')).toBe(250000);
+      expect(toCents(' 3 ')).toBe(300);
+    });
+
+    it('should reject non-numeric text', () => {
+      expect(() => toCents('NAN')).toThrow();
+      expect(() => toCents('')).toThrow();
+      expect(() => toCents('1.2.3')).toThrow();
+      expect(() => toCents('-')).toThrow();
+    });
+  });
+
+  describe('percentToE4', () => {
+    it('should use the pnlPercent scale (1.5% = 15000)', () => {
+      expect(percentToE4('1.5')).toBe(15000);
+      expect(percentToE4('-0.05')).toBe(-500);
+      expect(percentToE4('0.00005')).toBe(1);
+      expect(percentToE4('1e-05')).toBe(0);
+    });
+  });
+
+  describe('parseFixedPoint', () => {
+    it('should match integer scaling for whole digits', () => {
+      expect(parseFixedPoint('7', 0)).toBe(7);
+      expect(parseFixedPoint('7.5', 0)).toBe(8);
+      expect(parseFixedPoint(1.005, 2)).toBe(101);
+    });
+  });
+});
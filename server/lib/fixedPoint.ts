@@ -0,0 +1,60 @@
+/**
+ * Fixed-Point Money Parsing
+ *
+ * Converts decimal text straight to the integer units stored in the database:
+ * prices and P&L in cents, percentages as percent x 10000 (1.5% = 15000).
+ * Scaling the digits avoids float drift (parseFloat("1.005") * 100 rounds to
+ * 100, not 101) and matches scripts/fixed_point.py exactly, so trades
+ * imported through Python and TypeScript produce the same integers.
+ */
+
+export const CENTS_DIGITS = 2;
+export const PERCENT_DIGITS = 4;
+
+const DECIMAL_PATTERN = /^([+-]?)(\d*)(?:\.(\d*))?(?:[eE]([+-]?\d+))?$/;
+
+/**
+ * Parse decimal text as an integer scaled by 10^digits, rounding half away
+ * from zero. Accepts an optional sign, thousands separators and an exponent.
+ * @throws Error if the text is not a decimal number (e.g. "NAN")
+ */
+export function parseFixedPoint(value: string | number, digits: number): number {
+  const text = (typeof value === "number" ? String(value) : value).trim().replace(/,/g, "");
+  const match = DECIMAL_PATTERN.exec(text);
+  if (!match || (!match[2] && !match[3])) {
+    throw new Error(`Not a decimal number: "${value}"`);
+  }
+
+  const [, sign, whole = "", fraction = "", exponent] = match;
+  const number = whole + fraction;
+  const point = whole.length + digits + (exponent ? parseInt(exponent, 10) : 0);
+
+  let result: number;
+  if (point >= number.length) {
+    result = Number(number + "0".repeat(point - number.length));
+  } else {
+    const kept = point > 0 ? number.slice(0, point) : "0";
+    const rest = point >= 0 ? number.slice(point) : "0".repeat(-point) + number;
+    result = Number(kept) + (rest[0]! >= "5" ? 1 : 0);
+  }
+
+  if (!Number.isSafeInteger(result)) {
+    throw new Error(`Out of range: "${value}"`);
+  }
+  return sign === "-" && result !== 0 ? -result : result;
+}
+
+/**
+ * Dollars ("1645.25") to integer cents (164525)
+ */
+export function toCents(value: string | number): number {
+  return parseFixedPoint(value, CENTS_DIGITS);
+}
+
+/**
+ * Percent ("1.5") to the trades.pnlPercent scale, percent x 10000 (15000).
+ * The unit is hundredths of a basis point, not basis points.
+ */
+export function percentToE4(value: string | number): number {
+  return parseFixedPoint(value, PERCENT_DIGITS);
+}
@@ -4,6 +4,18 @@ import { join } from "path";
 import { getDb } from "../db";
 import { trades, strategies } from "../../drizzle/schema";
 import { eq } from "drizzle-orm";
+import { addToSpan, publishChangeSet, type DateSpan } from "../lib/cacheChangeSets";
+
+// trades.csv already holds the table's integer units (cents, percent x 10000).
+// Empty cells: excursions from older exports, prices the export printed as NAN.
+function optionalInt(value: string | undefined): number | null {
+  if (value === undefined || value === "") return null;
+  const parsed = Number(value);
+  if (!Number.isSafeInteger(parsed)) {
+    throw new Error(`Expected an integer, got "${value}"`);
+  }
+  return parsed;
+}
 
 async function seedTrades() {
   const db = await getDb();
@@ -28,6 +40,7 @@ async function seedTrades() {
 
   let inserted = 0;
   const batchSize = 500;
+  const changed: Record<string, DateSpan> = {};
   
   for (let i = 0; i < records.length; i += batchSize) {
     const batch = records.slice(i, i + batchSize);
@@ -38,16 +51,23 @@ async function seedTrades() {
         return null;
       }
 
+      addToSpan(changed, record.strategyName, new Date(record.entryTime));
+      addToSpan(changed, record.strategyName, new Date(record.exitTime));
+
       return {
         strategyId,
         entryDate: new Date(record.entryTime),
         exitDate: new Date(record.exitTime),
         direction: record.side === 'long' ? 'Long' : 'Short',
-        entryPrice: Math.round(parseFloat(record.entryPrice) * 100),
-        exitPrice: Math.round(parseFloat(record.exitPrice) * 100),
-        quantity: parseInt(record.quantity) || 1,
-        pnl: Math.round(parseFloat(record.pnl) * 100),
-        pnlPercent: Math.round(parseFloat(record.pnlPercent) * 10000),
+        entryPrice: optionalInt(record.entryPrice) ?? 0,
+        exitPrice: optionalInt(record.exitPrice) ?? 0,
+        quantity: optionalInt(record.quantity) || 1,
+        pnl: optionalInt(record.pnl) ?? 0,
+        pnlPercent: optionalInt(record.pnlPercent) ?? 0,
+        runUp: optionalInt(record.runUp),
+        runUpPercent: optionalInt(record.runUpPercent),
+        drawdown: optionalInt(record.drawdown),
+        drawdownPercent: optionalInt(record.drawdownPercent),
         commission: 0,
       };
     }).filter(Boolean);
@@ -60,6 +80,11 @@ async function seedTrades() {
   }
 
   console.log("✅ Trades seeded successfully");
+
+  // Let a running server evict just the cache entries these dates reach
+  if (publishChangeSet("seed-trades", { strategies: changed })) {
+    console.log(`Published cache change set for ${Object.keys(changed).length} strategies`);
+  }
 }
 
 seedTrades().catch(console.error);
@@ -71,6 +71,13 @@ class CacheService {
     return data;
   }
 
+  /**
+   * List cached keys (used for targeted invalidation)
+   */
+  keys(): string[] {
+    return Array.from(this.cache.keys());
+  }
+
   /**
    * Invalidate a specific cache key
    */
@@ -4,12 +4,20 @@ STS Futures Final Marketing Video Assembler
 Combines AI-generated cinematic clips with dashboard screenshots
 """
 
-import subprocess
+import argparse
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts"))
+from video_render import (
+    SegmentCache, concat_segments, prepare_stills, render_parallel, run_ffmpeg,
+    start_telemetry, still_input, write_telemetry_report,
+)
+
 ASSETS_DIR = Path("/home/ubuntu/intraday-dashboard/video-assets-v2")
 TEMP_DIR = ASSETS_DIR / "temp_final"
 OUTPUT_VIDEO = ASSETS_DIR / "sts_futures_final.mp4"
+RENDER_REPORT = OUTPUT_VIDEO.with_suffix(".render.json")
 
 FPS = 30
 WIDTH = 1920
@@ -62,36 +70,58 @@ SEQUENCE = [
     ("video", "cta_ending.mp4", 5.0, "CTA ending"),
 ]
 
+# Extra deliverables, encoded in the same ffmpeg run (one read of the segments) as the main output
+# name: (file suffix, filter chain, output args)
+VARIANTS = {
+    "720p": ("_720p.mp4", "scale=1280:720:flags=lanczos", [
+        "-c:v", "libx264", "-preset", "medium", "-crf", "22", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+    ]),
+    "vertical": ("_vertical.mp4", "crop=ih*9/16:ih,scale=1080:1920:flags=lanczos", [
+        "-c:v", "libx264", "-preset", "medium", "-crf", "20", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+    ]),
+    "webm": (".webm", "null", [
+        "-c:v", "libvpx-vp9", "-crf", "32", "-b:v", "0", "-row-mt", "1", "-deadline", "good", "-cpu-used", "4",
+    ]),
+    "poster": ("_poster.jpg", "trim=start=1,setpts=PTS-STARTPTS", ["-frames:v", "1", "-q:v", "2"]),
+    "gif": ("_preview.gif",
+            "trim=duration=6,fps=12,scale=640:-2:flags=lanczos,split[gif_a][gif_b];"
+            "[gif_a]palettegen=stats_mode=diff[gif_p];[gif_b][gif_p]paletteuse", ["-loop", "0"]),
+}
+
+def variant_outputs(names):
+    """render_variants() entries for the requested deliverables"""
+    variants = []
+    for name in names:
+        suffix, filters, output_args = VARIANTS[name]
+        variants.append((OUTPUT_VIDEO.with_name(OUTPUT_VIDEO.stem + suffix), filters, output_args))
+    return variants
+
 def ensure_temp_dir():
     TEMP_DIR.mkdir(exist_ok=True)
 
-def process_image(image_file, duration, output_file):
-    """Convert image to video segment with fade"""
-    image_path = ASSETS_DIR / image_file
-    if not image_path.exists():
-        print(f"  Warning: {image_file} not found")
-        return False
-    
-    # Scale, pad, add fade
-    filter_str = f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=decrease,pad={WIDTH}:{HEIGHT}:(ow-iw)/2:(oh-ih)/2:color=black,fade=t=in:st=0:d=0.3,fade=t=out:st={duration-0.3}:d=0.3,format=yuv420p"
-    
+# Segment encoder settings (part of the segment cache key)
+SEGMENT_ENCODE = ["-c:v", "libx264", "-preset", "fast", "-crf", "18"]
+
+def segment_filter(duration, fit=True):
+    """Scale, pad (unless the source is a prepared still), add fade"""
+    scale = f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=decrease,pad={WIDTH}:{HEIGHT}:(ow-iw)/2:(oh-ih)/2:color=black," if fit else ""
+    return f"{scale}fade=t=in:st=0:d=0.3,fade=t=out:st={duration-0.3}:d=0.3,format=yuv420p"
+
+def process_image(image_path, duration, output_file, label=None):
+    """Convert a prepared (already 1920x1080) still to video segment with fade"""
     cmd = [
         "ffmpeg", "-y",
-        "-loop", "1",
-        "-i", str(image_path),
-        "-vf", filter_str,
-        "-c:v", "libx264",
-        "-preset", "fast",
-        "-crf", "18",
-        "-t", str(duration),
+        *still_input(image_path, duration, FPS),
+        "-vf", segment_filter(duration, fit=False),
+        *SEGMENT_ENCODE,
         "-r", str(FPS),
         str(output_file)
     ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_ffmpeg(cmd, label=label)
     return result.returncode == 0
 
-def process_video(video_file, duration, output_file):
+def process_video(video_file, duration, output_file, label=None):
     """Process AI-generated video clip with fade"""
     video_path = ASSETS_DIR / video_file
     if not video_path.exists():
@@ -99,94 +129,127 @@ def process_video(video_file, duration, output_file):
         return False
     
     # Scale to match resolution and add fade
-    filter_str = f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=decrease,pad={WIDTH}:{HEIGHT}:(ow-iw)/2:(oh-ih)/2:color=black,fade=t=in:st=0:d=0.3,fade=t=out:st={duration-0.3}:d=0.3,format=yuv420p"
-    
     cmd = [
         "ffmpeg", "-y",
         "-i", str(video_path),
-        "-vf", filter_str,
-        "-c:v", "libx264",
-        "-preset", "fast",
-        "-crf", "18",
+        "-vf", segment_filter(duration),
+        *SEGMENT_ENCODE,
         "-t", str(duration),
         "-r", str(FPS),
         str(output_file)
     ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_ffmpeg(cmd, label=label)
     return result.returncode == 0
 
-def create_final_video():
+def create_final_video(variants=()):
     ensure_temp_dir()
-    
-    segments = []
-    
-    for i, (source_type, file_name, duration, desc) in enumerate(SEQUENCE):
-        print(f"Processing {i+1}/{len(SEQUENCE)}: {desc}")
+    start_telemetry()
+    cache = SegmentCache()
+    concat_file = TEMP_DIR / "concat_list.txt"
+    try:
+        # Decode, fit and pad every screenshot once, in parallel (cached by source hash)
+        images = [file_name for source_type, file_name, _, _ in SEQUENCE
+                  if source_type == "image" and (ASSETS_DIR / file_name).exists()]
+        stills = dict(zip(images, prepare_stills([(ASSETS_DIR / name, WIDTH, HEIGHT) for name in images])))
+
+        jobs = []
+        outputs = []
+        for i, (source_type, file_name, duration, desc) in enumerate(SEQUENCE):
+            if source_type == "image":
+                source_path = stills.get(file_name)
+                process = process_image
+            else:
+                source_path = ASSETS_DIR / file_name
+                process = process_video
+            segment_file = TEMP_DIR / f"segment_{i:02d}.mp4"
         
-        segment_file = TEMP_DIR / f"segment_{i:02d}.mp4"
+            if source_path is None or not source_path.exists():
+                print(f"  Warning: {file_name} not found")
+                outputs.append((file_name, segment_file, None, None))
+                continue
         
-        if source_type == "image":
-            success = process_image(file_name, duration, segment_file)
-        else:
-            success = process_video(file_name, duration, segment_file)
+            # Unchanged sources (same bytes, duration and settings) come straight from the cache
+            fit = source_type != "image"
+            key = cache.key(source_path, source_type, duration, segment_filter(duration, fit), SEGMENT_ENCODE, FPS)
+            cached = cache.lookup(key)
+            if cached:
+                print(f"Cached {i+1}/{len(SEQUENCE)}: {desc}")
+                outputs.append((file_name, cached, None, None))
+                continue
+            segment_file = cache.staging_path(key, segment_file)
         
-        if success and segment_file.exists():
-            segments.append(segment_file)
-        else:
-            print(f"  Failed to process {file_name}")
-    
-    # Create concat file
-    concat_file = TEMP_DIR / "concat_list.txt"
-    with open(concat_file, 'w') as f:
-        for seg in segments:
-            f.write(f"file '{seg}'\n")
-    
-    print(f"\nConcatenating {len(segments)} segments...")
+            print(f"Queued {i+1}/{len(SEQUENCE)}: {desc}")
+            outputs.append((file_name, segment_file, key, len(jobs)))
+            jobs.append((process, (source_path if source_type == "image" else file_name, duration, segment_file, desc)))
     
-    # Final concatenation with high quality
-    cmd = [
-        "ffmpeg", "-y",
-        "-f", "concat",
-        "-safe", "0",
-        "-i", str(concat_file),
-        "-c:v", "libx264",
-        "-preset", "slow",
-        "-crf", "18",
-        "-pix_fmt", "yuv420p",
-        "-movflags", "+faststart",
-        str(OUTPUT_VIDEO)
-    ]
+        # Segments render concurrently; the concat list keeps sequence order
+        results = render_parallel(jobs)
+        segments = []
+        for file_name, segment_file, key, job in outputs:
+            success = job is None or results[job]
+            if success and segment_file.exists():
+                if job is not None:
+                    segment_file = cache.commit(key, segment_file)
+                segments.append(segment_file)
+            else:
+                print(f"  Failed to process {file_name}")
+        print(f"Segment cache: {cache.hits} reused, {cache.misses} rendered")
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+        extras = variant_outputs(variants)
+        print(f"\nConcatenating {len(segments)} segments...")
+        if extras:
+            print(f"   with {len(extras)} variant(s) in the same pass: {', '.join(variants)}")
     
-    if result.returncode == 0:
-        size_mb = OUTPUT_VIDEO.stat().st_size / (1024 * 1024)
-        total_duration = sum(d for _, _, d, _ in SEQUENCE)
-        print(f"\n✅ Final video created: {OUTPUT_VIDEO}")
-        print(f"   Duration: ~{total_duration:.1f} seconds")
-        print(f"   File size: {size_mb:.1f} MB")
-        success = True
-    else:
-        print(f"Error: {result.stderr[-500:]}")
-        success = False
+        # Segments were already encoded at crf 18; stream-copy them unless they differ
+        result = concat_segments(segments, OUTPUT_VIDEO, concat_file, [
+            "-c:v", "libx264",
+            "-preset", "slow",
+            "-crf", "18",
+            "-pix_fmt", "yuv420p",
+        ], output_args=["-movflags", "+faststart"], variants=extras)
     
-    # Cleanup
-    print("\nCleaning up...")
-    for f in TEMP_DIR.glob("*.mp4"):
-        f.unlink()
-    if concat_file.exists():
-        concat_file.unlink()
+        if result.returncode == 0:
+            size_mb = OUTPUT_VIDEO.stat().st_size / (1024 * 1024)
+            total_duration = sum(d for _, _, d, _ in SEQUENCE)
+            print(f"\n✅ Final video created: {OUTPUT_VIDEO}")
+            print(f"   Duration: ~{total_duration:.1f} seconds")
+            print(f"   File size: {size_mb:.1f} MB")
+            for output_file, _, _ in extras:
+                size_mb = output_file.stat().st_size / (1024 * 1024)
+                print(f"   {output_file.name}: {size_mb:.1f} MB")
+            success = True
+        else:
+            print(f"Error: {result.stderr[-500:]}")
+            success = False
     
-    return success
+        return success
+    finally:
+        # Cleanup
+        print("\nCleaning up...")
+        for f in TEMP_DIR.glob("*.mp4"):
+            f.unlink()
+        if concat_file.exists():
+            concat_file.unlink()
+        cache.evict()
+        write_telemetry_report(RENDER_REPORT)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assemble the final marketing video")
+    parser.add_argument("--variants", default="",
+                        help=f"Comma-separated extra outputs ({', '.join(VARIANTS)}) or 'all'")
+    args = parser.parse_args()
+    variants = list(VARIANTS) if args.variants == "all" else [v for v in args.variants.split(",") if v]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variant(s): {', '.join(unknown)}")
+    
     print("=" * 60)
     print("STS Futures Final Marketing Video Assembler")
     print("=" * 60)
     print()
     
-    success = create_final_video()
+    success = create_final_video(variants)
     
     if success:
         print("\n🎬 Final video assembly complete!")
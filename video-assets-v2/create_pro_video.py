@@ -4,10 +4,15 @@ STS Futures Professional Marketing Video Generator
 Creates a cinematic marketing video with Ken Burns effects, transitions, and dynamic pacing
 """
 
-import subprocess
 import os
+import sys
 from pathlib import Path
-import json
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts"))
+from video_render import (
+    ken_burns_canvas, ken_burns_filters, prepare_stills, render_timeline,
+    start_telemetry, write_telemetry_report,
+)
 
 # Video settings
 FPS = 30
@@ -18,7 +23,11 @@ RESOLUTION = f"{WIDTH}:{HEIGHT}"
 # Asset directory
 ASSETS_DIR = Path("/home/ubuntu/intraday-dashboard/video-assets-v2")
 OUTPUT_VIDEO = ASSETS_DIR / "sts_futures_pro.mp4"
-TEMP_DIR = ASSETS_DIR / "temp"
+RENDER_REPORT = OUTPUT_VIDEO.with_suffix(".render.json")
+
+# Crossfade between scenes, and fade from/to black at the ends (seconds)
+TRANSITION_DURATION = 0.5
+FADE_DURATION = 0.3
 
 # Scene sequence with Ken Burns parameters
 # (scene_file, duration, zoom_start, zoom_end, pan_x, pan_y, caption_overlay)
@@ -63,181 +72,73 @@ SCENES = [
     ("scene11-pricing.png", 4.0, 1.0, 1.15, 0, -30, None),
 ]
 
-def ensure_temp_dir():
-    """Create temp directory for intermediate files"""
-    TEMP_DIR.mkdir(exist_ok=True)
-
-def create_scene_with_ken_burns(scene_file, duration, zoom_start, zoom_end, pan_x, pan_y, output_file, overlay_file=None):
-    """Create a scene with Ken Burns effect (zoom + pan)"""
-    scene_path = ASSETS_DIR / scene_file
-    if not scene_path.exists():
-        print(f"Warning: {scene_file} not found, skipping...")
-        return False
-    
-    # Calculate zoom and pan animation
-    # zoompan filter: z=zoom, x=pan_x, y=pan_y
-    # We animate from zoom_start to zoom_end over the duration
-    frames = int(duration * FPS)
-    
-    # Build the zoompan filter
-    # z: zoom level (1 = 100%)
-    # x, y: pan position (center of frame)
-    # d: duration in frames
-    # s: output size
-    zoom_expr = f"zoom+({zoom_end}-{zoom_start})/{frames}"
-    x_expr = f"iw/2-(iw/zoom/2)+{pan_x}*on/{frames}"
-    y_expr = f"ih/2-(ih/zoom/2)+{pan_y}*on/{frames}"
-    
-    # Build filter chain
-    filters = [
-        f"scale=8000:-1",  # Scale up for smooth zoompan
-        f"zoompan=z='{zoom_start}+({zoom_end}-{zoom_start})*on/{frames}':x='{x_expr}':y='{y_expr}':d={frames}:s={WIDTH}x{HEIGHT}:fps={FPS}",
-        f"format=yuv420p"
-    ]
-    
-    filter_str = ",".join(filters)
-    
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", str(scene_path),
-        "-vf", filter_str,
-        "-c:v", "libx264",
-        "-preset", "fast",
-        "-crf", "18",
-        "-t", str(duration),
-        str(output_file)
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return result.returncode == 0
-
-def create_scene_simple(scene_file, duration, zoom_start, zoom_end, pan_x, pan_y, output_file):
-    """Create a scene with simple zoom effect (fallback)"""
-    scene_path = ASSETS_DIR / scene_file
-    if not scene_path.exists():
-        print(f"Warning: {scene_file} not found, skipping...")
-        return False
-    
-    frames = int(duration * FPS)
-    
-    # Simpler approach: scale and crop with animation
-    # Use a combination of scale and crop to achieve zoom effect
-    filter_str = f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=decrease,pad={WIDTH}:{HEIGHT}:(ow-iw)/2:(oh-ih)/2:color=black,format=yuv420p"
-    
-    cmd = [
-        "ffmpeg", "-y",
-        "-loop", "1",
-        "-i", str(scene_path),
-        "-vf", filter_str,
-        "-c:v", "libx264",
-        "-preset", "fast",
-        "-crf", "18",
-        "-t", str(duration),
-        "-r", str(FPS),
-        str(output_file)
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return result.returncode == 0
-
-def add_fade_transition(input_file, output_file, fade_in=0.3, fade_out=0.3):
-    """Add fade in/out to a clip"""
-    # Get duration first
-    probe_cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", str(input_file)]
-    result = subprocess.run(probe_cmd, capture_output=True, text=True)
-    
-    try:
-        duration = float(json.loads(result.stdout)["format"]["duration"])
-    except:
-        duration = 3.0
-    
-    fade_out_start = max(0, duration - fade_out)
-    
-    filter_str = f"fade=t=in:st=0:d={fade_in},fade=t=out:st={fade_out_start}:d={fade_out}"
-    
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", str(input_file),
-        "-vf", filter_str,
-        "-c:v", "libx264",
-        "-preset", "fast",
-        "-crf", "18",
-        str(output_file)
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return result.returncode == 0
-
 def create_video():
-    """Create the professional marketing video"""
-    ensure_temp_dir()
-    
-    segments = []
-    
-    for i, (scene_file, duration, zoom_start, zoom_end, pan_x, pan_y, overlay) in enumerate(SCENES):
-        print(f"Processing scene {i+1}/{len(SCENES)}: {scene_file}")
-        
-        segment_raw = TEMP_DIR / f"segment_{i:02d}_raw.mp4"
-        segment_faded = TEMP_DIR / f"segment_{i:02d}.mp4"
-        
-        # Create scene with simple zoom (Ken Burns is complex, use simpler approach)
-        success = create_scene_simple(scene_file, duration, zoom_start, zoom_end, pan_x, pan_y, segment_raw)
-        
-        if not success:
-            print(f"  Failed to create scene, skipping...")
-            continue
-        
-        # Add fade transitions
-        if add_fade_transition(segment_raw, segment_faded, fade_in=0.2, fade_out=0.2):
-            segments.append(segment_faded)
-        else:
-            segments.append(segment_raw)
-    
-    # Create concat file
-    concat_file = TEMP_DIR / "concat_list.txt"
-    with open(concat_file, 'w') as f:
-        for seg in segments:
-            if seg.exists():
-                f.write(f"file '{seg}'\n")
-    
-    print(f"\nConcatenating {len(segments)} segments with crossfade...")
-    
-    # Concatenate all segments
-    cmd_concat = [
-        "ffmpeg", "-y",
-        "-f", "concat",
-        "-safe", "0",
-        "-i", str(concat_file),
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "20",
-        "-pix_fmt", "yuv420p",
-        str(OUTPUT_VIDEO)
-    ]
-    
-    result = subprocess.run(cmd_concat, capture_output=True, text=True)
-    
-    if result.returncode == 0:
-        print(f"\n✅ Video created successfully: {OUTPUT_VIDEO}")
+    """Create the professional marketing video in a single ffmpeg pass"""
+    start_telemetry()
+    try:
+        available = []
+        for i, scene in enumerate(SCENES):
+            scene_path = ASSETS_DIR / scene[0]
+            if not scene_path.exists():
+                print(f"Warning: {scene[0]} not found, skipping...")
+                continue
+            print(f"Scene {i+1}/{len(SCENES)}: {scene[0]} ({scene[1]}s)")
+            available.append((scene_path, *scene[1:]))
+    
+        if not available:
+            print("No scenes to render")
+            return False
+    
+        # Fit each screenshot onto its Ken Burns canvas once, in parallel (cached by source hash)
+        stills = prepare_stills([
+            (scene_path, *ken_burns_canvas(WIDTH, HEIGHT, zoom_start, zoom_end, pan_x, pan_y)[:2])
+            for scene_path, _, zoom_start, zoom_end, pan_x, pan_y, _ in available
+        ])
+        if None in stills:
+            return False
+    
+        # Lower-thirds: each distinct PNG is decoded once and shared by every scene using it
+        overlays = []
+        for _, _, _, _, _, _, overlay in available:
+            overlay_path = ASSETS_DIR / overlay if overlay else None
+            if overlay_path and not overlay_path.exists():
+                print(f"Warning: overlay {overlay} not found, skipping caption...")
+                overlay_path = None
+            overlays.append(overlay_path)
+    
+        # Ken Burns motion runs through the crossfade into the next scene
+        scenes = []
+        for i, ((_, duration, zoom_start, zoom_end, pan_x, pan_y, overlay), still) in enumerate(zip(available, stills)):
+            motion = duration + (TRANSITION_DURATION if i < len(available) - 1 else 0)
+            filters = ken_burns_filters(WIDTH, HEIGHT, motion, zoom_start, zoom_end, pan_x, pan_y, prefitted=True)
+            scenes.append((still, duration, filters))
+    
+        print(f"\nRendering {len(scenes)} scenes with {TRANSITION_DURATION}s crossfades in one pass...")
+    
+        # One filtergraph: per-scene Ken Burns and caption, xfade between scenes, fade in/out at the ends
+        result = render_timeline(scenes, OUTPUT_VIDEO, [
+            "-c:v", "libx264",
+            "-preset", "medium",
+            "-crf", "20",
+            "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart",
+        ], fps=FPS, transition=TRANSITION_DURATION, fade=FADE_DURATION,
+           labels=[scene_path.name for scene_path, *_ in available], overlays=overlays)
+    
+        if result.returncode == 0:
+            print(f"\n✅ Video created successfully: {OUTPUT_VIDEO}")
         
-        # Get file size
-        size_mb = OUTPUT_VIDEO.stat().st_size / (1024 * 1024)
-        total_duration = sum(d for _, d, *_ in SCENES)
-        print(f"   Duration: ~{total_duration:.1f} seconds")
-        print(f"   File size: {size_mb:.1f} MB")
-        success = True
-    else:
-        print(f"Error creating video: {result.stderr[-500:]}")
-        success = False
+            # Get file size
+            size_mb = OUTPUT_VIDEO.stat().st_size / (1024 * 1024)
+            total_duration = sum(d for _, d, _ in scenes)
+            print(f"   Duration: ~{total_duration:.1f} seconds")
+            print(f"   File size: {size_mb:.1f} MB")
+            return True
     
-    # Cleanup temp files
-    print("\nCleaning up temporary files...")
-    for f in TEMP_DIR.glob("*.mp4"):
-        f.unlink()
-    if concat_file.exists():
-        concat_file.unlink()
-    
-    return success
+        print(f"Error creating video: {result.stderr[-500:]}")
+        return False
+    finally:
+        write_telemetry_report(RENDER_REPORT)
 
 if __name__ == "__main__":
     print("=" * 60)
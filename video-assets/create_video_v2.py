@@ -4,10 +4,16 @@ STS Futures Marketing Video Generator v2
 Creates a professional marketing video from dashboard screenshots
 """
 
-import subprocess
 import os
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts"))
+from video_render import (
+    SegmentCache, concat_segments, prepare_stills, render_parallel, run_ffmpeg,
+    start_telemetry, still_input, write_telemetry_report,
+)
+
 # Video settings
 FPS = 30
 WIDTH = 1920
@@ -17,6 +23,7 @@ RESOLUTION = f"{WIDTH}:{HEIGHT}"
 # Asset directory
 ASSETS_DIR = Path("/home/ubuntu/intraday-dashboard/video-assets")
 OUTPUT_VIDEO = ASSETS_DIR / "sts_futures_demo.mp4"
+RENDER_REPORT = OUTPUT_VIDEO.with_suffix(".render.json")
 
 # Scene sequence with timing (scene_file, duration_seconds, description)
 SCENES = [
@@ -35,88 +42,112 @@ SCENES = [
     ("cta-card.png", 4, "Call to action - pricing"),
 ]
 
+# Stills arrive from prepare_stills() already fitted to WIDTH x HEIGHT in yuv420p,
+# so no scaling or conversion here
+SCENE_FILTER = "format=yuv420p"
+SEGMENT_ENCODE = ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-r", str(FPS), "-preset", "fast"]
+
+def render_scene(scene_path, duration, segment_file, label=None):
+    """Encode one still image into a segment"""
+    cmd = [
+        "ffmpeg", "-y",
+        *still_input(scene_path, duration, FPS),
+        "-vf", SCENE_FILTER,
+        *SEGMENT_ENCODE,
+        str(segment_file)
+    ]
+    
+    result = run_ffmpeg(cmd, label=label)
+    if result.returncode != 0:
+        print(f"Error processing {label or scene_path.name}")
+        print(f"stderr: {result.stderr[-500:] if len(result.stderr) > 500 else result.stderr}")
+        return False
+    return True
+
 def create_video():
     """Create the marketing video using ffmpeg"""
     
-    segments = []
+    start_telemetry()
+    try:
+        cache = SegmentCache()
+        segments = []
+        pending = []
+        jobs = []
+    
+        available = []
+        for i, (scene_file, duration, desc) in enumerate(SCENES):
+            if not (ASSETS_DIR / scene_file).exists():
+                print(f"Warning: {scene_file} not found, skipping...")
+                continue
+            available.append((i, scene_file, duration, desc))
     
-    for i, (scene_file, duration, desc) in enumerate(SCENES):
-        scene_path = ASSETS_DIR / scene_file
-        if not scene_path.exists():
-            print(f"Warning: {scene_file} not found, skipping...")
-            continue
-            
-        segment_file = ASSETS_DIR / f"segment_{i:02d}.mp4"
-        segments.append(segment_file)
+        # Decode, fit and pad every screenshot once, in parallel (cached by source hash)
+        stills = prepare_stills([(ASSETS_DIR / scene_file, WIDTH, HEIGHT) for _, scene_file, _, _ in available])
+    
+        for (i, scene_file, duration, desc), scene_path in zip(available, stills):
+            if scene_path is None:
+                return False
         
-        print(f"Processing scene {i+1}/{len(SCENES)}: {desc}")
+            # Unchanged scenes (same bytes, duration and settings) come straight from the cache
+            key = cache.key(scene_path, duration, SCENE_FILTER, SEGMENT_ENCODE)
+            cached = cache.lookup(key)
+            if cached:
+                print(f"Cached scene {i+1}/{len(SCENES)}: {desc}")
+                segments.append(cached)
+                continue
         
-        # Simple approach: scale to fit, pad with black, no zoompan
-        cmd = [
-            "ffmpeg", "-y",
-            "-loop", "1",
-            "-i", str(scene_path),
-            "-vf", f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=decrease,pad={WIDTH}:{HEIGHT}:(ow-iw)/2:(oh-ih)/2:color=black",
-            "-c:v", "libx264",
-            "-t", str(duration),
-            "-pix_fmt", "yuv420p",
-            "-r", str(FPS),
-            "-preset", "fast",
-            str(segment_file)
-        ]
+            segment_file = cache.staging_path(key, ASSETS_DIR / f"segment_{i:02d}.mp4")
+            pending.append((len(segments), key, segment_file))
+            segments.append(segment_file)
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"Error processing {scene_file}")
-            print(f"stderr: {result.stderr[-500:] if len(result.stderr) > 500 else result.stderr}")
-            return False
+            print(f"Queued scene {i+1}/{len(SCENES)}: {desc}")
+            jobs.append((render_scene, (scene_path, duration, segment_file, scene_file)))
     
-    # Create concat file
-    concat_file = ASSETS_DIR / "concat_list.txt"
-    with open(concat_file, 'w') as f:
-        for seg in segments:
-            if seg.exists():
-                f.write(f"file '{seg}'\n")
+        # Segments render concurrently; the concat list keeps scene order
+        if not all(render_parallel(jobs)):
+            return False
+        for index, key, segment_file in pending:
+            segments[index] = cache.commit(key, segment_file)
+        print(f"Segment cache: {cache.hits} reused, {cache.misses} rendered")
     
-    print(f"\nConcatenating {len(segments)} segments...")
+        concat_file = ASSETS_DIR / "concat_list.txt"
     
-    # Concatenate all segments
-    cmd_concat = [
-        "ffmpeg", "-y",
-        "-f", "concat",
-        "-safe", "0",
-        "-i", str(concat_file),
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "23",
-        "-pix_fmt", "yuv420p",
-        str(OUTPUT_VIDEO)
-    ]
+        print(f"\nConcatenating {len(segments)} segments...")
     
-    result = subprocess.run(cmd_concat, capture_output=True, text=True)
+        # Segments share codec/size/fps/pix_fmt, so this is normally a stream copy
+        result = concat_segments(segments, OUTPUT_VIDEO, concat_file, [
+            "-c:v", "libx264",
+            "-preset", "medium",
+            "-crf", "23",
+            "-pix_fmt", "yuv420p",
+        ])
     
-    if result.returncode == 0:
-        print(f"\n✅ Video created successfully: {OUTPUT_VIDEO}")
+        if result.returncode == 0:
+            print(f"\n✅ Video created successfully: {OUTPUT_VIDEO}")
         
-        # Get file size
-        size_mb = OUTPUT_VIDEO.stat().st_size / (1024 * 1024)
-        total_duration = sum(d for _, d, _ in SCENES)
-        print(f"   Duration: ~{total_duration} seconds")
-        print(f"   File size: {size_mb:.1f} MB")
-        success = True
-    else:
-        print(f"Error creating video: {result.stderr[-500:]}")
-        success = False
+            # Get file size
+            size_mb = OUTPUT_VIDEO.stat().st_size / (1024 * 1024)
+            total_duration = sum(d for _, d, _ in SCENES)
+            print(f"   Duration: ~{total_duration} seconds")
+            print(f"   File size: {size_mb:.1f} MB")
+            success = True
+        else:
+            print(f"Error creating video: {result.stderr[-500:]}")
+            success = False
     
-    # Cleanup segment files
-    print("\nCleaning up temporary files...")
-    for seg in segments:
-        if seg.exists():
-            seg.unlink()
-    if concat_file.exists():
-        concat_file.unlink()
+        # Cleanup segment files (cached segments are kept for the next run)
+        print("\nCleaning up temporary files...")
+        if not cache.enabled:
+            for seg in segments:
+                if seg.exists():
+                    seg.unlink()
+        if concat_file.exists():
+            concat_file.unlink()
+        cache.evict()
     
-    return success
+        return success
+    finally:
+        write_telemetry_report(RENDER_REPORT)
 
 if __name__ == "__main__":
     print("=" * 60)